@@ -1,43 +1,158 @@
+import time
+STARTUP_MARKS = [("start", time.perf_counter())] # (what finished, perf_counter) for the startup profile
+
 import sys
 import os
 
+from PySide6.QtCore import (
+    Qt,
+    QRectF,
+    QPointF,
+    QSize,
+    QStandardPaths,
+    QBuffer,
+    QByteArray,
+    QTimer,
+    QElapsedTimer,
+    QObject,
+    QRunnable,
+    QThreadPool,
+    QFileSystemWatcher,
+    QAbstractListModel,
+    QModelIndex,
+    QEvent,
+    Signal,
+)
+STARTUP_MARKS.append(("PySide6.QtCore", time.perf_counter()))
+
+from PySide6.QtNetwork import QLocalServer, QLocalSocket
+STARTUP_MARKS.append(("PySide6.QtNetwork", time.perf_counter()))
+
+# --------------------------
+# Single instance
+# --------------------------
+
+# Single-instance mode: later launches hand their file to the running viewer
+INSTANCE_SERVER_NAME = "ImageViewer"        # local socket name, suffixed with the user name
+INSTANCE_CONNECT_TIMEOUT_MS = 100           # how long a launch looks for a running viewer
+INSTANCE_SEND_TIMEOUT_MS = 1000             # how long it waits for the path to be delivered
+
+def single_instance_enabled():
+    """
+    Return True unless single-instance mode is turned off.
+
+    Set the IMAGE_VIEWER_SINGLE_INSTANCE environment variable to 0 to have
+    every launch open its own window.
+    """
+    return os.environ.get("IMAGE_VIEWER_SINGLE_INSTANCE", "1") != "0"
+
+def instance_server_name():
+    """Return the local socket name of this user's running viewer."""
+    user = os.environ.get("USER") or os.environ.get("USERNAME") or ""
+    user = "".join(c for c in user if c.isalnum())
+    return f"{INSTANCE_SERVER_NAME}-{user}" if user else INSTANCE_SERVER_NAME
+
+def forward_to_running_instance(path):
+    """
+    Hand `path` to an already running viewer, if there is one.
+
+    Called before the GUI and codec modules are imported (or by `main`,
+    when this file was imported rather than run), so a launch from a file
+    association that finds a running viewer exits without loading them or
+    building a window.
+
+    Parameters
+    ----------
+    path : str or None
+        File to open; None just brings the running viewer to the front.
+
+    Returns
+    -------
+    bool
+        True if a running viewer received the request.
+    """
+    socket = QLocalSocket()
+    socket.connectToServer(instance_server_name())
+    if not socket.waitForConnected(INSTANCE_CONNECT_TIMEOUT_MS):
+        return False
+
+    # Relative paths are resolved here; the running viewer has another cwd
+    message = os.path.abspath(path) if path else ""
+    socket.write(QByteArray(message.encode("utf-8") + b"\n"))
+    delivered = socket.waitForBytesWritten(INSTANCE_SEND_TIMEOUT_MS)
+    socket.disconnectFromServer()
+    if socket.state() != QLocalSocket.UnconnectedState:
+        socket.waitForDisconnected(INSTANCE_SEND_TIMEOUT_MS)
+    return delivered
+
+# A launch that finds a running viewer hands its file over here, with only
+# QtCore and QtNetwork imported; the GUI, codec and worker imports below
+# are paid only by a launch that opens its own window. Worker processes of
+# a frozen build also start this script (with --multiprocessing-fork) and
+# must not take part.
+SINGLE_INSTANCE_CHECKED = False
+if (
+    __name__ == "__main__" and single_instance_enabled()
+    and sys.argv[1:2] != ["--multiprocessing-fork"]
+):
+    if forward_to_running_instance(sys.argv[1] if len(sys.argv) > 1 else None):
+        sys.exit(0)
+    SINGLE_INSTANCE_CHECKED = True
+    STARTUP_MARKS.append(("single-instance check", time.perf_counter()))
+
+import math
+import io
+import hashlib
+import threading
+import bisect
+import re
+import sqlite3
+import multiprocessing
+import importlib
+import json
+import contextlib
+from collections import OrderedDict, deque
+from datetime import datetime
+from concurrent.futures import ProcessPoolExecutor, CancelledError
+from concurrent.futures.process import BrokenProcessPool
+STARTUP_MARKS.append(("standard library", time.perf_counter()))
+
 from PySide6.QtGui import (
     QPixmap,
+    QImage,
+    QImageReader,
     QPainter,
     QFont,
     QColor,
     QIcon,
     QPalette,
     QAction,
-    QMovie,
+    QKeySequence,
+    QPen,
+    QColorSpace,
+    QPixelFormat,
 )
+STARTUP_MARKS.append(("PySide6.QtGui", time.perf_counter()))
 
 from PySide6.QtWidgets import (
     QApplication,
     QMainWindow,
     QWidget,
     QFileDialog,
+    QInputDialog,
     QToolBar,
     QSizePolicy,
     QMessageBox,
+    QStackedWidget,
+    QListView,
 )
+STARTUP_MARKS.append(("PySide6.QtWidgets", time.perf_counter()))
 
-from PySide6.QtCore import (
-    Qt,
-    QRectF,
-    QFile,
-    QStandardPaths,
-    QBuffer,
-    QTimer,
-)
-
-from PIL.ImageQt import ImageQt
-from PIL import Image
-
-from pillow_heif import register_heif_opener
-import pillow_avif
+from PIL import Image, UnidentifiedImageError
+STARTUP_MARKS.append(("PIL", time.perf_counter()))
 
-from send2trash import send2trash
+# pillow-heif, pillow-avif-plugin and Send2Trash are imported on first use
+# (see `lazy_import` and `register_heif_plugins`)
 
 """
 Simple image viewer built with PySide6.
@@ -45,22 +160,113 @@ Simple image viewer built with PySide6.
 Features:
 - Opens a single image and scans the containing folder for all supported images.
 - Supports static formats: PNG, JPEG, BMP, TIFF, HEIC/HEIF, AVIF, etc.
-- Supports animated GIF and WebP via QMovie.
+- Supports animated GIF and WebP with a cached, frame-skipping player.
 - Zoom in/out with mouse wheel.
 - Click-and-drag panning when the zoomed image is larger than the widget.
 - Embedded SVG icons (folder, chevrons, trash) stored as base64 strings.
 - Delete current file from disk with confirmation.
 """
 
-# enables Pillow to read HEIC/HEIF
-register_heif_opener()  
-
 SUPPORTED_EXTENSIONS = (
     ".png", ".jpg", ".jpeg", ".jpe", ".jfif",
     ".webp", ".gif", ".bmp", ".tif", ".tiff",
-    ".heic", ".heif", ".avif", ".avifs"
+    ".heic", ".heif", ".avif", ".avifs", ".ico"
 )
 
+# Memory budget shared by every cache of decoded images
+MEMORY_BUDGET_BYTES = 1024 * 1024 * 1024    # default RAM ceiling (1 GB); IMAGE_VIEWER_MEMORY_MB overrides it
+RESIDENCY_VISIBLE = 3                       # eviction priorities: the image on screen, its renders, tiles and frames...
+RESIDENCY_NEIGHBOR = 2                      # ...outrank prefetched neighbors...
+RESIDENCY_THUMBNAIL = 1                     # ...which outrank grid thumbnails
+
+# Background prefetch of neighboring images
+PREFETCH_RADIUS = 2                         # images decoded on each side of the current one
+PREFETCH_CACHE_BYTES = 512 * 1024 * 1024    # memory cap for prefetched pixmaps (512 MB)
+PREFETCH_THREADS = 2                        # decoder threads used for prefetching
+
+# Background folder scanning
+SCAN_FIRST_BATCH = 64                       # paths in a scan's first batch; later batches double
+SCAN_MAX_BATCH = 8192                       # largest batch a scan reports at once
+WATCH_DEBOUNCE_MS = 250                     # wait for folder changes to settle before re-listing
+SORT_MODES = {                              # sort orders, in the order Ctrl+Shift+S cycles through them
+    "name": "name",
+    "date": "capture date",
+    "modified": "modification time",
+    "size": "file size",
+}
+SORT_KEY_FOLDERS = 8                        # folders whose sort keys stay cached after leaving them
+
+# Deleting to the trash
+TRASH_UNDO_MS = 5000                        # deletions wait this long for Undo, then go to the trash in one batch
+
+# Tiled rendering for very large images
+TILED_MIN_PIXELS = 64_000_000               # images at least this big are shown as tiles
+TILE_SIZE = 512                             # tile edge in pixels, at every pyramid level
+TILE_CACHE_BYTES = 256 * 1024 * 1024        # memory cap for decoded tiles (256 MB)
+TILE_THREADS = 2                            # decoder threads used for tiles
+
+# Pre-scaled render cache in ImageWidget
+SCALED_CACHE_MAX_PIXELS = 16_000_000        # larger scaled renders are drawn on the fly
+INTERACTION_SETTLE_MS = 150                 # idle time after wheel/pan before a high-quality repaint
+
+# Thumbnail grid
+THUMB_SIZE = 256                            # longest edge of stored thumbnails
+THUMB_QUALITY = 85                          # JPEG quality of stored thumbnails
+THUMB_CACHE_FILE = "thumbnails.sqlite"      # on-disk cache, in the user's cache folder
+THUMB_MEMORY_BYTES = 64 * 1024 * 1024       # memory cap for thumbnail pixmaps (64 MB)
+THUMB_PROCESSES = max(1, min(4, (os.cpu_count() or 2) - 1))   # thumbnail decoder processes
+GRID_ICON_SIZE = 160                        # thumbnail size in the grid, in logical pixels
+
+# Collection mode: a directory tree indexed in SQLite
+COLLECTION_INDEX_FILE = "collection.sqlite" # metadata index, in the user's cache folder
+INDEX_PROCESSES = THUMB_PROCESSES           # header-probing worker processes
+INDEX_BATCH = 512                           # files probed and committed to the index at a time
+
+# Multi-page TIFF / multi-size ICO
+PAGED_FORMATS = ("TIFF", "ICO")             # formats whose files may hold several pages
+PAGE_PREFETCH_RADIUS = 2                    # pages decoded ahead on each side of the current one
+PAGE_CACHE_BYTES = 128 * 1024 * 1024        # memory cap for decoded pages (128 MB)
+PAGE_THREADS = 2                            # decoder threads used for pages
+MAX_PAGES = 65536                           # longer TIFF page chains are treated as corrupt
+
+# Animated GIF / WebP playback
+ANIMATION_CACHE_BYTES = 256 * 1024 * 1024   # decoded frames kept per animation; bigger ones are streamed
+ANIMATION_STREAM_AHEAD = 4                  # frames decoded ahead of playback while streaming
+ANIMATION_MIN_DELAY_MS = 20                 # shorter frame delays (often 0) play at the default below
+ANIMATION_DEFAULT_DELAY_MS = 100
+ANIMATION_MAX_LAG_MS = 1000                 # further behind than this, playback resyncs instead of skipping
+
+# High bit depth (16-bit, 32-bit integer and float) images
+TONE_MAP_PERCENTILES = (0.1, 99.9)          # levels of the default "percentile" stretch
+TONE_MAP_SAMPLES = 1 << 20                  # pixels sampled to find an image's levels
+TONE_MAP_SAMPLE_ROWS = 256                  # evenly spaced rows read to find an image's levels
+TONE_MAP_CHUNK_PIXELS = 1 << 19             # pixels converted per vectorized step (fits in cache)
+
+# Color management
+ICC_TRANSFORM_CACHE = 32                    # built color transforms kept, one per distinct embedded profile
+
+# Sandboxed decoding of risky files (IMAGE_VIEWER_SANDBOX=1)
+SANDBOX_FORMATS = ("HEIF", "AVIF", None)    # formats decoded in a worker process; None is anything unrecognized
+SANDBOX_MIN_BYTES = 64 * 1024 * 1024        # files at least this big are decoded in a worker process too (64 MB)
+SANDBOX_PROCESSES = 2                       # worker processes kept for sandboxed decodes
+SANDBOX_TIMEOUT_S = 10                      # a decode still running after this is killed and shows the placeholder
+SANDBOX_CPU_S = 20                          # CPU time a single decode may use (POSIX)
+SANDBOX_MEMORY_BYTES = 4 * 1024 ** 3        # address space of a worker process (4 GB, POSIX)
+
+# Format sniffing
+SNIFF_BYTES = 64                            # bytes read from the start of a file to identify its format
+
+# Embedded previews shown while the real decode runs
+PREVIEW_MAX_PIXELS = 2_000_000              # bigger embedded previews take too long to decode on the GUI thread
+PREVIEW_MAX_ASPECT_ERROR = 0.25             # previews whose shape differs more than this from the image are ignored
+
+# Startup profile (IMAGE_VIEWER_PROFILE_STARTUP=1)
+STARTUP_PROFILE_TIMEOUT_MS = 10_000         # report anyway if the first image isn't shown by then
+
+# Performance instrumentation
+PERF_OVERLAY_REFRESH_MS = 250               # how often the perf overlay (F12) is redrawn
+TRACE_MAX_EVENTS = 500_000                  # spans kept for IMAGE_VIEWER_TRACE; later ones are dropped
+
 
 def resource_path(filename):
     """
@@ -78,10 +284,1018 @@ def resource_path(filename):
 
     return os.path.join(base, filename)
 
+# --------------------------
+# Lazily loaded modules
+# --------------------------
+
+LAZY_IMPORT_MS = {} # module name -> ms spent importing it on first use
+
+def lazy_import(name):
+    """
+    Import a module the first time it's needed instead of at startup.
+
+    Codec and trash modules are only needed for some files, so the window
+    doesn't wait for them. The time each import took is kept in
+    `LAZY_IMPORT_MS` for the startup profile.
+    """
+    module = sys.modules.get(name)
+    if module is None:
+        start = time.perf_counter()
+        module = importlib.import_module(name)
+        LAZY_IMPORT_MS.setdefault(name, (time.perf_counter() - start) * 1000)
+    return module
+
+_HEIF_LOCK = threading.Lock()
+_heif_registered = False
+
+def register_heif_plugins():
+    """
+    Teach Pillow HEIF/HEIC (pillow-heif) and AVIF (pillow-avif-plugin).
+
+    Deferred until a file that needs them turns up, in whichever process or
+    thread decodes it. Safe to call from several threads.
+
+    Returns
+    -------
+    bool
+        True if this call registered them, False if they already were.
+    """
+    global _heif_registered
+    if _heif_registered:
+        return False
+    with _HEIF_LOCK:
+        if _heif_registered:
+            return False
+        lazy_import("pillow_heif").register_heif_opener()
+        lazy_import("pillow_avif") # registers itself on import
+        _heif_registered = True
+        return True
+
+def open_with_pillow(source, formats=None):
+    """
+    `Image.open`, registering the HEIF/AVIF plugins when they may be needed.
+
+    They are registered before opening a file sniffed as HEIF or AVIF, and
+    before retrying a file of unknown format that Pillow can't identify.
+
+    Parameters
+    ----------
+    source : str or file object
+        Filesystem path, or a binary file object positioned at its start.
+    formats : list[str] or None, optional
+        Pillow format names to try, when the format is already known.
+
+    Returns
+    -------
+    PIL.Image.Image
+        Lazily opened image.
+    """
+    if formats and ("HEIF" in formats or "AVIF" in formats):
+        register_heif_plugins()
+    try:
+        return Image.open(source, formats=formats)
+    except UnidentifiedImageError:
+        if formats is not None or not register_heif_plugins():
+            raise
+    if hasattr(source, "seek"):
+        source.seek(0)
+    return Image.open(source)
+
+# --------------------------
+# Performance instrumentation
+# --------------------------
+
+class PerfSpans:
+    """
+    Lightweight timing spans around the decode and paint hot paths.
+
+    Phases are timed with `span`: disk reads, Qt and Pillow decodes, the
+    Pillow-to-QImage handoff, QImage-to-QPixmap conversion, painting and
+    the synchronous part of `load_image`. While disabled, `span` returns a
+    shared no-op context manager, so an instrumented call costs one
+    attribute check.
+
+    Enabled while the perf overlay (F12) is shown, or for the whole run
+    with IMAGE_VIEWER_TRACE, which also keeps every span and writes them as
+    a Chrome trace file (chrome://tracing, Perfetto) when the window closes.
+    Safe to use from several threads.
+    """
+    def __init__(self):
+        self.enabled = False
+        self.tracing = False
+        self._lock = threading.Lock()
+        self._stats = {}   # name -> [last ms, total ms, count]
+        self._events = []  # Chrome trace events, while tracing
+        self._origin = time.perf_counter()
+
+    def span(self, name):
+        """Return a context manager that times the phase `name`."""
+        if not self.enabled:
+            return _NO_SPAN
+        return _PerfSpan(self, name)
+
+    def timed(self, name):
+        """Decorator form of `span`, for functions with many exits."""
+        def decorate(function):
+            def wrapper(*args, **kwargs):
+                with self.span(name):
+                    return function(*args, **kwargs)
+            wrapper.__name__ = function.__name__
+            wrapper.__doc__ = function.__doc__
+            return wrapper
+        return decorate
+
+    def record(self, name, start, end):
+        """Add a finished span (perf_counter seconds) to the statistics and trace."""
+        ms = (end - start) * 1000.0
+        with self._lock:
+            stats = self._stats.get(name)
+            if stats is None:
+                self._stats[name] = [ms, ms, 1]
+            else:
+                stats[0] = ms
+                stats[1] += ms
+                stats[2] += 1
+            if self.tracing and len(self._events) < TRACE_MAX_EVENTS:
+                self._events.append({
+                    "name": name,
+                    "ph": "X",
+                    "ts": (start - self._origin) * 1e6,
+                    "dur": ms * 1000.0,
+                    "pid": os.getpid(),
+                    "tid": threading.get_ident(),
+                })
+
+    def stats(self):
+        """Return {phase: (last ms, mean ms, count)} for every phase seen so far."""
+        with self._lock:
+            return {name: (last, total / count, count) for name, (last, total, count) in self._stats.items()}
+
+    def reset(self):
+        """Forget the statistics (the trace is kept)."""
+        with self._lock:
+            self._stats.clear()
+
+    def write_trace(self, path):
+        """Write the recorded spans to `path` in Chrome trace event format."""
+        with self._lock:
+            events = list(self._events)
+        with open(path, "w", encoding="utf-8") as file:
+            json.dump({"traceEvents": events, "displayTimeUnit": "ms"}, file)
+
+class _PerfSpan:
+    """One running span of `PerfSpans.span`."""
+    __slots__ = ("_spans", "_name", "_start")
+
+    def __init__(self, spans, name):
+        self._spans = spans
+        self._name = name
+
+    def __enter__(self):
+        self._start = time.perf_counter()
+        return self
+
+    def __exit__(self, *exc_info):
+        self._spans.record(self._name, self._start, time.perf_counter())
+        return False
+
+_NO_SPAN = contextlib.nullcontext()
+
+# Shared by every thread that decodes or paints
+PERF = PerfSpans()
+
+def resident_memory_bytes():
+    """Return the resident memory of this process in bytes, or None if unknown."""
+    try:
+        if sys.platform == "win32":
+            import ctypes
+            from ctypes import wintypes
+
+            class PROCESS_MEMORY_COUNTERS(ctypes.Structure):
+                _fields_ = [
+                    ("cb", wintypes.DWORD),
+                    ("PageFaultCount", wintypes.DWORD),
+                    ("PeakWorkingSetSize", ctypes.c_size_t),
+                    ("WorkingSetSize", ctypes.c_size_t),
+                    ("QuotaPeakPagedPoolUsage", ctypes.c_size_t),
+                    ("QuotaPagedPoolUsage", ctypes.c_size_t),
+                    ("QuotaPeakNonPagedPoolUsage", ctypes.c_size_t),
+                    ("QuotaNonPagedPoolUsage", ctypes.c_size_t),
+                    ("PagefileUsage", ctypes.c_size_t),
+                    ("PeakPagefileUsage", ctypes.c_size_t),
+                ]
+
+            counters = PROCESS_MEMORY_COUNTERS()
+            counters.cb = ctypes.sizeof(counters)
+            process = ctypes.windll.kernel32.GetCurrentProcess()
+            if not ctypes.windll.psapi.GetProcessMemoryInfo(process, ctypes.byref(counters), counters.cb):
+                return None
+            return counters.WorkingSetSize
+
+        if os.path.exists("/proc/self/statm"):
+            with open("/proc/self/statm") as file:
+                return int(file.read().split()[1]) * os.sysconf("SC_PAGE_SIZE")
+
+        # macOS and other Unixes only report the peak
+        import resource
+        return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    except (OSError, ValueError, AttributeError, ImportError):
+        return None
+
+# --------------------------
+# Format sniffing and decoders
+# --------------------------
+
+# ISO base media (HEIF family) brands, from the `ftyp` box
+_HEIF_BRANDS = {b"heic", b"heix", b"hevc", b"hevx", b"heim", b"heis", b"hevm", b"hevs", b"mif1", b"msf1", b"mif2"}
+_AVIF_BRANDS = {b"avif", b"avis"}
+
+def sniff_format(header):
+    """
+    Identify an image format from the first bytes of a file.
+
+    Parameters
+    ----------
+    header : bytes
+        Start of the file (SNIFF_BYTES is enough), or the whole file.
+
+    Returns
+    -------
+    str or None
+        Format name as Pillow spells it ("PNG", "JPEG", "GIF", "BMP",
+        "TIFF", "WEBP", "HEIF", "AVIF" or "ICO"), or None if it isn't
+        recognized.
+    """
+    if header.startswith(b"\x89PNG\r\n\x1a\n"):
+        return "PNG"
+    if header.startswith(b"\xff\xd8\xff"):
+        return "JPEG"
+    if header.startswith((b"GIF87a", b"GIF89a")):
+        return "GIF"
+    if header.startswith(b"RIFF") and header[8:12] == b"WEBP":
+        return "WEBP"
+    if header.startswith((b"II*\x00", b"MM\x00*", b"II+\x00", b"MM\x00+")):
+        return "TIFF"
+    if header.startswith(b"BM"):
+        return "BMP"
+    if header.startswith(b"\x00\x00\x01\x00") and header[4:6] != b"\x00\x00":
+        return "ICO"
+
+    if header[4:8] == b"ftyp":
+        box_end = min(len(header), int.from_bytes(header[0:4], "big"))
+        brands = {header[8:12]}
+        brands.update(header[i:i + 4] for i in range(16, box_end - 3, 4))
+
+        # AVIF files often carry the generic mif1 brand too, so check it first
+        if brands & _AVIF_BRANDS:
+            return "AVIF"
+        if brands & _HEIF_BRANDS:
+            return "HEIF"
+    return None
+
+def read_header(path, size=SNIFF_BYTES):
+    """Return the first `size` bytes of a file (empty if it can't be read)."""
+    try:
+        with open(path, "rb") as file:
+            return file.read(size)
+    except OSError:
+        return b""
+
+def read_file(path):
+    """Return the whole contents of a file, or None if it can't be read."""
+    try:
+        with open(path, "rb") as file:
+            return file.read()
+    except OSError:
+        return None
+
+def webp_is_animated(header):
+    """Return True if a WebP header has the animation flag set (VP8X chunk)."""
+    return header[12:16] == b"VP8X" and len(header) > 20 and bool(header[20] & 0x02)
+
+class DecoderRegistry:
+    """
+    Picks the decoder for each sniffed image format and remembers what works.
+
+    Formats Qt has a reader plugin for go to Qt first, since it can decode
+    straight to a reduced size. HEIF/AVIF (through pillow-heif and
+    pillow-avif-plugin) and anything else Qt can't read go straight to
+    Pillow. Either way the format is named up front, so neither library
+    probes its other plugins first.
+
+    If the first choice fails on a file and the other decoder succeeds, the
+    other decoder becomes the first choice for that format from then on.
+    Safe to use from several threads.
+
+    16-bit gray images that Qt decodes as stored (Grayscale16) are decoded
+    again by Pillow, whose result goes through a `ToneMap`, unless tone
+    mapping is off.
+    """
+    def __init__(self):
+        self._qt_formats = None   # Qt reader plugins, looked up on first use
+        self._order = {}          # format name -> decoders in the order to try
+        self._lock = threading.Lock()
+
+    def decoders(self, format_name):
+        """
+        Return the decoders to try for a sniffed format, best first.
+
+        Parameters
+        ----------
+        format_name : str or None
+            Result of `sniff_format`; None lets both libraries detect the
+            format themselves.
+
+        Returns
+        -------
+        tuple[str, ...]
+            "qt" and/or "pillow".
+        """
+        order = self._order.get(format_name)
+        if order is not None:
+            return order
+
+        with self._lock:
+            if self._qt_formats is None:
+                # Needs the QApplication to exist so Qt can find its plugins
+                self._qt_formats = {bytes(name).decode() for name in QImageReader.supportedImageFormats()}
+
+        if format_name is None or format_name.lower() in self._qt_formats:
+            order = ("qt", "pillow")
+        else:
+            order = ("pillow",)
+        self._order[format_name] = order
+        return order
+
+    def read(self, data, format_name, target_size=None):
+        """
+        Decode an in-memory image file into a QImage.
+
+        Parameters
+        ----------
+        data : bytes
+            Contents of the image file.
+        format_name : str or None
+            Result of `sniff_format` for `data`.
+        target_size : QSize or None, optional
+            Device-pixel area the image will be fitted into, or None for a
+            full resolution decode.
+
+        Returns
+        -------
+        tuple[QImage, QSize]
+            Decoded image (empty if every decoder failed) and the
+            full-resolution size of the file.
+        """
+        order = self.decoders(format_name)
+        high_bit = None # Qt's decode of a 16-bit gray image, tone mapped if Pillow fails
+        for decoder in order:
+            if decoder == "qt":
+                buffer = QBuffer()
+                buffer.setData(data)
+                buffer.open(QBuffer.ReadOnly)
+                qimage, source_size = read_with_qt(buffer, target_size, format_name)
+            else:
+                formats = [format_name] if format_name else None
+                qimage, source_size = read_with_pillow(io.BytesIO(data), target_size, formats)
+
+            if (
+                decoder == "qt" and qimage.format() == QImage.Format_Grayscale16
+                and "pillow" in order and tone_map_settings()[0] != "off"
+            ):
+                high_bit = (qimage, source_size)
+                continue
+
+            if not qimage.isNull():
+                if decoder != order[0] and high_bit is None:
+                    self._order[format_name] = (decoder,) + tuple(d for d in order if d != decoder)
+                return qimage, source_size
+
+        if high_bit:
+            return tone_map_qimage(high_bit[0]), high_bit[1]
+        return QImage(), QSize()
+
+    def read_page(self, path, format_name, page, target_size=None):
+        """
+        Decode one page of a multi-page file into a QImage.
+
+        Works like `read`, but straight from the file: decoders seek to the
+        page's directory instead of having the whole file read into memory,
+        which matters for long TIFF scans.
+
+        Parameters
+        ----------
+        path : str
+            Filesystem path to the image file.
+        format_name : str
+            Result of `sniff_format` for the file.
+        page : int
+            Page to decode, as numbered by `read_page_sizes`.
+        target_size : QSize or None, optional
+            Device-pixel area the page will be fitted into, or None for a
+            full resolution decode.
+
+        Returns
+        -------
+        tuple[QImage, QSize]
+            Decoded page (empty if every decoder failed) and its
+            full-resolution size.
+        """
+        high_bit = None
+        for decoder in self.decoders(format_name):
+            if decoder == "qt":
+                qimage, source_size = read_with_qt(path, target_size, format_name, page)
+                if qimage.format() == QImage.Format_Grayscale16 and tone_map_settings()[0] != "off":
+                    high_bit = (qimage, source_size)
+                    continue
+            else:
+                qimage, source_size = read_with_pillow(path, target_size, [format_name], page)
+            if not qimage.isNull():
+                return qimage, source_size
+        if high_bit:
+            return tone_map_qimage(high_bit[0]), high_bit[1]
+        return QImage(), QSize()
+
+    def probe(self, path, format_name):
+        """Return the pixel size of an image file from its header, or an empty QSize."""
+        for decoder in self.decoders(format_name):
+            if decoder == "qt":
+                if format_name:
+                    reader = QImageReader(path, format_name.lower().encode())
+                else:
+                    reader = QImageReader(path)
+                size = reader.size()
+                if size.isValid():
+                    return size
+            else:
+                try:
+                    formats = [format_name] if format_name else None
+                    with open_large_image(path, formats) as img:
+                        return QSize(img.width, img.height)
+                except Exception:
+                    pass
+        return QSize()
+
+# Shared by every thread that decodes images
+DECODERS = DecoderRegistry()
+
+# --------------------------
+# Color management
+# --------------------------
+
+class ColorTransformCache:
+    """
+    Converts decoded images with an embedded ICC profile to sRGB.
+
+    Building a transform (parsing the profile, preparing its lookup tables)
+    costs far more than applying one, and a folder of shots from the same
+    camera all embed the same profile. Built transforms are kept in a small
+    LRU keyed by a hash of the profile, so each profile is built once.
+    sRGB profiles, and profiles that can't be used, are remembered as
+    needing no conversion.
+
+    Qt's color transforms do the work where they can: they are several
+    times faster than LittleCMS (Pillow's ImageCms) on RGB images. ImageCms
+    handles CMYK, profiles Qt can't parse, and the thumbnail processes,
+    which have no use for QImages.
+
+    Called by the decoders, so conversions run on whichever worker thread
+    decodes the image. Safe to use from several threads.
+    """
+    def __init__(self, max_entries=ICC_TRANSFORM_CACHE):
+        """
+        Parameters
+        ----------
+        max_entries : int, optional
+            Number of transforms kept.
+        """
+        self.max_entries = max_entries
+        # (engine, profile hash, mode) -> transform; None if no conversion is
+        # needed, False if Qt can't use the profile
+        self._transforms = OrderedDict()
+        self._lock = threading.Lock()
+        self._srgb_profile = None # ImageCms sRGB profile, created on first use
+        self.hits = 0
+        self.misses = 0
+
+    def __len__(self):
+        with self._lock:
+            return len(self._transforms)
+
+    def _lookup(self, key, build):
+        """Return the cached transform for `key`, calling `build` to make it on a miss."""
+        with self._lock:
+            if key in self._transforms:
+                self._transforms.move_to_end(key)
+                self.hits += 1
+                return self._transforms[key]
+            self.misses += 1
+
+        # Built outside the lock; two threads may race to build the same one
+        transform = build()
+        with self._lock:
+            self._transforms[key] = transform
+            while len(self._transforms) > self.max_entries:
+                self._transforms.popitem(last=False)
+        return transform
+
+    @staticmethod
+    def _build_qt(color_space):
+        """Return the Qt transform from `color_space` to sRGB, None if it is sRGB, False if unusable."""
+        if not color_space.isValid():
+            return False
+        srgb = QColorSpace(QColorSpace.SRgb)
+        if color_space == srgb:
+            return None
+        return color_space.transformationToColorSpace(srgb)
+
+    def _build_cms(self, icc_profile, mode, out_mode):
+        """Build a LittleCMS transform from `icc_profile` to sRGB, or None if none is needed."""
+        ImageCms = lazy_import("PIL.ImageCms")
+        try:
+            source = ImageCms.ImageCmsProfile(io.BytesIO(icc_profile))
+            if mode != "CMYK" and ImageCms.getProfileDescription(source).strip().lower().startswith("srgb"):
+                return None
+            if self._srgb_profile is None:
+                self._srgb_profile = ImageCms.ImageCmsProfile(ImageCms.createProfile("sRGB"))
+            # Without LittleCMS's one-pixel cache, a transform can be shared by threads
+            return ImageCms.buildTransform(
+                source, self._srgb_profile, mode, out_mode, flags=ImageCms.Flags.NOCACHE,
+            )
+        except Exception:
+            return None # damaged or unsupported profile: show the pixels as stored
+
+    def to_srgb(self, img, icc_profile=None):
+        """
+        Convert a Pillow image to sRGB with ImageCms, if it carries another ICC profile.
+
+        Parameters
+        ----------
+        img : PIL.Image.Image
+            Decoded image. RGB images are converted in place; CMYK images
+            become RGB. Other modes are returned unchanged.
+        icc_profile : bytes or None, optional
+            Profile of the image, if it isn't in `img.info`.
+
+        Returns
+        -------
+        PIL.Image.Image
+            The image in sRGB (`img` itself when converted in place).
+        """
+        icc_profile = icc_profile or img.info.get("icc_profile")
+        if not icc_profile or img.mode not in ("RGB", "RGBA", "CMYK"):
+            return img
+
+        out_mode = "RGBA" if img.mode == "RGBA" else "RGB"
+        key = ("cms", hashlib.sha1(icc_profile).digest(), img.mode)
+        transform = self._lookup(key, lambda: self._build_cms(icc_profile, img.mode, out_mode))
+        if transform is None:
+            return img
+
+        ImageCms = lazy_import("PIL.ImageCms")
+        with PERF.span("color management"):
+            if img.mode == out_mode:
+                ImageCms.applyTransform(img, transform, inPlace=True)
+                return img
+            return ImageCms.applyTransform(img, transform)
+
+    def pillow_to_qimage(self, img, icc_profile=None):
+        """
+        Hand a decoded Pillow image to Qt, converted to sRGB.
+
+        RGB images whose profile Qt can parse are converted by Qt after the
+        handoff; everything else goes through `to_srgb` first.
+
+        Parameters
+        ----------
+        img : PIL.Image.Image
+            Decoded image in any mode.
+        icc_profile : bytes or None, optional
+            Profile of the image, if it isn't in `img.info` (tiles, for one).
+
+        Returns
+        -------
+        QImage
+            The image in sRGB. Like `pillow_to_qimage`, it may borrow its
+            pixels from Python.
+        """
+        icc_profile = icc_profile or img.info.get("icc_profile")
+        transform = None
+        if icc_profile and img.mode in ("RGB", "RGBA"):
+            key = ("qt", hashlib.sha1(icc_profile).digest(), None)
+            transform = self._lookup(
+                key, lambda: self._build_qt(QColorSpace.fromIccProfile(QByteArray(icc_profile)))
+            )
+        if (icc_profile and transform is False) or img.mode == "CMYK":
+            img = self.to_srgb(img, icc_profile)
+
+        qimage = pillow_to_qimage(img)
+        if transform:
+            with PERF.span("color management"):
+                qimage.applyColorTransform(transform) # detaches from the borrowed pixels
+        return qimage
+
+    def to_srgb_qt(self, qimage):
+        """
+        Convert a QImage decoded by Qt to sRGB, if it carries another color space.
+
+        Qt reads embedded profiles into `QImage.colorSpace()` but doesn't
+        convert when painting. Only RGB pixel formats are converted, in place.
+
+        Returns
+        -------
+        QImage
+            `qimage`, converted and tagged as sRGB.
+        """
+        color_space = qimage.colorSpace()
+        if not color_space.isValid() or qimage.pixelFormat().colorModel() != QPixelFormat.RGB:
+            return qimage
+
+        icc_profile = bytes(color_space.iccProfile()) or color_space.description().encode()
+        key = ("qt", hashlib.sha1(icc_profile).digest(), None)
+        transform = self._lookup(key, lambda: self._build_qt(color_space))
+        if transform:
+            with PERF.span("color management"):
+                qimage.applyColorTransform(transform)
+            qimage.setColorSpace(QColorSpace(QColorSpace.SRgb))
+        return qimage
+
+# Shared by every thread (and thumbnail process) that decodes images
+COLOR_TRANSFORMS = ColorTransformCache()
+
 # --------------------------
 # Image loading helpers
 # --------------------------
 
+def fit_scale(source_size, target_size):
+    """
+    Return the scale that fits `source_size` inside `target_size`.
+
+    Parameters
+    ----------
+    source_size, target_size : QSize
+        Image size and the area it has to fit in.
+
+    Returns
+    -------
+    float
+        Scale factor that keeps the aspect ratio (1.0 = unscaled).
+    """
+    if source_size.isEmpty() or target_size.isEmpty():
+        return 1.0
+    scale_x = target_size.width() / source_size.width()
+    scale_y = target_size.height() / source_size.height()
+    return min(scale_x, scale_y)
+
+# Pillow modes Qt can use as-is: mode -> (raw mode to export, QImage format, bytes per pixel)
+_PILLOW_QT_LAYOUTS = {
+    "RGB": ("RGB", QImage.Format_RGB888, 3),
+    "RGBA": ("RGBA", QImage.Format_RGBA8888, 4),
+    "L": ("L", QImage.Format_Grayscale8, 1),
+    "I;16": ("I;16N", QImage.Format_Grayscale16, 2), # native byte order, as Qt expects
+}
+
+# Pillow modes with more than 8 bits per sample, shown through a ToneMap
+HIGH_BIT_MODES = ("I;16", "I;16L", "I;16B", "I;16N", "I", "F")
+
+def tone_map_settings():
+    """
+    Return the (method, gamma) used to show high bit depth images.
+
+    Set with the IMAGE_VIEWER_TONE_MAP environment variable: "percentile"
+    (the default) stretches the TONE_MAP_PERCENTILES range of the pixel
+    values to full contrast, "auto" stretches the full range (auto-levels),
+    and "off" shows values as stored (0-65535 for integers, 0-1 for
+    floats). IMAGE_VIEWER_GAMMA sets a gamma (default 1.0) applied after.
+    """
+    method = os.environ.get("IMAGE_VIEWER_TONE_MAP", "percentile").lower()
+    if method not in ("percentile", "auto", "off"):
+        method = "percentile"
+    try:
+        gamma = float(os.environ.get("IMAGE_VIEWER_GAMMA", "1"))
+    except ValueError:
+        gamma = 1.0
+    return method, (gamma if gamma > 0 else 1.0)
+
+class ToneMap:
+    """
+    Maps the pixel values of a high bit depth image to 8 bits.
+
+    Values between `low` and `high` are stretched linearly to 0-255, with
+    an optional gamma. The levels are found once per image, from a sample of
+    its pixels, so every part of the image (each tile of a tiled image, for
+    one) is mapped the same way.
+
+    The conversion runs with NumPy over the whole array, a block of rows
+    at a time to keep temporaries small. 16-bit images go through a
+    65536-entry lookup table, one gather per pixel.
+    """
+    def __init__(self, low, high, gamma=1.0):
+        """
+        Parameters
+        ----------
+        low, high : float
+            Pixel values shown as black and white.
+        gamma : float, optional
+            Gamma applied to the stretched values (1.0 = linear).
+        """
+        self.low = float(low)
+        self.high = float(high) if high > low else float(low) + 1.0
+        self.gamma = gamma
+        self._lut = None # built on first use by a 16-bit image
+
+    @classmethod
+    def from_pixels(cls, pixels, method=None, gamma=None):
+        """
+        Find the levels of an image from (a sample of) its pixel values.
+
+        Parameters
+        ----------
+        pixels : numpy.ndarray
+            Pixel values, in any shape.
+        method, gamma : optional
+            Override `tone_map_settings()`.
+
+        Returns
+        -------
+        ToneMap
+        """
+        np = lazy_import("numpy")
+        default_method, default_gamma = tone_map_settings()
+        method = method or default_method
+        gamma = gamma or default_gamma
+
+        if method == "off":
+            if pixels.dtype.kind == "f":
+                return cls(0.0, 1.0, gamma)
+            return cls(0, 65535, gamma)
+
+        sample = pixels.reshape(-1)[::max(1, pixels.size // TONE_MAP_SAMPLES)]
+        if sample.dtype.kind == "f":
+            sample = sample[np.isfinite(sample)]
+        if not sample.size:
+            return cls(0, 1, gamma)
+        if method == "auto":
+            return cls(sample.min(), sample.max(), gamma)
+        low, high = np.percentile(sample, TONE_MAP_PERCENTILES)
+        return cls(low, high, gamma)
+
+    @classmethod
+    def for_image(cls, img):
+        """Find the levels of a Pillow image in one of the HIGH_BIT_MODES."""
+        np = lazy_import("numpy")
+        step = max(1, img.height // TONE_MAP_SAMPLE_ROWS)
+        rows = [np.asarray(img.crop((0, y, img.width, y + 1))) for y in range(0, img.height, step)]
+        return cls.from_pixels(np.concatenate(rows, axis=None) if rows else np.zeros(0))
+
+    def _map(self, values, out):
+        """Map a block of values (any numeric dtype) into the uint8 array `out`."""
+        np = lazy_import("numpy")
+        x = values.astype(np.float32)
+        x -= self.low
+        x *= 1.0 / (self.high - self.low)
+        np.fmax(x, 0.0, out=x) # NaN becomes 0
+        np.fmin(x, 1.0, out=x)
+        if self.gamma != 1.0:
+            np.power(x, 1.0 / self.gamma, out=x)
+        x *= 255.0
+        x += 0.5
+        out[...] = x
+
+    def apply(self, img):
+        """
+        Map a Pillow image in one of the HIGH_BIT_MODES to an 8-bit gray one.
+
+        Returns
+        -------
+        PIL.Image.Image
+            Mode "L" image of the same size.
+        """
+        np = lazy_import("numpy")
+        width, height = img.size
+        out = np.empty((height, width), np.uint8)
+
+        # Each block is exported from Pillow and mapped while still in cache
+        rows = max(1, TONE_MAP_CHUNK_PIXELS // max(1, width))
+        for start in range(0, height, rows):
+            end = min(start + rows, height)
+            block = np.asarray(img.crop((0, start, width, end)))
+            if block.dtype.kind == "u" and block.dtype.itemsize == 2:
+                if self._lut is None:
+                    lut = np.empty(65536, np.uint8)
+                    self._map(np.arange(65536, dtype=np.uint16), lut)
+                    self._lut = lut
+                np.take(self._lut, block, out=out[start:end])
+            else:
+                self._map(block, out[start:end])
+        return Image.fromarray(out)
+
+def normalize_pillow_mode(img):
+    """
+    Convert a Pillow image to one of the modes Qt can wrap directly.
+
+    RGB, RGBA and L are returned unchanged. High bit depth images (16-bit,
+    32-bit integer, float) are mapped to 8-bit gray by a `ToneMap`, except
+    16-bit gray with IMAGE_VIEWER_TONE_MAP=off, which Qt shows as 16-bit.
+    Everything else is converted once, to the closest of those that doesn't
+    lose information the viewer can show (alpha).
+
+    Parameters
+    ----------
+    img : PIL.Image.Image
+        Decoded image in any mode.
+
+    Returns
+    -------
+    PIL.Image.Image
+        `img` itself, or a converted copy.
+    """
+    mode = img.mode
+    if mode in HIGH_BIT_MODES:
+        if mode.startswith("I;16") and tone_map_settings()[0] == "off":
+            return img if mode == "I;16" else img.convert("I;16")
+        return ToneMap.for_image(img).apply(img)
+    if mode in _PILLOW_QT_LAYOUTS:
+        return img
+
+    if mode == "1":
+        return img.convert("L")
+    if "A" in img.getbands() or "transparency" in img.info:
+        return img.convert("RGBA")
+    return img.convert("RGB")
+
+def pillow_to_qimage(img):
+    """
+    Wrap the pixels of a Pillow image in a QImage.
+
+    The mode is normalized once, the pixels are exported once with
+    `tobytes()`, and the QImage points straight at those bytes in a format
+    that matches their layout. ImageQt, by contrast, converts RGB to RGBA,
+    swizzles to BGRA and pads gray rows before Qt sees them, and can't
+    handle modes like LA or CMYK at all.
+
+    The QImage doesn't own its pixels, so the bytes are kept on it as an
+    attribute for as long as the Python object lives. Callers that keep the
+    image beyond that must take a `copy()`. QPixmap.fromImage is safe: none
+    of these formats is a native pixmap format, so it always converts into
+    a buffer of its own.
+
+    Parameters
+    ----------
+    img : PIL.Image.Image
+        Decoded image in any mode.
+
+    Returns
+    -------
+    QImage
+        Image backed by the exported pixel data.
+    """
+    img = normalize_pillow_mode(img)
+    rawmode, qt_format, bytes_per_pixel = _PILLOW_QT_LAYOUTS[img.mode]
+
+    data = img.tobytes("raw", rawmode)
+    qimage = QImage(data, img.width, img.height, img.width * bytes_per_pixel, qt_format)
+    qimage._pixel_data = data # the QImage only borrows the buffer
+    return qimage
+
+def tone_map_qimage(qimage):
+    """
+    Tone map a 16-bit gray QImage, as Pillow decodes are.
+
+    Used when Qt reads a 16-bit gray file that Pillow can't, so it isn't
+    shown as stored (usually a near-black frame for 10-14 bit data).
+
+    Returns
+    -------
+    QImage
+        8-bit gray image, or `qimage` itself with IMAGE_VIEWER_TONE_MAP=off.
+    """
+    if tone_map_settings()[0] == "off":
+        return qimage
+    img = Image.frombuffer(
+        "I;16", (qimage.width(), qimage.height()), bytes(qimage.constBits()),
+        "raw", "I;16N", qimage.bytesPerLine(), 1,
+    )
+    return pillow_to_qimage(img)
+
+def read_with_pillow(path, target_size=None, formats=None, page=None):
+    """
+    Decode an image using Pillow into a QImage.
+
+    For animated images, only the first frame is used. Unlike QPixmap, QImage
+    may be created outside the GUI thread, so this is safe to call from the
+    prefetch workers.
+
+    When `target_size` is given, JPEGs are decoded with `draft()` (libjpeg
+    DCT scaling) and other formats are shrunk with `reduce()`, so only about
+    as many pixels as the display needs are converted and kept.
+
+    Parameters
+    ----------
+    path : str or file object
+        Filesystem path to the image file, or a binary file object with its
+        contents.
+    target_size : QSize or None, optional
+        Device-pixel area the image will be fitted into, or None for a full
+        resolution decode.
+    formats : list[str] or None, optional
+        Pillow format names to try, when the format is already known.
+    page : int or None, optional
+        Page of a multi-page file to decode (TIFF directory, ICO entry in
+        file order), counted from 0. Defaults to the first frame.
+
+    Returns
+    -------
+    tuple[QImage, QSize]
+        Resulting image and the full-resolution size of the file, or of the
+        page. If loading fails, returns an empty QImage and an empty QSize.
+    """
+    try:
+        with PERF.span("decode (Pillow)"):
+            img = open_with_pillow(path, formats)
+
+            if page is not None and img.format == "ICO":
+                img = img.ico.frame(ico_entry_index(img, page))
+            elif page is not None:
+                img.seek(page)
+            elif getattr(img, "is_animated", False):
+                # If animated, use first frame
+                img.seek(0)
+
+            source_size = QSize(img.width, img.height)
+
+            if target_size is not None:
+                scale = fit_scale(source_size, target_size)
+                if scale < 1.0:
+                    wanted = (
+                        max(1, math.ceil(img.width * scale)),
+                        max(1, math.ceil(img.height * scale)),
+                    )
+
+                    # JPEG only: decode at 1/2, 1/4 or 1/8 scale, never below `wanted`
+                    if img.format == "JPEG":
+                        img.draft(None, wanted)
+
+                    factor = int(min(img.width / wanted[0], img.height / wanted[1]))
+                    if factor >= 2:
+                        img = reduce_pillow_image(img, factor)
+
+            # Decodes now, so the handoff below is timed on its own
+            img.load()
+
+        with PERF.span("Pillow to QImage"):
+            qimage = COLOR_TRANSFORMS.pillow_to_qimage(img)
+        return qimage, source_size
+    
+    except Exception:
+        return QImage(), QSize()
+
+# Pillow modes `reduce()` can't average as they are (bilevel, palette, 16-bit)
+_UNREDUCIBLE_MODES = ("1", "P", "PA") + HIGH_BIT_MODES
+
+def reduce_pillow_image(img, factor):
+    """
+    Shrink a Pillow image by an integer factor, averaging factor x factor boxes.
+
+    Bilevel, palette and high bit depth images are first brought to the
+    mode they are shown in (`normalize_pillow_mode`: palettes expanded with
+    their transparency, 16-bit and float images tone mapped), since
+    `reduce()` rejects those modes or would average palette indices. With
+    IMAGE_VIEWER_TONE_MAP=off, 16-bit gray stays 16-bit and is box-resized.
+
+    Parameters
+    ----------
+    img : PIL.Image.Image
+        Decoded image in any mode.
+    factor : int
+        Reduction factor, 2 or more.
+
+    Returns
+    -------
+    PIL.Image.Image
+        Image of about 1/factor the width and height.
+    """
+    if img.mode in _UNREDUCIBLE_MODES:
+        img = normalize_pillow_mode(img)
+    if img.mode == "I;16":
+        size = (math.ceil(img.width / factor), math.ceil(img.height / factor))
+        return img.resize(size, Image.Resampling.BOX)
+    return img.reduce(factor)
+
+def ico_entry_index(img, page):
+    """
+    Return where Pillow lists the `page`-th entry of an ICO file.
+
+    Pillow sorts the entries largest first; this finds the one stored at
+    position `page` of the file's directory by its data offset.
+    """
+    img.ico.buf.seek(6 + 16 * page)
+    offset = int.from_bytes(img.ico.buf.read(16)[12:16], "little")
+    for index, entry in enumerate(img.ico.entry):
+        if entry.offset == offset:
+            return index
+    raise IndexError(page)
+
 def load_with_pillow(path):
     """
     Load an image using Pillow and convert it to a QPixmap.
@@ -95,87 +1309,3777 @@ def load_with_pillow(path):
 
     Returns
     -------
-    QPixmap
-        Resulting pixmap. If loading fails, returns an empty QPixmap.
+    QPixmap
+        Resulting pixmap. If loading fails, returns an empty QPixmap.
+    """
+    qimage, _ = read_with_pillow(path)
+    if qimage.isNull():
+        return QPixmap()
+    with PERF.span("QImage to QPixmap"):
+        return QPixmap.fromImage(qimage)
+
+# Serializes the temporary lift of Pillow's size limit in open_large_image
+_LARGE_OPEN_LOCK = threading.Lock()
+
+def open_large_image(path, formats=None):
+    """
+    Open an image with Pillow without its decompression-bomb size check.
+
+    Only for callers that never decode the whole image into a pixmap: header
+    probes and the tiled renderer. Everything else goes through the normal
+    `Image.open` check.
+
+    Parameters
+    ----------
+    path : str
+        Filesystem path to the image file.
+    formats : list[str] or None, optional
+        Pillow format names to try, when the format is already known.
+
+    Returns
+    -------
+    PIL.Image.Image
+        Lazily opened image (pixels are not decoded yet).
+    """
+    with _LARGE_OPEN_LOCK:
+        limit = Image.MAX_IMAGE_PIXELS
+        Image.MAX_IMAGE_PIXELS = None
+        try:
+            return open_with_pillow(path, formats)
+        finally:
+            Image.MAX_IMAGE_PIXELS = limit
+
+def probe_image_size(path, format_name=None):
+    """
+    Return the pixel size of an image by reading only its header.
+
+    Parameters
+    ----------
+    path : str
+        Filesystem path to the image file.
+    format_name : str or None, optional
+        Format from `sniff_format`, if the caller already sniffed it.
+
+    Returns
+    -------
+    QSize
+        Image size, or an empty QSize if the header can't be read.
+    """
+    if format_name is None:
+        format_name = sniff_format(read_header(path))
+    return DECODERS.probe(path, format_name)
+
+def read_exif_thumbnail(path):
+    """
+    Return the JPEG thumbnail stored in a JPEG's EXIF block (IFD1), or None.
+
+    Only the header segments are parsed; the image itself is not decoded.
+    """
+    with Image.open(path, formats=["JPEG"]) as img:
+        exif_data = img.info.get("exif")
+        if not exif_data:
+            return None
+        ifd1 = img.getexif().get_ifd(lazy_import("PIL.ExifTags").IFD.IFD1)
+
+    offset = ifd1.get(0x0201) # JPEGInterchangeFormat, from the TIFF header
+    length = ifd1.get(0x0202) # JPEGInterchangeFormatLength
+    if not offset or not length:
+        return None
+    start = 6 + offset # skips the "Exif\0\0" marker before the TIFF header
+    qimage = QImage.fromData(exif_data[start:start + length], "JPEG")
+    return None if qimage.isNull() else qimage
+
+def read_heif_thumbnail(path):
+    """Return the first thumbnail item of a HEIF/AVIF file, or None."""
+    heif = lazy_import("pillow_heif").open_heif(path, convert_hdr_to_8bit=True)
+    primary = heif[heif.primary_index]
+    if not primary.info.get("thumbnails"):
+        return None
+    return pillow_to_qimage(primary.get_thumbnail(0).to_pillow())
+
+def read_tiff_preview(path):
+    """Return the first reduced-resolution page of a TIFF, or None."""
+    with Image.open(path, formats=["TIFF"]) as img:
+        for page in range(1, getattr(img, "n_frames", 1)):
+            img.seek(page)
+            reduced = img.tag_v2.get(254, 0) & 1 # NewSubfileType: reduced-resolution image
+            if reduced and img.width * img.height <= PREVIEW_MAX_PIXELS:
+                img.load()
+                return pillow_to_qimage(img)
+    return None
+
+def read_embedded_preview(path, format_name, source_size=None):
+    """
+    Return a preview image stored inside the file, without decoding the image.
+
+    Cameras and encoders often embed one: the EXIF thumbnail of a JPEG, the
+    thumbnail item of a HEIF/AVIF, or a reduced-resolution page of a TIFF.
+    Extracting it takes a few milliseconds, so `load_image` calls this on
+    the GUI thread to have something to paint while the real decode runs.
+
+    Parameters
+    ----------
+    path : str
+        Filesystem path to the image file.
+    format_name : str or None
+        Format from `sniff_format`.
+    source_size : QSize or None, optional
+        Full-resolution size of the image. Letterboxed previews (common for
+        EXIF thumbnails) are cropped to its aspect ratio; previews of a
+        different shape are ignored.
+
+    Returns
+    -------
+    QImage or None
+        Embedded preview, or None if the file has none.
+    """
+    readers = {
+        "JPEG": read_exif_thumbnail,
+        "HEIF": read_heif_thumbnail,
+        "AVIF": read_heif_thumbnail,
+        "TIFF": read_tiff_preview,
+    }
+    reader = readers.get(format_name)
+    if reader is None:
+        return None
+    try:
+        qimage = reader(path)
+    except Exception:
+        return None
+    if qimage is None or qimage.isNull():
+        return None
+    if source_size is None or source_size.isEmpty():
+        return qimage
+
+    # Crops any letterbox bars so the preview has the image's shape
+    image_ratio = source_size.width() / source_size.height()
+    preview_ratio = qimage.width() / qimage.height()
+    if abs(preview_ratio / image_ratio - 1.0) > PREVIEW_MAX_ASPECT_ERROR:
+        return None
+    if preview_ratio > image_ratio:
+        width = max(1, round(qimage.height() * image_ratio))
+        return qimage.copy((qimage.width() - width) // 2, 0, width, qimage.height())
+    if preview_ratio < image_ratio:
+        height = max(1, round(qimage.width() / image_ratio))
+        return qimage.copy(0, (qimage.height() - height) // 2, qimage.width(), height)
+    return qimage
+
+def read_with_qt(source, target_size=None, format_name=None, page=None):
+    """
+    Decode an image with Qt's image readers into a QImage.
+
+    Parameters
+    ----------
+    source : str or QIODevice
+        Filesystem path, or an open device with the file contents.
+    target_size : QSize or None, optional
+        Device-pixel area the image will be fitted into, or None for a full
+        resolution decode.
+    format_name : str or None, optional
+        Format from `sniff_format`; lets Qt skip detecting it again.
+    page : int or None, optional
+        Page of a multi-page file to decode (TIFF directory, ICO entry),
+        counted from 0. Defaults to the first one.
+
+    Returns
+    -------
+    tuple[QImage, QSize]
+        Decoded image (empty if Qt can't read it) and the full-resolution
+        size of the file, or of the page.
+    """
+    if format_name:
+        reader = QImageReader(source, format_name.lower().encode())
+    else:
+        reader = QImageReader(source)
+    if page is not None and not reader.jumpToImage(page):
+        return QImage(), QSize()
+    source_size = reader.size()
+
+    if target_size is not None and source_size.isValid():
+        scale = fit_scale(source_size, target_size)
+        if scale < 1.0:
+            reader.setScaledSize(QSize(
+                max(1, math.ceil(source_size.width() * scale)),
+                max(1, math.ceil(source_size.height() * scale)),
+            ))
+
+    with PERF.span("decode (Qt)"):
+        qimage = reader.read()
+    qimage = COLOR_TRANSFORMS.to_srgb_qt(qimage)
+    if not source_size.isValid():
+        source_size = qimage.size()
+    return qimage, source_size
+
+def read_image(path, target_size=None, data=None):
+    """
+    Decode an image file into a QImage with the best decoder for its format.
+
+    The file is read into memory once, its format is sniffed from the first
+    bytes, and `DECODERS` sends it to Qt or Pillow (pillow-heif,
+    pillow-avif-plugin) without a failed attempt first.
+
+    This is the thread-safe half of `load_pixmap`: it never touches QPixmap,
+    so background workers can call it and hand the result to the GUI thread.
+
+    With a `target_size`, large images are decoded at the smallest resolution
+    that still covers the fit-to-window zoom (QImageReader scaled reads, or
+    Pillow draft/reduce). The widget asks for a full decode later if the user
+    zooms past it.
+
+    With IMAGE_VIEWER_SANDBOX=1, risky files are decoded in a worker process
+    by `SANDBOX` instead, under a timeout and resource limits.
+
+    Parameters
+    ----------
+    path : str
+        Filesystem path to the image file.
+    target_size : QSize or None, optional
+        Device-pixel area the image will be fitted into, or None for a full
+        resolution decode.
+    data : bytes or None, optional
+        Contents of the file, if the caller already read it.
+
+    Returns
+    -------
+    tuple[QImage, QSize]
+        Decoded image (empty if every decoder failed) and the full-resolution
+        size of the file, which is larger than the image for reduced decodes.
+    """
+    if data is None:
+        if SANDBOX.enabled and SANDBOX.isolates(path):
+            return SANDBOX.read(path, target_size)
+        with PERF.span("disk read"):
+            data = read_file(path)
+        if data is None:
+            return QImage(), QSize()
+    return DECODERS.read(data, sniff_format(data), target_size)
+
+def placeholder_pixmap(path):
+    """
+    Create the "Unable to load image" placeholder shown for unreadable files.
+
+    Parameters
+    ----------
+    path : str
+        Filesystem path of the file that failed to load.
+
+    Returns
+    -------
+    QPixmap
+        An 800x600 pixmap with an error message and the filename.
+    """
+    width  = 800
+    height = 600
+    filename = os.path.basename(path)
+
+    pixmap = QPixmap(width, height)
+    pixmap.fill(QColor("#0A1320"))
+
+    painter = QPainter(pixmap)
+    painter.setRenderHint(QPainter.Antialiasing)
+
+    rect = pixmap.rect()
+
+    # Splits pixmap into two rectangles
+    top_rect = QRectF(rect.left(), rect.top(), rect.width(), rect.height() * 0.84)
+    bottom_rect = QRectF(rect.left(), rect.height() * 0.20, rect.width(), rect.height() * 0.66)
+
+    # Draws main message
+    painter.setPen(Qt.white)
+    painter.setFont(QFont("Inter", 26, QFont.Weight.Bold))
+    painter.drawText(top_rect, Qt.AlignCenter, "Unable to load image")
+
+    # Draws filename
+    painter.setFont(QFont("Inter", 12))
+
+    metrics = painter.fontMetrics()
+    max_width = bottom_rect.width() - 40
+    display_name = metrics.elidedText(filename, Qt.ElideMiddle, int(max_width))
+
+    painter.drawText(bottom_rect, Qt.AlignCenter, display_name)
+   
+    painter.end()
+
+    return pixmap
+
+def load_pixmap(path):
+    """
+    Load an image from disk into a QPixmap with multiple fallbacks.
+
+    Order of attempts:
+    1. Decode with the reader `DECODERS` picks for the sniffed format (Qt
+       for common formats, Pillow for HEIC/AVIF).
+    2. Try the other library if that one fails.
+    3. If all loading fails, or a sandboxed decode (IMAGE_VIEWER_SANDBOX=1)
+       times out or crashes, create a placeholder pixmap that displays an
+       error message and the filename.
+
+    Parameters
+    ----------
+    path : str
+        Filesystem path to the image file.
+
+    Returns
+    -------
+    QPixmap
+        Loaded or placeholder pixmap.
+    """
+    qimage, _ = read_image(path)
+    if not qimage.isNull():
+        with PERF.span("QImage to QPixmap"):
+            return QPixmap.fromImage(qimage)
+
+    # Falls back and creats a pixmap placholder
+    return placeholder_pixmap(path)
+
+def pixmap_cost(pixmap):
+    """Return the approximate memory footprint of a QPixmap or QImage in bytes."""
+    return pixmap.width() * pixmap.height() * max(1, pixmap.depth() // 8)
+
+# --------------------------
+# Sandboxed decoding
+# --------------------------
+
+def sandbox_enabled():
+    """
+    Return True if risky files are to be decoded in sandboxed worker processes.
+
+    Off by default; set the IMAGE_VIEWER_SANDBOX environment variable to 1
+    to turn it on.
+    """
+    return os.environ.get("IMAGE_VIEWER_SANDBOX", "") == "1"
+
+def limit_sandbox_worker(memory_bytes):
+    """
+    Cap the address space of a sandbox worker process (runs in the worker).
+
+    Does nothing where the `resource` module doesn't exist (Windows); the
+    timeout still applies there.
+    """
+    with contextlib.suppress(ImportError, ValueError, OSError):
+        resource = lazy_import("resource")
+        resource.setrlimit(resource.RLIMIT_AS, (memory_bytes, memory_bytes))
+
+def sandbox_decode(path, target_size, cpu_seconds):
+    """
+    Decode a file in a sandbox worker and put the pixels in shared memory.
+
+    Runs in the worker process. The worker outlives many decodes, so its
+    CPU-time limit is moved to `cpu_seconds` past what it has used so far
+    before each one; going over it kills the worker (SIGXCPU).
+
+    Parameters
+    ----------
+    path : str
+        Filesystem path to the image file.
+    target_size : tuple[int, int] or None
+        Device-pixel area the image will be fitted into, or None for a full
+        resolution decode.
+    cpu_seconds : int
+        CPU time the decode may take.
+
+    Returns
+    -------
+    tuple or None
+        (shared memory block name, width, height, bytes per line, QImage
+        format, full-resolution width, full-resolution height), or None if
+        the file can't be decoded. The caller unlinks the block.
+    """
+    with contextlib.suppress(ImportError, ValueError, OSError):
+        resource = lazy_import("resource")
+        usage = resource.getrusage(resource.RUSAGE_SELF)
+        limit = math.ceil(usage.ru_utime + usage.ru_stime) + cpu_seconds
+        hard = resource.getrlimit(resource.RLIMIT_CPU)[1]
+        if hard != resource.RLIM_INFINITY:
+            limit = min(limit, hard)
+        resource.setrlimit(resource.RLIMIT_CPU, (limit, hard))
+
+    data = read_file(path)
+    if data is None:
+        return None
+    if target_size is not None:
+        target_size = QSize(*target_size)
+    qimage, source_size = DECODERS.read(data, sniff_format(data), target_size)
+    if qimage.isNull():
+        return None
+
+    nbytes = qimage.sizeInBytes()
+    block = lazy_import("multiprocessing.shared_memory").SharedMemory(create=True, size=max(1, nbytes))
+    try:
+        block.buf[:nbytes] = qimage.constBits()
+        return (
+            block.name, qimage.width(), qimage.height(), qimage.bytesPerLine(),
+            qimage.format().value, source_size.width(), source_size.height(),
+        )
+    finally:
+        block.close()
+
+def sandbox_worker_main(connection, memory_bytes):
+    """
+    Serve decode requests from a sandbox pipe until it closes (runs in the worker).
+
+    Each request is a `sandbox_decode` argument tuple; each reply is its
+    result, or None if the decode raised.
+    """
+    limit_sandbox_worker(memory_bytes)
+    while True:
+        try:
+            path, target_size, cpu_seconds = connection.recv()
+        except (EOFError, OSError):
+            return
+        try:
+            result = sandbox_decode(path, target_size, cpu_seconds)
+        except Exception:
+            result = None
+        connection.send(result)
+
+class SandboxedDecoder:
+    """
+    Decodes risky files in worker processes that can be killed.
+
+    With IMAGE_VIEWER_SANDBOX=1, `read_image` hands this the files most
+    likely to hang, crash or exhaust memory on a malformed or hostile
+    input: HEIF/AVIF, formats it doesn't recognize (SANDBOX_FORMATS), and
+    files of SANDBOX_MIN_BYTES or more. A hostile file can then at worst
+    cost a worker process, and shows the "Unable to load image" placeholder.
+
+    Each worker is a process of its own, talking to the viewer over a
+    pipe, so a decode that runs past SANDBOX_TIMEOUT_S kills just that
+    worker, not the decodes running in the others. Workers are spawned on
+    first use, like the thumbnail workers, and kept for the next decode.
+    On POSIX systems they also have their address space
+    (SANDBOX_MEMORY_BYTES) and the CPU time of each decode (SANDBOX_CPU_S)
+    capped. Decoded pixels come back through shared memory instead of
+    being pickled.
+
+    Safe to use from several threads; at most `processes` decodes run at
+    once and the rest wait their turn.
+    """
+    def __init__(self, processes=SANDBOX_PROCESSES, timeout=SANDBOX_TIMEOUT_S):
+        """
+        Parameters
+        ----------
+        processes : int, optional
+            Number of worker processes.
+        timeout : float, optional
+            Seconds a decode may take before its worker is killed.
+        """
+        self.enabled = sandbox_enabled()
+        self.timeout = timeout
+        self.decodes = 0   # decodes sent to a worker, for the perf overlay
+        self.killed = 0    # decodes that timed out or brought their worker down
+
+        self._slots = threading.BoundedSemaphore(max(1, processes))
+        self._idle = []         # warm (process, connection) pairs waiting for a decode
+        self._workers = set()   # every live worker, idle or busy
+        self._lock = threading.Lock()
+        self._closed = False
+
+    def isolates(self, path):
+        """Return True if `path` should be decoded in a worker process."""
+        try:
+            if os.path.getsize(path) >= SANDBOX_MIN_BYTES:
+                return True
+        except OSError:
+            return False
+        return sniff_format(read_header(path)) in SANDBOX_FORMATS
+
+    def read(self, path, target_size=None):
+        """
+        Decode an image file in a worker process.
+
+        Blocks the calling thread until the decode is done or times out, so
+        it is meant for the background decoders.
+
+        Parameters
+        ----------
+        path : str
+            Filesystem path to the image file.
+        target_size : QSize or None, optional
+            Device-pixel area the image will be fitted into, or None for a
+            full resolution decode.
+
+        Returns
+        -------
+        tuple[QImage, QSize]
+            Decoded image and the full-resolution size of the file; an empty
+            QImage and QSize if it can't be decoded, timed out or crashed.
+        """
+        if target_size is not None:
+            target_size = (target_size.width(), target_size.height())
+
+        with self._slots:
+            worker = self._take_worker()
+            if worker is None:
+                return QImage(), QSize() # shut down
+            _, connection = worker
+            self.decodes += 1
+            try:
+                with PERF.span("decode (sandboxed)"):
+                    connection.send((path, target_size, SANDBOX_CPU_S))
+                    if not connection.poll(self.timeout):
+                        raise TimeoutError(path)
+                    result = connection.recv()
+            except (TimeoutError, EOFError, OSError):
+                # Timed out, or the worker died: crashed, went over a limit,
+                # or was killed by `shutdown`, which is not the file's fault
+                if not self._closed:
+                    self.killed += 1
+                self._kill(worker)
+                return QImage(), QSize()
+            self._return_worker(worker)
+
+        if result is None:
+            return QImage(), QSize()
+        with PERF.span("shared memory handoff"):
+            return self._unpack(result)
+
+    def shutdown(self):
+        """Kill every worker, including busy ones; later reads fail at once."""
+        with self._lock:
+            self._closed = True
+            workers = list(self._workers)
+            idle, self._idle = self._idle, []
+        for process, _ in workers:
+            process.kill()
+        for worker in idle:
+            self._kill(worker)
+
+    def _take_worker(self):
+        """Return an idle worker, or start one (None after shutdown)."""
+        with self._lock:
+            if self._closed:
+                return None
+            if self._idle:
+                return self._idle.pop()
+
+            # Spawned rather than forked, so workers never inherit Qt's threads
+            context = multiprocessing.get_context("spawn")
+            connection, worker_connection = context.Pipe()
+            process = context.Process(
+                target=sandbox_worker_main,
+                args=(worker_connection, SANDBOX_MEMORY_BYTES),
+                daemon=True,
+            )
+            process.start()
+            worker_connection.close() # the worker holds its own end
+            worker = (process, connection)
+            self._workers.add(worker)
+            return worker
+
+    def _return_worker(self, worker):
+        """Put a worker back for the next decode."""
+        with self._lock:
+            if worker in self._workers and not self._closed:
+                self._idle.append(worker)
+                return
+        self._kill(worker) # shut down during the decode
+
+    def _kill(self, worker):
+        """Kill a worker's process, whatever it is doing, and close its pipe."""
+        with self._lock:
+            self._workers.discard(worker)
+        process, connection = worker
+        process.kill()
+        process.join()
+        connection.close()
+
+    @staticmethod
+    def _unpack(result):
+        """Copy a decode out of its shared memory block and free the block."""
+        name, width, height, bytes_per_line, qt_format, source_width, source_height = result
+        block = lazy_import("multiprocessing.shared_memory").SharedMemory(name=name)
+        try:
+            view = block.buf[:bytes_per_line * height]
+            qimage = QImage(view, width, height, bytes_per_line, QImage.Format(qt_format)).copy()
+            view.release()
+        finally:
+            block.close()
+            block.unlink()
+        return qimage, QSize(source_width, source_height)
+
+# Shared by every thread that decodes images
+SANDBOX = SandboxedDecoder()
+
+# --------------------------
+# Caching and prefetching
+# --------------------------
+
+class LRUCache:
+    """
+    Least-recently-used cache with a byte budget.
+
+    Each entry carries a cost in bytes; when the total cost exceeds
+    `max_bytes`, the least recently used entries are dropped first.
+    Entries larger than the whole budget are not stored at all.
+
+    With a `residency` manager the cache also counts against the viewer's
+    shared memory budget, and the manager may evict its entries to make
+    room for higher-priority ones. The `pinned` entry (e.g. the image on
+    screen) is never evicted and counts as RESIDENCY_VISIBLE.
+    """
+    def __init__(self, max_bytes, residency=None, priority=RESIDENCY_NEIGHBOR):
+        """
+        Parameters
+        ----------
+        max_bytes : int
+            Memory cap for all entries combined.
+        residency : ResidencyManager or None, optional
+            Shared memory budget to register with.
+        priority : int, optional
+            Eviction priority of the entries (RESIDENCY_*).
+        """
+        self.max_bytes = max_bytes
+        self.total_bytes = 0
+        self.priority = priority
+        self.pinned = None # key that is never evicted
+        self.hits = 0      # `get` calls that found their key, for the perf overlay
+        self.misses = 0
+        self._entries = OrderedDict() # key -> (value, cost)
+
+        self.residency = residency
+        if residency is not None:
+            residency.register(self)
+
+    def __contains__(self, key):
+        return key in self._entries
+
+    def __len__(self):
+        return len(self._entries)
+
+    def keys(self):
+        """Return the cached keys, least recently used first."""
+        return list(self._entries.keys())
+
+    def get(self, key):
+        """Return the cached value for `key` (marking it as used), or None."""
+        entry = self._entries.get(key)
+        if entry is None:
+            self.misses += 1
+            return None
+        self.hits += 1
+        self._entries.move_to_end(key)
+        return entry[0]
+
+    @property
+    def pinned_bytes(self):
+        """Cost of the pinned entry, or 0."""
+        entry = self._entries.get(self.pinned)
+        return entry[1] if entry is not None else 0
+
+    def put(self, key, value, cost):
+        """Insert or replace an entry, evicting old entries to stay in budget."""
+        self.discard(key)
+        if cost > self.max_bytes:
+            return
+
+        self._entries[key] = (value, cost)
+        self.total_bytes += cost
+
+        while self.total_bytes > self.max_bytes:
+            if not self.evict_oldest(keep=key):
+                break
+
+        if self.residency is not None:
+            priority = RESIDENCY_VISIBLE if key == self.pinned else self.priority
+            self.residency.enforce(priority, keep=(self, key))
+
+    def evict_oldest(self, keep=None):
+        """
+        Drop the least recently used entry, skipping the pinned one and `keep`.
+
+        Returns
+        -------
+        int
+            Bytes freed, or 0 if nothing could be evicted.
+        """
+        for key in self._entries:
+            if key != self.pinned and key != keep:
+                _, cost = self._entries.pop(key)
+                self.total_bytes -= cost
+                return cost
+        return 0
+
+    def discard(self, key):
+        """Remove `key` from the cache if present."""
+        entry = self._entries.pop(key, None)
+        if entry is not None:
+            self.total_bytes -= entry[1]
+
+    def clear(self):
+        """Remove every entry."""
+        self._entries.clear()
+        self.total_bytes = 0
+
+def memory_budget_bytes():
+    """
+    Return the RAM budget for decoded images.
+
+    Set the IMAGE_VIEWER_MEMORY_MB environment variable to change it from
+    the default MEMORY_BUDGET_BYTES.
+    """
+    value = os.environ.get("IMAGE_VIEWER_MEMORY_MB", "")
+    try:
+        megabytes = int(value)
+    except ValueError:
+        return MEMORY_BUDGET_BYTES
+    return max(64, megabytes) * 1024 * 1024
+
+class ResidencyManager:
+    """
+    One memory budget for every decoded image the viewer keeps around.
+
+    Caches (LRUCache) register with an eviction priority; other holders,
+    like the pre-scaled render or an animation's frames, `charge` what they
+    hold. Whenever something is added and the total goes over budget,
+    cache entries are evicted lowest priority first, least recently used
+    first within a cache: thumbnails go before prefetched neighbors, and
+    neighbors before tiles. The image on screen is never evicted.
+
+    Charged memory can't be evicted, so images that would not fit at full
+    resolution are decoded smaller instead (see `fit_size`).
+
+    GUI thread only.
+    """
+    def __init__(self, budget_bytes=None):
+        """
+        Parameters
+        ----------
+        budget_bytes : int or None, optional
+            RAM ceiling. Defaults to `memory_budget_bytes()`.
+        """
+        self.budget_bytes = budget_bytes if budget_bytes is not None else memory_budget_bytes()
+        self._caches = []   # registered LRUCaches, lowest priority first
+        self._charges = {}  # owner -> (bytes, priority)
+
+    def register(self, cache):
+        """Count an LRUCache against the budget and let it be evicted from."""
+        self._caches.append(cache)
+        self._caches.sort(key=lambda c: c.priority)
+
+    @property
+    def total_bytes(self):
+        """Bytes currently held by every cache and charge."""
+        return (sum(cache.total_bytes for cache in self._caches)
+                + sum(cost for cost, _ in self._charges.values()))
+
+    def charge(self, owner, cost, priority=RESIDENCY_VISIBLE):
+        """
+        Record that `owner` holds `cost` bytes, replacing its previous charge.
+
+        Lower-priority cache entries are evicted if that goes over budget.
+        """
+        if cost <= 0:
+            self.release(owner)
+            return
+        self._charges[owner] = (cost, priority)
+        self.enforce(priority)
+
+    def release(self, owner):
+        """Forget the charge of `owner`, if any."""
+        self._charges.pop(owner, None)
+
+    def available(self, priority=RESIDENCY_VISIBLE):
+        """
+        Return how many bytes something at `priority` could hold.
+
+        That is the budget minus everything `enforce` could not evict to
+        make room for it: charges, pinned entries and higher-priority caches.
+        """
+        held = sum(cost for cost, _ in self._charges.values())
+        for cache in self._caches:
+            if cache.priority > priority:
+                held += cache.total_bytes
+            else:
+                held += cache.pinned_bytes
+        return max(0, self.budget_bytes - held)
+
+    def fit_size(self, size, priority=RESIDENCY_VISIBLE):
+        """
+        Return the largest size, up to `size`, whose pixmap fits the budget.
+
+        Parameters
+        ----------
+        size : QSize
+            Full-resolution size of an image.
+        priority : int, optional
+            Priority the pixmap will be held at.
+
+        Returns
+        -------
+        QSize
+            `size` itself, or a smaller size with the same aspect ratio.
+        """
+        cost = size.width() * size.height() * 4
+        limit = self.available(priority)
+        if cost <= limit or cost == 0:
+            return QSize(size)
+        scale = math.sqrt(limit / cost)
+        return QSize(max(1, int(size.width() * scale)), max(1, int(size.height() * scale)))
+
+    def enforce(self, priority=RESIDENCY_VISIBLE, keep=None):
+        """
+        Evict cache entries below or at `priority` until the total fits the budget.
+
+        Parameters
+        ----------
+        priority : int, optional
+            Priority of whatever was just added; nothing above it is evicted.
+        keep : tuple[LRUCache, key] or None, optional
+            Entry that was just added and must not be evicted for itself.
+        """
+        over = self.total_bytes - self.budget_bytes
+        for cache in self._caches:
+            if over <= 0 or cache.priority > priority:
+                break
+            keep_key = keep[1] if keep is not None and keep[0] is cache else None
+            while over > 0:
+                freed = cache.evict_oldest(keep=keep_key)
+                if not freed:
+                    break
+                over -= freed
+
+class DecodeSignals(QObject):
+    """
+    Signals emitted by DecodeTask.
+
+    QRunnable is not a QObject, so the task reports back through this helper.
+    The image is sent as a Python object so the wrapper that owns its pixel
+    data stays alive until the GUI thread has converted it.
+    """
+    finished = Signal(str, object, object) # (path, QImage or None if skipped, full-resolution QSize)
+
+class DecodeTask(QRunnable):
+    """
+    Worker-thread job that decodes a single file into a QImage.
+
+    If a `wanted` check is given, it is asked right before decoding, so a
+    job that went stale while it sat in the queue finishes without doing
+    any work. A decode that has already started can't be interrupted.
+    """
+    def __init__(self, path, signals, target_size=None, wanted=None):
+        """
+        Parameters
+        ----------
+        path : str
+            Filesystem path to decode.
+        signals : DecodeSignals
+            Receives the decoded image when the job finishes.
+        target_size : QSize or None, optional
+            Display size to decode for, or None for full resolution.
+        wanted : callable or None, optional
+            Called with `path` on the pool thread; returning False skips the
+            decode and reports None instead of an image.
+        """
+        super().__init__()
+        self.path = path
+        self.signals = signals
+        self.target_size = target_size
+        self.wanted = wanted
+
+    def run(self):
+        """Reimplemented QRunnable method. Runs on a pool thread."""
+        if self.wanted is not None and not self.wanted(self.path):
+            self.signals.finished.emit(self.path, None, QSize())
+            return
+        qimage, source_size = read_image(self.path, self.target_size)
+        self.signals.finished.emit(self.path, qimage, source_size)
+
+class ImagePrefetcher(QObject):
+    """
+    Decodes the images around the current one in the background.
+
+    Neighbors are decoded into QImages on a private thread pool, converted to
+    QPixmaps on the GUI thread, and kept in a byte-budgeted LRU cache so that
+    stepping forward or back is served from memory.
+
+    Neighbors are decoded at display resolution. Each cache entry remembers
+    the full size of its file, and `request_full` replaces a reduced entry
+    with a full-resolution decode when the user zooms in.
+
+    The image the user navigated to is decoded with `request_current`, ahead
+    of everything else and latest-wins: when navigation moves on, queued
+    decodes for images passed over (and for neighbors of images no longer
+    current) are skipped instead of run.
+    """
+    # Emitted on the GUI thread when a `request_full` decode is done
+    full_ready = Signal(str, object) # (path, QPixmap)
+
+    # Emitted on the GUI thread when the latest `request_current` decode is done
+    current_ready = Signal(str, object, object) # (path, QPixmap or None if unreadable, full-resolution QSize)
+
+    def __init__(self, radius=PREFETCH_RADIUS, max_bytes=PREFETCH_CACHE_BYTES,
+                 threads=PREFETCH_THREADS, residency=None, parent=None):
+        """
+        Parameters
+        ----------
+        radius : int, optional
+            Number of images to decode on each side of the current one.
+        max_bytes : int, optional
+            Memory cap for the pixmap cache.
+        threads : int, optional
+            Number of decoder threads.
+        residency : ResidencyManager or None, optional
+            Shared memory budget. The current image counts as visible,
+            the rest of the cache as neighbors.
+        parent : QObject or None, optional
+            Parent object, if any.
+        """
+        super().__init__(parent)
+
+        self.radius = radius
+        self.cache = LRUCache(max_bytes, residency, RESIDENCY_NEIGHBOR) # path -> (QPixmap, full-resolution QSize)
+
+        self._pool = QThreadPool(self)
+        self._pool.setMaxThreadCount(max(1, threads))
+
+        self._pending = set()       # neighbor paths queued or being decoded
+        self._full_pending = set()  # paths waiting for a full-resolution decode
+        self._current_pending = set()  # paths waiting for a request_current decode
+        self._current_size = None      # target size of the latest request_current
+
+        # Read by the pool threads to skip stale work; replaced, never mutated
+        self._current = None           # latest request_current path
+        self._neighbors = frozenset()  # paths of the latest prefetch_around
+
+        self._signals = DecodeSignals()
+        self._signals.finished.connect(self._on_decoded)
+        self._full_signals = DecodeSignals()
+        self._full_signals.finished.connect(self._on_full_decoded)
+        self._current_signals = DecodeSignals()
+        self._current_signals.finished.connect(self._on_current_decoded)
+
+    def get(self, path):
+        """
+        Return the cached entry for `path`, or None if it is not ready.
+
+        Returns
+        -------
+        tuple[QPixmap, QSize] or None
+            The pixmap and the full-resolution size of the file.
+        """
+        return self.cache.get(path)
+
+    def store(self, path, pixmap, source_size=None):
+        """
+        Add an already decoded pixmap (e.g. the current image) to the cache.
+
+        A cached entry is never replaced by a lower-resolution one.
+        """
+        if not pixmap or pixmap.isNull():
+            return
+        if source_size is None or source_size.isEmpty():
+            source_size = pixmap.size()
+
+        existing = self.cache.get(path)
+        if existing is not None and existing[0].width() > pixmap.width():
+            return
+        self.cache.put(path, (pixmap, source_size), pixmap_cost(pixmap))
+
+    def prefetch_around(self, image_list, index, target_size=None):
+        """
+        Queue background decodes for the neighbors of `image_list[index]`.
+
+        Closer neighbors are queued first, alternating forward and backward,
+        and navigation wraps around just like Previous/Next do.
+
+        Parameters
+        ----------
+        image_list : list[str]
+            Paths in navigation order.
+        index : int
+            Index of the current image.
+        target_size : QSize or None, optional
+            Display size to decode for, or None for full resolution.
+        """
+        count = len(image_list)
+        if count:
+            self.cache.pinned = image_list[index] # on screen, so never evicted
+        if count <= 1:
+            self._neighbors = frozenset()
+            return
+
+        neighbors = []
+        for distance in range(1, self.radius + 1):
+            for step in (distance, -distance):
+                neighbors.append(image_list[(index + step) % count])
+
+        # Neighbors of the previous image still in the queue are skipped
+        self._neighbors = frozenset(neighbors)
+
+        for path in neighbors:
+            if path in self.cache or path in self._pending:
+                continue
+            self._pending.add(path)
+            self._pool.start(DecodeTask(path, self._signals, target_size, self._is_neighbor))
+
+    def request_current(self, path, target_size=None):
+        """
+        Decode the image the user navigated to, ahead of any other work.
+
+        Latest wins: a previous current request that hasn't started yet is
+        skipped, and one that is already decoding is cached but not
+        announced. `current_ready` is emitted only for the latest path.
+
+        Parameters
+        ----------
+        path : str
+            Filesystem path to decode.
+        target_size : QSize or None, optional
+            Display size to decode for, or None for full resolution.
+        """
+        self._current = path
+        self._current_size = target_size
+        self.cache.pinned = path
+        if path in self._current_pending:
+            return # its skip, if it was skipped, is re-queued by _on_current_decoded
+        self._current_pending.add(path)
+        self._pool.start(DecodeTask(path, self._current_signals, target_size, self._is_current), 2)
+
+    def request_full(self, path, target_size=None):
+        """
+        Decode `path` at full resolution ahead of any queued neighbors.
+
+        `full_ready` is emitted with the pixmap when it is done; it is also
+        cached if it fits in the budget.
+
+        Parameters
+        ----------
+        path : str
+            Filesystem path to decode.
+        target_size : QSize or None, optional
+            Display size to decode for instead of full resolution (used to
+            replace a thumbnail preview). Ignored while a decode of `path`
+            is already pending.
+        """
+        if path in self._full_pending:
+            return
+        self._full_pending.add(path)
+        self._pool.start(DecodeTask(path, self._full_signals, target_size), 1)
+
+    def discard(self, path):
+        """Forget a single path (e.g. after it was deleted)."""
+        self.cache.discard(path)
+        self._pending.discard(path)
+        self._full_pending.discard(path)
+        self._current_pending.discard(path)
+
+    def retain(self, paths):
+        """Drop cached and pending entries whose path is not in `paths`."""
+        paths = set(paths)
+        for key in self.cache.keys():
+            if key not in paths:
+                self.cache.discard(key)
+        self._pending &= paths
+        self._full_pending &= paths
+        self._current_pending &= paths
+
+    def clear(self):
+        """Drop all cached images and ignore any decodes still in flight."""
+        self._pool.clear()
+        self._pending.clear()
+        self._full_pending.clear()
+        self._current_pending.clear()
+        self._current = None
+        self._neighbors = frozenset()
+        self.cache.clear()
+
+    def shutdown(self):
+        """Cancel queued work and wait for running decodes to finish."""
+        self.clear()
+        self._pool.waitForDone()
+
+    def _is_current(self, path):
+        """Return True if `path` is still the latest current request (any thread)."""
+        return path == self._current
+
+    def _is_neighbor(self, path):
+        """Return True if `path` is still a neighbor worth prefetching (any thread)."""
+        # The current image has its own higher-priority decode
+        return path in self._neighbors and path != self._current
+
+    def _on_decoded(self, path, qimage, source_size):
+        """Convert a finished neighbor decode into a cached QPixmap (GUI thread)."""
+        if path not in self._pending:
+            return # cancelled while decoding
+        self._pending.discard(path)
+
+        if qimage is None or qimage.isNull():
+            return # skipped as stale, or unreadable
+        with PERF.span("QImage to QPixmap"):
+            pixmap = QPixmap.fromImage(qimage)
+        self.store(path, pixmap, source_size)
+
+    def _on_current_decoded(self, path, qimage, source_size):
+        """Cache a finished current decode and announce it if still latest (GUI thread)."""
+        if path not in self._current_pending:
+            return
+        self._current_pending.discard(path)
+
+        if qimage is None:
+            # Skipped because navigation moved on before it started. If it
+            # came back (A -> B -> A) before the skip arrived here, the new
+            # request found the path pending and queued nothing, so decode now.
+            if path == self._current:
+                self.request_current(path, self._current_size)
+            return
+
+        pixmap = None
+        if not qimage.isNull():
+            with PERF.span("QImage to QPixmap"):
+                pixmap = QPixmap.fromImage(qimage)
+            self.store(path, pixmap, source_size)
+
+        if path == self._current:
+            self.current_ready.emit(path, pixmap, source_size)
+
+    def _on_full_decoded(self, path, qimage, source_size):
+        """Cache a finished full-resolution decode and announce it (GUI thread)."""
+        if path not in self._full_pending:
+            return
+        self._full_pending.discard(path)
+
+        if qimage is None or qimage.isNull():
+            return
+        with PERF.span("QImage to QPixmap"):
+            pixmap = QPixmap.fromImage(qimage)
+        self.store(path, pixmap, source_size)
+        self.full_ready.emit(path, pixmap)
+
+# --------------------------
+# Tiled rendering
+# --------------------------
+
+def to_display_mode(img, tone_map=None):
+    """
+    Convert a Pillow image to a mode Qt can show (RGB, RGBA or L).
+
+    Parameters
+    ----------
+    img : PIL.Image.Image
+        Source image.
+    tone_map : ToneMap or None, optional
+        Levels for a high bit depth image, when it is part of a larger one.
+        By default they are found from `img` itself.
+
+    Returns
+    -------
+    PIL.Image.Image
+        The same image if it is already displayable, otherwise a converted copy.
+    """
+    if img.mode in ("RGB", "RGBA", "L"):
+        return img
+    if img.mode in HIGH_BIT_MODES:
+        return (tone_map or ToneMap.for_image(img)).apply(img)
+    if "A" in img.getbands() or "transparency" in img.info:
+        return img.convert("RGBA")
+    return img.convert("RGB")
+
+class TiledImageSource:
+    """
+    Lazily decoded image pyramid for images too large to hold as one pixmap.
+
+    Level 0 is the full-resolution image, and each further level halves it,
+    down to the first level that fits in a single tile. Every level is cut
+    into TILE_SIZE x TILE_SIZE tiles that are decoded on demand by
+    `read_tile`, which is safe to call from worker threads.
+
+    Uncompressed files (raw TIFF, BMP, PPM...) are read a band of rows at a
+    time straight from the file, so a tile only touches the bytes under it.
+    Other formats are decoded once per pyramid level; JPEG coarse levels use
+    `draft()` so they never need a full decode.
+
+    High bit depth images are mapped to 8 bits with one `ToneMap` for the
+    whole image, found from a sample of its rows, so tiles match.
+    """
+    _serial = 0
+
+    def __init__(self, path):
+        """
+        Read the image header and prepare the pyramid.
+
+        Parameters
+        ----------
+        path : str
+            Filesystem path to the image file.
+
+        Raises
+        ------
+        OSError
+            If Pillow can't read the file.
+        """
+        self.path = path
+
+        with open_large_image(path) as img:
+            self.width, self.height = img.size
+            self.mode = img.mode
+            self.format = img.format
+            self.icc_profile = img.info.get("icc_profile") # tiles are converted to sRGB one by one
+            tiles = list(img.tile)
+
+        # Identifies this source in tile cache keys
+        TiledImageSource._serial += 1
+        self.serial = TiledImageSource._serial
+
+        self.levels = 1
+        while max(self.width, self.height) > (TILE_SIZE << (self.levels - 1)):
+            self.levels += 1
+
+        self._raw_tiles = self._plan_raw_reads(tiles)
+        self._level_images = {} # level -> PIL image (non-raw files only)
+        self._tone_map = None   # levels of a high bit depth image, found on first use
+        self._lock = threading.RLock()
+
+    def _plan_raw_reads(self, tiles):
+        """
+        Return a read plan if every descriptor is plain raw data.
+
+        Each entry is (extents, offset, rawmode, row_bytes, pixel_bytes,
+        orientation). `pixel_bytes` is 0 for bit-packed modes, which can
+        only be read in whole rows. Returns None when the file is compressed
+        or laid out in a way that can't be read one band of rows at a time.
+        """
+        if not tiles:
+            return None
+
+        plan = []
+        for codec_name, extents, offset, args in tiles:
+            if codec_name != "raw":
+                return None
+
+            args = args if isinstance(args, tuple) else (args,)
+            rawmode = args[0]
+            stride = args[1] if len(args) > 1 else 0
+            orientation = args[2] if len(args) > 2 else 1
+
+            tile_width = extents[2] - extents[0]
+            try:
+                packed_bytes = len(Image.new(self.mode, (tile_width, 1)).tobytes("raw", rawmode))
+                pixel_bytes = len(Image.new(self.mode, (1, 1)).tobytes("raw", rawmode))
+            except Exception:
+                return None
+
+            if packed_bytes != pixel_bytes * tile_width:
+                pixel_bytes = 0 # sub-byte pixels
+            plan.append((tuple(extents), offset, rawmode, stride or packed_bytes, pixel_bytes, orientation))
+        return plan
+
+    @property
+    def key(self):
+        """Hashable identity of this source, used in tile cache keys."""
+        return (self.path, self.serial)
+
+    def level_size(self, level):
+        """Return the (width, height) of a pyramid level."""
+        scale = 1 << level
+        return (-(-self.width // scale), -(-self.height // scale))
+
+    def tile_grid(self, level):
+        """Return the number of (columns, rows) of tiles in a pyramid level."""
+        width, height = self.level_size(level)
+        return (-(-width // TILE_SIZE), -(-height // TILE_SIZE))
+
+    def level_for_scale(self, scale):
+        """
+        Return the coarsest level that still has enough detail for `scale`.
+
+        Parameters
+        ----------
+        scale : float
+            Device pixels per full-resolution image pixel.
+        """
+        if scale >= 1.0:
+            return 0
+        level = int(math.floor(math.log2(1.0 / scale)))
+        return max(0, min(self.levels - 1, level))
+
+    def read_tile(self, level, col, row):
+        """
+        Decode one tile into a QImage. Runs on a worker thread.
+
+        Parameters
+        ----------
+        level, col, row : int
+            Pyramid level and tile position within it.
+
+        Returns
+        -------
+        QImage
+            The tile, or an empty QImage if decoding failed.
+        """
+        level_width, level_height = self.level_size(level)
+        x0 = col * TILE_SIZE
+        y0 = row * TILE_SIZE
+        box = (x0, y0, min(x0 + TILE_SIZE, level_width), min(y0 + TILE_SIZE, level_height))
+
+        try:
+            if self._raw_tiles is not None:
+                tile = self._read_raw_region(level, box)
+            else:
+                tile = self._level_image(level).crop(box)
+            return COLOR_TRANSFORMS.pillow_to_qimage(tile, self.icc_profile)
+        except Exception:
+            return QImage()
+
+    def _display_mode(self, img):
+        """Convert a region of the image for display, with the image's own levels."""
+        if img.mode in HIGH_BIT_MODES:
+            return to_display_mode(img, self.tone_map())
+        return to_display_mode(img)
+
+    def tone_map(self):
+        """Return (finding on first use) the `ToneMap` of a high bit depth image."""
+        with self._lock:
+            if self._tone_map is not None:
+                return self._tone_map
+            np = lazy_import("numpy")
+            if self._raw_tiles is not None:
+                # Evenly spaced rows, each read straight from the file
+                step = max(1, self.height // TONE_MAP_SAMPLE_ROWS)
+                rows = [
+                    np.asarray(self._read_raw_rows(0, y, self.width, y + 1))
+                    for y in range(0, self.height, step)
+                ]
+                self._tone_map = ToneMap.from_pixels(np.concatenate(rows, axis=None))
+            else:
+                img = open_large_image(self.path)
+                img.load()
+                self._tone_map = ToneMap.for_image(img)
+                self._level_images[0] = self._tone_map.apply(img)
+            return self._tone_map
+
+    def _read_raw_region(self, level, box):
+        """Read `box` (in level coordinates) band by band from a raw file."""
+        scale = 1 << level
+        x0, y0, x1, y1 = box
+        src_x0, src_y0 = x0 * scale, y0 * scale
+        src_x1 = min(x1 * scale, self.width)
+        src_y1 = min(y1 * scale, self.height)
+
+        if scale == 1:
+            return self._display_mode(self._read_raw_rows(src_x0, src_y0, src_x1, src_y1))
+
+        # Reads a few output rows' worth of source rows at a time so coarse
+        # levels don't need a full-resolution copy of the region
+        band = scale * max(1, 256 // scale)
+        result = None
+        for band_y in range(src_y0, src_y1, band):
+            rows = self._read_raw_rows(src_x0, band_y, src_x1, min(band_y + band, src_y1))
+            reduced = self._display_mode(rows).reduce(scale)
+            if result is None:
+                result = Image.new(reduced.mode, (x1 - x0, y1 - y0))
+            result.paste(reduced, (0, (band_y - src_y0) // scale))
+        return result
+
+    def _read_raw_rows(self, x0, y0, x1, y1):
+        """
+        Read a full-resolution region from a raw file, touching only its rows.
+
+        The bytes under the region are read with plain seeks and reads, one
+        row at a time, and unpacked with `Image.frombytes`.
+        """
+        region = Image.new(self.mode, (x1 - x0, y1 - y0))
+
+        with open(self.path, "rb") as file:
+            for extents, offset, rawmode, row_bytes, pixel_bytes, orientation in self._raw_tiles:
+                tile_x0, tile_y0, tile_x1, tile_y1 = extents
+                if tile_x1 <= x0 or tile_x0 >= x1 or tile_y1 <= y0 or tile_y0 >= y1:
+                    continue
+
+                # Rows of this descriptor that overlap the region
+                first = max(y0, tile_y0) - tile_y0
+                last = min(y1, tile_y1) - tile_y0
+                rows = last - first
+                if orientation < 0:
+                    # Bottom-up storage (e.g. BMP): the last row comes first
+                    offset += (tile_y1 - tile_y0 - last) * row_bytes
+                else:
+                    offset += first * row_bytes
+
+                # Columns of this descriptor that overlap the region. With
+                # whole bytes per pixel only those are read from each row;
+                # bit-packed rows are read whole and cropped.
+                left = max(x0, tile_x0) - tile_x0
+                right = min(x1, tile_x1) - tile_x0
+                if pixel_bytes:
+                    offset += left * pixel_bytes
+                    crop_left, read_width = 0, right - left
+                    line_bytes = read_width * pixel_bytes
+                else:
+                    crop_left, read_width = left, tile_x1 - tile_x0
+                    line_bytes = row_bytes
+
+                lines = []
+                for line in range(rows):
+                    file.seek(offset + line * row_bytes)
+                    lines.append(file.read(line_bytes))
+                data = b"".join(lines).ljust(rows * line_bytes, b"\0") # a truncated file reads as black
+
+                piece = Image.frombytes(
+                    self.mode, (read_width, rows), data, "raw", rawmode, line_bytes, orientation,
+                )
+                if crop_left or read_width != right - left:
+                    piece = piece.crop((crop_left, 0, crop_left + right - left, rows))
+                region.paste(piece, (max(x0, tile_x0) - x0, tile_y0 + first - y0))
+
+        return region
+
+    def _level_image(self, level):
+        """Return (building on first use) the whole image at a pyramid level."""
+        with self._lock:
+            img = self._level_images.get(level)
+            if img is None:
+                img = self._build_level(level)
+                self._level_images[level] = img
+            return img
+
+    def _build_level(self, level):
+        """Decode a pyramid level of a compressed file."""
+        if level == 0:
+            if self.mode in HIGH_BIT_MODES:
+                self.tone_map() # decodes level 0 to find the levels
+                return self._level_images[0]
+            img = open_large_image(self.path)
+            img.load()
+            return to_display_mode(img)
+
+        if self.format == "JPEG":
+            # libjpeg can decode at 1/2, 1/4 or 1/8 scale directly
+            draft_scale = 1 << min(level, 3)
+            img = open_large_image(self.path)
+            img.draft(None, (-(-self.width // draft_scale), -(-self.height // draft_scale)))
+            img = to_display_mode(img)
+            remaining = (1 << level) // draft_scale
+            return img.reduce(remaining) if remaining > 1 else img
+
+        return self._level_image(level - 1).reduce(2)
+
+class TileSignals(QObject):
+    """Signals emitted by TileTask."""
+    finished = Signal(object, object) # (tile key, QImage)
+
+class TileTask(QRunnable):
+    """
+    Worker-thread job that decodes a single pyramid tile.
+    """
+    def __init__(self, source, key, signals, running):
+        """
+        Parameters
+        ----------
+        source : TiledImageSource
+            Image the tile belongs to.
+        key : tuple
+            (source key, level, column, row).
+        signals : TileSignals
+            Receives the decoded tile.
+        running : TileLoader
+            Loader that tracks which tiles are being decoded right now.
+        """
+        super().__init__()
+        self.source = source
+        self.key = key
+        self.signals = signals
+        self.running = running
+
+    def run(self):
+        """Reimplemented QRunnable method. Runs on a pool thread."""
+        self.running.mark_running(self.key, True)
+        try:
+            _, level, col, row = self.key
+            qimage = self.source.read_tile(level, col, row)
+        finally:
+            self.running.mark_running(self.key, False)
+        self.signals.finished.emit(self.key, qimage)
+
+class TileLoader(QObject):
+    """
+    Decodes pyramid tiles in the background and caches them as QPixmaps.
+
+    Only the tiles last asked for by `request` are kept in the queue: tiles
+    that scrolled out of view before a worker picked them up are dropped.
+    The tile cache has its own byte budget and LRU eviction.
+    """
+    # Emitted on the GUI thread whenever a tile lands in the cache
+    tile_ready = Signal()
+
+    def __init__(self, max_bytes=TILE_CACHE_BYTES, threads=TILE_THREADS, residency=None, parent=None):
+        """
+        Parameters
+        ----------
+        max_bytes : int, optional
+            Memory cap for cached tiles.
+        threads : int, optional
+            Number of decoder threads.
+        residency : ResidencyManager or None, optional
+            Shared memory budget; tiles count as visible.
+        parent : QObject or None, optional
+            Parent object, if any.
+        """
+        super().__init__(parent)
+
+        self.cache = LRUCache(max_bytes, residency, RESIDENCY_VISIBLE) # tile key -> QPixmap
+
+        self._pool = QThreadPool(self)
+        self._pool.setMaxThreadCount(max(1, threads))
+
+        self._wanted = ()         # keys of the last request, in priority order
+        self._pending = set()     # keys queued or being decoded
+        self._running = set()     # keys a worker is decoding right now
+        self._running_lock = threading.Lock()
+
+        self._signals = TileSignals()
+        self._signals.finished.connect(self._on_tile)
+
+    @staticmethod
+    def tile_key(source, level, col, row):
+        """Return the cache key of a tile."""
+        return (source.key, level, col, row)
+
+    def get(self, key):
+        """Return the cached QPixmap for a tile key, or None."""
+        return self.cache.get(key)
+
+    @property
+    def is_idle(self):
+        """True when every requested tile has been decoded (or cancelled)."""
+        return not self._pending
+
+    def mark_running(self, key, running):
+        """Record that a worker started or finished a tile (any thread)."""
+        with self._running_lock:
+            if running:
+                self._running.add(key)
+            else:
+                self._running.discard(key)
+
+    def request(self, source, keys):
+        """
+        Make `keys` the set of tiles to decode, in priority order.
+
+        Queued tiles that are not in `keys` are cancelled; tiles already
+        being decoded finish and are cached.
+        """
+        keys = tuple(key for key in keys if key not in self.cache)
+        if keys == self._wanted:
+            return
+        self._wanted = keys
+
+        self._pool.clear()
+        with self._running_lock:
+            self._pending = set(self._running)
+
+        for key in keys:
+            if key in self._pending:
+                continue
+            self._pending.add(key)
+            self._pool.start(TileTask(source, key, self._signals, self))
+
+    def clear(self):
+        """Drop all cached tiles and ignore any decodes still in flight."""
+        self._pool.clear()
+        self._wanted = ()
+        self._pending.clear()
+        self.cache.clear()
+
+    def shutdown(self):
+        """Cancel queued work and wait for running decodes to finish."""
+        self.clear()
+        self._pool.waitForDone()
+
+    def _on_tile(self, key, qimage):
+        """Cache a finished tile as a QPixmap (GUI thread)."""
+        if key not in self._pending:
+            return # cancelled or cleared while decoding
+        self._pending.discard(key)
+
+        if qimage.isNull():
+            return
+        pixmap = QPixmap.fromImage(qimage)
+        self.cache.put(key, pixmap, pixmap_cost(pixmap))
+        self.tile_ready.emit()
+
+# --------------------------
+# Folder scanning
+# --------------------------
+
+_DIGITS = re.compile(r"(\d+)")
+
+def natural_key(path):
+    """
+    Return a sort key for `path` that orders numbers in file names by value.
+
+    "IMG_2.jpg" sorts before "IMG_10.jpg"; case is ignored.
+    """
+    name = path.casefold()
+    parts = _DIGITS.split(os.path.basename(name))
+    parts[1::2] = map(int, parts[1::2])
+    return parts, name
+
+class SortKeyTable:
+    """
+    Sort keys of one folder's images, for every mode in `SORT_MODES`.
+
+    Modification times and sizes come from the folder scan's `os.scandir`
+    results, and capture dates from a header-only EXIF read, so changing
+    the sort order costs no I/O. `FolderScanner` keeps the tables of recent
+    folders, so reopening one reuses its capture dates.
+    """
+    def __init__(self):
+        self.stamps = {}    # path -> (mtime_ns, size)
+        self.captured = {}  # path -> EXIF capture time or None; absent until read
+        self._natural = {}  # path -> natural_key(path)
+
+    def update(self, stamps):
+        """Record {path: (mtime_ns, size)}; capture dates of changed files are dropped."""
+        for path, stamp in stamps.items():
+            if self.stamps.get(path) != stamp:
+                self.captured.pop(path, None)
+                self.stamps[path] = stamp
+
+    def discard(self, path):
+        """Forget a removed file."""
+        self.stamps.pop(path, None)
+        self.captured.pop(path, None)
+        self._natural.pop(path, None)
+
+    def retain(self, paths):
+        """Forget every file not in `paths`."""
+        for path in [path for path in self.stamps if path not in paths]:
+            self.discard(path)
+
+    def has_capture_times(self):
+        """Return True if every file's capture date has been read."""
+        return all(path in self.captured for path in self.stamps)
+
+    def set_capture_times(self, captured):
+        """Record {path: capture time or None} read from the files."""
+        for path, value in captured.items():
+            if path in self.stamps:
+                self.captured[path] = value
+
+    def stamp(self, path):
+        """Return (mtime_ns, size) of `path`, statting it if the scan hasn't listed it yet."""
+        stamp = self.stamps.get(path)
+        if stamp is None:
+            try:
+                stat = os.stat(path)
+                stamp = self.stamps[path] = (stat.st_mtime_ns, stat.st_size)
+            except OSError:
+                stamp = (0, 0)
+        return stamp
+
+    def natural(self, path):
+        """Return the cached `natural_key` of `path`."""
+        key = self._natural.get(path)
+        if key is None:
+            key = self._natural[path] = natural_key(path)
+        return key
+
+    def key(self, mode):
+        """
+        Return the sort key function of a sort mode.
+
+        Ties are broken by name. Images without a capture date are dated by
+        their modification time.
+        """
+        natural = self.natural
+        if mode == "modified":
+            return lambda path: (self.stamp(path)[0], natural(path))
+        if mode == "size":
+            return lambda path: (self.stamp(path)[1], natural(path))
+        if mode == "date":
+            def date_key(path):
+                captured = self.captured.get(path)
+                return (self.stamp(path)[0] / 1e9 if captured is None else captured), natural(path)
+            return date_key
+        return natural
+
+def apply_folder_changes(paths, current_index, current_path, added, removed, key, resort=False):
+    """
+    Update a sorted image list in place with the changes of a folder refresh.
+
+    Without `resort`, every path is inserted or removed by binary search,
+    so the work is proportional to the number of changes. That needs the
+    list to be in order by `key`, which stops being true once modified
+    files have new sort keys (any sort mode but name); with `resort`,
+    removed paths are dropped by set membership instead and the list is
+    sorted again in one go.
+
+    Parameters
+    ----------
+    paths : list[str]
+        Image list sorted by `key`, updated in place.
+    current_index : int
+        Index of the image on screen in `paths`.
+    current_path : str or None
+        Path of the image on screen.
+    added : list[str]
+        New paths to insert.
+    removed : list[str]
+        Paths to remove; ones not in the list are ignored.
+    key : callable
+        Sort key of the list. Must still work for the removed paths.
+    resort : bool, optional
+        True if the keys of listed paths may have changed.
+
+    Returns
+    -------
+    tuple[int, int or None]
+        New index of the image on screen, and the index it had if it was
+        removed (None if it is still listed).
+    """
+    if resort:
+        gone = set(removed)
+        was_listed = current_path in gone and current_path in paths
+        paths[:] = [path for path in paths if path not in gone]
+        paths.extend(added)
+        paths.sort(key=key)
+        if was_listed:
+            return current_index, bisect.bisect_left(paths, key(current_path), key=key)
+        if current_path in paths:
+            current_index = paths.index(current_path)
+        return current_index, None
+
+    removed_at = None
+    for path in removed:
+        index = bisect.bisect_left(paths, key(path), key=key)
+        if index >= len(paths) or paths[index] != path:
+            continue # already gone (e.g. deleted from the viewer)
+
+        del paths[index]
+        if index < current_index:
+            current_index -= 1
+        elif index == current_index and path == current_path:
+            removed_at = index
+
+    for path in added:
+        index = bisect.bisect_right(paths, key(path), key=key)
+        paths.insert(index, path)
+        if index <= current_index and removed_at is None:
+            current_index += 1
+    return current_index, removed_at
+
+class FolderScanSignals(QObject):
+    """Signals emitted by FolderScanTask."""
+    batch_found = Signal(int, object, object) # (scan id, naturally sorted list of paths, {path: (mtime_ns, size)})
+    changed = Signal(int, object, object, object, object) # (scan id, added, removed, modified, {path: (mtime_ns, size)})
+    finished = Signal(int, object) # (scan id, {path: (mtime_ns, size)})
+
+class FolderScanTask(QRunnable):
+    """
+    Worker-thread job that lists the supported images in one folder.
+
+    Uses `os.scandir`, so file types come from the directory listing itself.
+    A full scan reports paths in sorted batches that start small (so the
+    first results arrive quickly) and double in size, which keeps the number
+    of merges on the GUI thread logarithmic in the folder size.
+
+    Given the snapshot of a previous scan, the task instead compares the
+    folder against it and reports only what was added, removed or modified,
+    so the GUI thread's work is proportional to the change.
+    """
+    def __init__(self, scan_id, folder_path, signals, cancelled, previous=None):
+        """
+        Parameters
+        ----------
+        scan_id : int
+            Identifies this scan in the emitted signals.
+        folder_path : str
+            Folder to list.
+        signals : FolderScanSignals
+            Receives the results.
+        cancelled : threading.Event
+            Set from the GUI thread to stop the scan early.
+        previous : dict or None, optional
+            {path: (mtime_ns, size)} from the last scan of this folder, to
+            report changes against instead of listing everything.
+        """
+        super().__init__()
+        self.scan_id = scan_id
+        self.folder_path = folder_path
+        self.signals = signals
+        self.cancelled = cancelled
+        self.previous = previous
+
+    def run(self):
+        """Reimplemented QRunnable method. Runs on a pool thread."""
+        snapshot = {}
+        batch = []
+        batch_size = SCAN_FIRST_BATCH
+        report_batches = self.previous is None
+
+        try:
+            with os.scandir(self.folder_path) as entries:
+                for entry in entries:
+                    if self.cancelled.is_set():
+                        return
+                    if not entry.name.lower().endswith(SUPPORTED_EXTENSIONS):
+                        continue
+                    try:
+                        if not entry.is_file():
+                            continue
+                        stat = entry.stat()
+                    except OSError:
+                        continue
+
+                    path = os.path.join(self.folder_path, entry.name)
+                    snapshot[path] = (stat.st_mtime_ns, stat.st_size)
+
+                    if report_batches:
+                        batch.append(path)
+                        if len(batch) >= batch_size:
+                            batch.sort(key=natural_key)
+                            self.signals.batch_found.emit(
+                                self.scan_id, batch, {path: snapshot[path] for path in batch}
+                            )
+                            batch = []
+                            batch_size = min(batch_size * 2, SCAN_MAX_BATCH)
+        except OSError:
+            pass # unreadable folder: report what was found
+
+        if self.cancelled.is_set():
+            return
+
+        if report_batches:
+            if batch:
+                batch.sort(key=natural_key)
+                self.signals.batch_found.emit(
+                    self.scan_id, batch, {path: snapshot[path] for path in batch}
+                )
+        else:
+            previous = self.previous
+            added = sorted(snapshot.keys() - previous.keys(), key=natural_key)
+            removed = list(previous.keys() - snapshot.keys())
+            modified = [
+                path for path, stamp in snapshot.items()
+                if path in previous and previous[path] != stamp
+            ]
+            if added or removed or modified:
+                stamps = {path: snapshot[path] for path in added + modified}
+                self.signals.changed.emit(self.scan_id, added, removed, modified, stamps)
+
+        self.signals.finished.emit(self.scan_id, snapshot)
+
+class FolderScanner(QObject):
+    """
+    Lists a folder's images off the GUI thread, one scan at a time.
+
+    Starting a new scan cancels the previous one, and results from a
+    cancelled scan are never delivered. After a full scan, `refresh`
+    re-lists the same folder and reports only the differences.
+
+    `keys` holds the sort keys of the folder being listed. It is updated
+    before each signal is emitted; removed paths are dropped from it after
+    `changed`, so their old keys can still be looked up.
+    """
+    # Emitted on the GUI thread for the current scan only
+    batch_found = Signal(object) # naturally sorted list of paths
+    changed = Signal(object, object, object) # added (sorted), removed, modified
+    finished = Signal()
+
+    def __init__(self, parent=None):
+        """
+        Parameters
+        ----------
+        parent : QObject or None, optional
+            Parent object, if any.
+        """
+        super().__init__(parent)
+
+        self._pool = QThreadPool(self)
+        self._pool.setMaxThreadCount(1)
+
+        self._scan_id = 0
+        self._cancelled = None # threading.Event of the running scan
+        self._folder_path = None
+        self._snapshot = None # {path: (mtime_ns, size)} from the last finished scan
+        self._refresh_pending = False
+        self._key_tables = OrderedDict() # folder -> SortKeyTable, most recent last
+        self.keys = SortKeyTable()
+
+        self._signals = FolderScanSignals()
+        self._signals.batch_found.connect(self._on_batch)
+        self._signals.changed.connect(self._on_changed)
+        self._signals.finished.connect(self._on_finished)
+
+    def is_scanning(self):
+        """Return True while a scan is running or queued."""
+        return self._cancelled is not None
+
+    def scan(self, folder_path):
+        """Start listing `folder_path`, cancelling any scan in progress."""
+        self.cancel()
+        self._folder_path = folder_path
+        self._snapshot = None
+
+        # Sort keys of a recently listed folder are reused
+        self.keys = self._key_tables.pop(folder_path, None) or SortKeyTable()
+        self._key_tables[folder_path] = self.keys
+        while len(self._key_tables) > SORT_KEY_FOLDERS:
+            self._key_tables.popitem(last=False)
+
+        self._start(None)
+
+    def refresh(self):
+        """
+        Re-list the current folder and emit `changed` with the differences.
+
+        If a scan is still running, the refresh starts when it finishes.
+        """
+        if self._folder_path is None:
+            return
+        if self.is_scanning() or self._snapshot is None:
+            self._refresh_pending = True
+            return
+        self._start(self._snapshot)
+
+    def cancel(self):
+        """Stop the current scan; its remaining results are dropped."""
+        if self._cancelled is not None:
+            self._cancelled.set()
+            self._cancelled = None
+        self._refresh_pending = False
+        self._scan_id += 1
+
+    def shutdown(self):
+        """Cancel the current scan and wait for the worker to stop."""
+        self.cancel()
+        self._pool.waitForDone()
+
+    def _start(self, previous):
+        self._scan_id += 1
+        self._cancelled = threading.Event()
+        self._pool.start(FolderScanTask(
+            self._scan_id, self._folder_path, self._signals, self._cancelled, previous,
+        ))
+
+    def _on_batch(self, scan_id, paths, stamps):
+        if scan_id == self._scan_id:
+            self.keys.update(stamps)
+            self.batch_found.emit(paths)
+
+    def _on_changed(self, scan_id, added, removed, modified, stamps):
+        if scan_id != self._scan_id:
+            return
+        self.keys.update(stamps)
+        self.changed.emit(added, removed, modified)
+        for path in removed:
+            self.keys.discard(path)
+
+    def _on_finished(self, scan_id, snapshot):
+        if scan_id != self._scan_id:
+            return
+        self._cancelled = None
+        self._snapshot = snapshot
+        self.keys.retain(snapshot)
+        self.finished.emit()
+
+        if self._refresh_pending:
+            self._refresh_pending = False
+            self.refresh()
+
+# --------------------------
+# Collection index
+# --------------------------
+
+def read_capture_time(img):
+    """
+    Return when a photo was taken, from its EXIF data, as a Unix timestamp.
+
+    Uses DateTimeOriginal, falling back to the IFD0 DateTime. Only the
+    metadata Pillow parsed from the header is read.
+
+    Returns
+    -------
+    float or None
+        Capture time in local time, or None if the file has none.
+    """
+    try:
+        exif = img.getexif()
+        value = exif.get_ifd(0x8769).get(0x9003) or exif.get(0x0132) # Exif IFD DateTimeOriginal, DateTime
+        if not value:
+            return None
+        if isinstance(value, bytes):
+            value = value.decode("ascii", "replace")
+        return datetime.strptime(value.strip("\x00 ")[:19], "%Y:%m:%d %H:%M:%S").timestamp()
+    except Exception:
+        return None
+
+def probe_image_metadata(path):
+    """
+    Read an image's format, size and capture time from its header.
+
+    Runs in an index worker process, so it only takes and returns plain
+    Python values. No pixels are decoded.
+
+    Returns
+    -------
+    tuple[str or None, int, int, float or None]
+        Sniffed format, width, height (0 if unreadable) and EXIF capture time.
+    """
+    format_name = sniff_format(read_header(path))
+    try:
+        formats = [format_name] if format_name else None
+        with open_large_image(path, formats) as img:
+            return format_name or img.format, img.width, img.height, read_capture_time(img)
+    except Exception:
+        return format_name, 0, 0, None
+
+def collection_index_path():
+    """Return the path of the collection index database, creating its folder."""
+    return os.path.join(cache_folder(), COLLECTION_INDEX_FILE)
+
+class CollectionIndex:
+    """
+    Metadata of every image under the indexed folders, kept in SQLite.
+
+    One row per file: path, folder, size, modification time, format,
+    dimensions and EXIF capture time. Rows are refreshed by
+    `CollectionIndexer` only when a file's size or modification time
+    changes, and collection navigation, sorting and filtering are queries
+    here instead of filesystem walks, so reopening a large library is
+    instant.
+
+    Safe to use from several threads; access is serialized with a lock.
+    """
+    # Keyed like SORT_MODES. Names sort case-insensitively but not
+    # naturally: a Python collation would be too slow for large libraries.
+    ORDERS = {
+        "name": "path COLLATE NOCASE",
+        "date": "COALESCE(captured, mtime_ns / 1e9), path COLLATE NOCASE",
+        "modified": "mtime_ns, path COLLATE NOCASE",
+        "size": "size, path COLLATE NOCASE",
+    }
+
+    def __init__(self, db_path=None):
+        """
+        Parameters
+        ----------
+        db_path : str or None, optional
+            Database file. Defaults to `collection_index_path()`.
+        """
+        self._lock = threading.Lock()
+        try:
+            self._db = self._open(db_path or collection_index_path())
+        except (OSError, sqlite3.Error):
+            # Read-only profile or a damaged file: index for this session only
+            self._db = self._open(":memory:")
+
+    @staticmethod
+    def _open(db_path):
+        """Open (or create) the database, its table and indexes."""
+        db = sqlite3.connect(db_path, check_same_thread=False)
+        db.execute("PRAGMA journal_mode=WAL")
+        db.execute("PRAGMA synchronous=NORMAL")
+        db.execute(
+            "CREATE TABLE IF NOT EXISTS images ("
+            " path TEXT PRIMARY KEY,"
+            " folder TEXT NOT NULL,"
+            " mtime_ns INTEGER NOT NULL,"
+            " size INTEGER NOT NULL,"
+            " format TEXT,"
+            " width INTEGER NOT NULL,"
+            " height INTEGER NOT NULL,"
+            " captured REAL)"
+        )
+        db.execute("CREATE INDEX IF NOT EXISTS images_folder ON images (folder)")
+        db.execute("CREATE INDEX IF NOT EXISTS images_captured ON images (captured)")
+        db.commit()
+        return db
+
+    @staticmethod
+    def _prefix_range(root):
+        """Return the (low, high) path bounds of everything under `root`."""
+        prefix = os.path.join(root, "")
+        return prefix, prefix + "\U0010ffff"
+
+    def stamps(self, root, recursive=True):
+        """
+        Return {path: (mtime_ns, size)} for every indexed file under `root`.
+
+        With `recursive` False, only files directly in `root` are returned.
+        """
+        if recursive:
+            low, high = self._prefix_range(root)
+            sql, params = "SELECT path, mtime_ns, size FROM images WHERE path >= ? AND path < ?", (low, high)
+        else:
+            sql, params = "SELECT path, mtime_ns, size FROM images WHERE folder = ?", (root,)
+        with self._lock:
+            try:
+                rows = self._db.execute(sql, params).fetchall()
+            except sqlite3.Error:
+                return {}
+        return {path: (mtime_ns, size) for path, mtime_ns, size in rows}
+
+    def capture_times(self, folder):
+        """Return {path: EXIF capture time or None} for the files directly in `folder`."""
+        with self._lock:
+            try:
+                return dict(self._db.execute(
+                    "SELECT path, captured FROM images WHERE folder = ?", (folder,)
+                ).fetchall())
+            except sqlite3.Error:
+                return {}
+
+    def put_many(self, rows):
+        """
+        Store or replace rows of
+        (path, mtime_ns, size, format, width, height, captured).
+        """
+        with self._lock:
+            try:
+                self._db.executemany(
+                    "INSERT OR REPLACE INTO images VALUES (?, ?, ?, ?, ?, ?, ?, ?)",
+                    [(path, os.path.dirname(path), *rest) for path, *rest in rows],
+                )
+                self._db.commit()
+            except sqlite3.Error:
+                pass # a full disk only costs us the index
+
+    def remove_many(self, paths):
+        """Forget files that were deleted or moved away."""
+        with self._lock:
+            try:
+                self._db.executemany("DELETE FROM images WHERE path = ?", [(path,) for path in paths])
+                self._db.commit()
+            except sqlite3.Error:
+                pass
+
+    def query(self, root, order="date", text=""):
+        """
+        Return the indexed images under `root`, sorted and filtered.
+
+        Parameters
+        ----------
+        root : str
+            Collection folder.
+        order : str, optional
+            A key of `ORDERS`: "date" (EXIF capture time, modification time
+            when there is none), "name" (path), "modified" or "size".
+        text : str, optional
+            Only paths containing this text (case-insensitive) are returned.
+
+        Returns
+        -------
+        list[str]
+            Image paths.
+        """
+        low, high = self._prefix_range(root)
+        sql = "SELECT path FROM images WHERE path >= ? AND path < ? AND width > 0"
+        params = [low, high]
+        if text:
+            escaped = text.replace("\\", "\\\\").replace("%", "\\%").replace("_", "\\_")
+            sql += " AND path LIKE ? ESCAPE '\\'"
+            params.append(f"%{escaped}%")
+        sql += f" ORDER BY {self.ORDERS[order]}"
+        with self._lock:
+            try:
+                return [row[0] for row in self._db.execute(sql, params)]
+            except sqlite3.Error:
+                return []
+
+    def close(self):
+        """Close the database."""
+        with self._lock:
+            self._db.close()
+
+class CollectionIndexSignals(QObject):
+    """Signals emitted by CollectionIndexTask."""
+    progress = Signal(int, int, int) # (refresh id, files probed, files to probe)
+    finished = Signal(int, str, bool) # (refresh id, root, whether the index changed)
+
+class CollectionIndexTask(QRunnable):
+    """
+    Worker-thread job that brings the index of one directory tree up to date.
+
+    Walks the tree with `os.scandir` and compares every file's modification
+    time and size with the index. Only new and changed files are probed,
+    by a pool of worker processes reading headers only; vanished files are
+    dropped. So after the first pass, a refresh costs one walk.
+
+    Given the listing of a single folder, the task skips the walk and
+    indexes just that folder (to read capture dates for sorting).
+    """
+    def __init__(self, refresh_id, root, index, signals, cancelled, stamps=None, processes=INDEX_PROCESSES):
+        """
+        Parameters
+        ----------
+        refresh_id : int
+            Identifies this refresh in the emitted signals.
+        root : str
+            Top of the directory tree.
+        index : CollectionIndex
+            Index to update.
+        signals : CollectionIndexSignals
+            Receives progress and the result.
+        cancelled : threading.Event
+            Set to stop the refresh early.
+        stamps : dict or None, optional
+            {path: (mtime_ns, size)} of the images directly in `root`, from
+            a folder scan. If given, only that folder is indexed.
+        processes : int, optional
+            Number of header-probing worker processes.
+        """
+        super().__init__()
+        self.refresh_id = refresh_id
+        self.root = root
+        self.index = index
+        self.signals = signals
+        self.cancelled = cancelled
+        self.stamps = stamps
+        self.processes = processes
+
+    def walk(self):
+        """Return {path: (mtime_ns, size)} of every supported image under the root."""
+        found = {}
+        folders = [self.root]
+        while folders and not self.cancelled.is_set():
+            folder = folders.pop()
+            try:
+                with os.scandir(folder) as entries:
+                    for entry in entries:
+                        try:
+                            if entry.is_dir(follow_symlinks=False):
+                                folders.append(entry.path)
+                                continue
+                            if not entry.name.lower().endswith(SUPPORTED_EXTENSIONS) or not entry.is_file():
+                                continue
+                            stat = entry.stat()
+                        except OSError:
+                            continue
+                        found[os.path.join(folder, entry.name)] = (stat.st_mtime_ns, stat.st_size)
+            except OSError:
+                continue # unreadable folder: index the rest
+        return found
+
+    def run(self):
+        """Reimplemented QRunnable method. Runs on a pool thread."""
+        if self.stamps is None:
+            before = self.index.stamps(self.root)
+            found = self.walk()
+        else:
+            before = self.index.stamps(self.root, recursive=False)
+            found = self.stamps
+        if self.cancelled.is_set():
+            return
+
+        removed = [path for path in before if path not in found]
+        changed = sorted(path for path, stamp in found.items() if before.get(path) != stamp)
+        if removed:
+            self.index.remove_many(removed)
+
+        done = 0
+        self.signals.progress.emit(self.refresh_id, done, len(changed))
+        if changed:
+            # Spawned rather than forked, so workers never inherit Qt's threads
+            executor = ProcessPoolExecutor(
+                max_workers=max(1, self.processes),
+                mp_context=multiprocessing.get_context("spawn"),
+            )
+            try:
+                for start in range(0, len(changed), INDEX_BATCH):
+                    if self.cancelled.is_set():
+                        break
+                    batch = changed[start:start + INDEX_BATCH]
+                    chunk = max(1, len(batch) // (4 * self.processes))
+                    probes = executor.map(probe_image_metadata, batch, chunksize=chunk)
+                    self.index.put_many([
+                        (path, *found[path], *probe) for path, probe in zip(batch, probes)
+                    ])
+                    done += len(batch)
+                    self.signals.progress.emit(self.refresh_id, done, len(changed))
+            except (BrokenProcessPool, CancelledError, RuntimeError):
+                pass # a worker crashed: the rest is indexed next time
+            finally:
+                executor.shutdown(wait=True, cancel_futures=True)
+
+        if not self.cancelled.is_set():
+            self.signals.finished.emit(self.refresh_id, self.root, bool(removed or done))
+
+class CollectionIndexer(QObject):
+    """
+    Keeps the `CollectionIndex` of the open collection up to date.
+
+    One refresh runs at a time; starting another cancels it, and results of
+    a cancelled refresh are never delivered.
+    """
+    # Emitted on the GUI thread for the current refresh only
+    progress = Signal(int, int) # (files probed, files to probe)
+    finished = Signal(str, bool) # (root refreshed, whether the index changed)
+
+    def __init__(self, index, parent=None):
+        """
+        Parameters
+        ----------
+        index : CollectionIndex
+            Index to keep up to date.
+        parent : QObject or None, optional
+            Parent object, if any.
+        """
+        super().__init__(parent)
+        self.index = index
+
+        self._pool = QThreadPool(self)
+        self._pool.setMaxThreadCount(1)
+
+        self._refresh_id = 0
+        self._cancelled = None # threading.Event of the running refresh
+
+        self._signals = CollectionIndexSignals()
+        self._signals.progress.connect(self._on_progress)
+        self._signals.finished.connect(self._on_finished)
+
+    def is_refreshing(self):
+        """Return True while a refresh is running or queued."""
+        return self._cancelled is not None
+
+    def refresh(self, root, stamps=None):
+        """
+        Start re-indexing the tree under `root`, cancelling any refresh in progress.
+
+        With `stamps` ({path: (mtime_ns, size)} from a folder scan), only
+        those images, directly in `root`, are indexed.
+        """
+        self.cancel()
+        self._refresh_id += 1
+        self._cancelled = threading.Event()
+        self._pool.start(CollectionIndexTask(
+            self._refresh_id, root, self.index, self._signals, self._cancelled, stamps,
+        ))
+
+    def cancel(self):
+        """Stop the current refresh; what it already indexed is kept."""
+        if self._cancelled is not None:
+            self._cancelled.set()
+            self._cancelled = None
+        self._refresh_id += 1
+
+    def shutdown(self):
+        """Cancel the current refresh, wait for the worker and close the index."""
+        self.cancel()
+        self._pool.waitForDone()
+        self.index.close()
+
+    def _on_progress(self, refresh_id, done, total):
+        if refresh_id == self._refresh_id:
+            self.progress.emit(done, total)
+
+    def _on_finished(self, refresh_id, root, changed):
+        if refresh_id != self._refresh_id:
+            return
+        self._cancelled = None
+        self.finished.emit(root, changed)
+
+# --------------------------
+# Trash
+# --------------------------
+
+class TrashSignals(QObject):
+    """Signals emitted by TrashTask."""
+    finished = Signal(object, object) # (trashed paths, [(path, error message)])
+
+class TrashTask(QRunnable):
+    """
+    Worker-thread job that moves a batch of files to the trash.
+
+    The whole batch goes to Send2Trash in one call, which is one shell
+    operation on Windows. If that fails, the files are retried one at a
+    time to find out which ones can't be trashed.
+    """
+    def __init__(self, paths, signals):
+        """
+        Parameters
+        ----------
+        paths : list[str]
+            Files to trash.
+        signals : TrashSignals
+            Receives the results.
+        """
+        super().__init__()
+        self.paths = paths
+        self.signals = signals
+
+    def run(self):
+        """Reimplemented QRunnable method. Runs on a pool thread."""
+        try:
+            send2trash = lazy_import("send2trash").send2trash
+        except Exception as error:
+            # Without Send2Trash nothing is trashed; the viewer gets every file back
+            message = f"Send2Trash could not be loaded: {error or type(error).__name__}"
+            self.signals.finished.emit([], [(path, message) for path in self.paths])
+            return
+
+        errors = {}
+        existing = [path for path in self.paths if os.path.exists(path)]
+        try:
+            if existing:
+                send2trash(existing)
+        except Exception:
+            for path in existing:
+                try:
+                    if os.path.exists(path):
+                        send2trash(path)
+                except Exception as error:
+                    errors[path] = str(error) or type(error).__name__
+
+        trashed = []
+        failed = []
+        for path in self.paths:
+            if path in errors:
+                failed.append((path, errors[path]))
+            elif os.path.exists(path):
+                failed.append((path, "The file is still there."))
+            else:
+                trashed.append(path)
+        self.signals.finished.emit(trashed, failed)
+
+class TrashQueue(QObject):
+    """
+    Sends deleted files to the trash in the background, in batches, with undo.
+
+    `delete` only queues a batch. Batches wait TRASH_UNDO_MS after the last
+    deletion, during which `undo` can take the latest one back; then all
+    waiting batches go to the trash together on a worker thread, so culling
+    many files costs one trash operation instead of one per file and the
+    GUI thread never waits on the disk.
+    """
+    # Emitted on the GUI thread
+    trashed = Signal(object) # paths now in the trash
+    failed = Signal(object)  # [(path, error message)] of files that could not be trashed
+
+    def __init__(self, parent=None):
+        """
+        Parameters
+        ----------
+        parent : QObject or None, optional
+            Parent object, if any.
+        """
+        super().__init__(parent)
+
+        self._pool = QThreadPool(self)
+        self._pool.setMaxThreadCount(1)
+
+        self._batches = [] # batches waiting for the undo window to pass, oldest first
+
+        self._timer = QTimer(self)
+        self._timer.setSingleShot(True)
+        self._timer.setInterval(TRASH_UNDO_MS)
+        self._timer.timeout.connect(self.commit)
+
+        self._signals = TrashSignals()
+        self._signals.finished.connect(self._on_finished)
+
+    def delete(self, paths):
+        """Queue `paths` for the trash as one batch that `undo` can take back."""
+        if paths:
+            self._batches.append(list(paths))
+            self._timer.start()
+
+    def undo(self):
+        """Take back the latest batch not yet trashed. Return its paths, or None."""
+        if not self._batches:
+            return None
+        batch = self._batches.pop()
+        if not self._batches:
+            self._timer.stop()
+        return batch
+
+    def pending(self):
+        """Return every queued path that hasn't gone to the trash yet."""
+        return [path for batch in self._batches for path in batch]
+
+    def commit(self):
+        """Trash everything queued now, in one batch."""
+        self._timer.stop()
+        paths = self.pending()
+        self._batches = []
+        if paths:
+            self._pool.start(TrashTask(paths, self._signals))
+
+    def shutdown(self):
+        """Trash everything queued and wait until it's done."""
+        self.commit()
+        self._pool.waitForDone()
+
+    def _on_finished(self, trashed, failed):
+        if trashed:
+            self.trashed.emit(trashed)
+        if failed:
+            self.failed.emit(failed)
+
+# --------------------------
+# Thumbnails
+# --------------------------
+
+def make_thumbnail(path, edge=THUMB_SIZE):
+    """
+    Decode a small preview of an image file.
+
+    Runs in a thumbnail worker process, so it only takes and returns plain
+    Python values. JPEGs are decoded with `draft()`, which lets libjpeg
+    produce a 1/2, 1/4 or 1/8 scale image instead of every pixel.
+
+    Parameters
+    ----------
+    path : str
+        Filesystem path to the image file.
+    edge : int, optional
+        Longest edge of the thumbnail in pixels.
+
+    Returns
+    -------
+    tuple[bytes, int, int] or None
+        Encoded thumbnail (JPEG, or PNG when it has transparency) and the
+        full-resolution width and height, or None if the file can't be read.
+    """
+    try:
+        with open_large_image(path) as img:
+            # If animated, use first frame
+            if getattr(img, "is_animated", False):
+                img.seek(0)
+
+            width, height = img.size
+            icc_profile = img.info.get("icc_profile")
+
+            if img.format == "JPEG":
+                img.draft("RGB", (edge, edge))
+            img.thumbnail((edge, edge))
+            thumb = to_display_mode(COLOR_TRANSFORMS.to_srgb(img, icc_profile))
+
+            buffer = io.BytesIO()
+            if thumb.mode == "RGBA":
+                thumb.save(buffer, "PNG")
+            else:
+                thumb.save(buffer, "JPEG", quality=THUMB_QUALITY)
+            return buffer.getvalue(), width, height
+
+    except Exception:
+        return None
+
+def cache_folder():
+    """Return the viewer's folder in the user's cache location, creating it."""
+    folder = QStandardPaths.writableLocation(QStandardPaths.GenericCacheLocation)
+    if not folder:
+        folder = os.path.join(os.path.expanduser("~"), ".cache")
+    folder = os.path.join(folder, "ImageViewer")
+    os.makedirs(folder, exist_ok=True)
+    return folder
+
+def thumbnail_cache_path():
+    """Return the path of the on-disk thumbnail database, creating its folder."""
+    return os.path.join(cache_folder(), THUMB_CACHE_FILE)
+
+class ThumbnailStore:
+    """
+    Persistent thumbnail cache kept in a single SQLite file.
+
+    Thumbnails are stored as small encoded blobs keyed by path, and are only
+    used while the file's modification time and size still match, so an
+    edited file gets a fresh thumbnail. Files that failed to decode are
+    stored with an empty blob and aren't retried until they change.
+
+    Safe to use from several threads; access is serialized with a lock.
+    """
+    def __init__(self, db_path=None):
+        """
+        Parameters
+        ----------
+        db_path : str or None, optional
+            Database file. Defaults to `thumbnail_cache_path()`.
+        """
+        self._lock = threading.Lock()
+        try:
+            self._db = self._open(db_path or thumbnail_cache_path())
+        except (OSError, sqlite3.Error):
+            # Read-only profile or a damaged file: keep thumbnails for this session only
+            self._db = self._open(":memory:")
+
+    @staticmethod
+    def _open(db_path):
+        """Open (or create) the database and its table."""
+        db = sqlite3.connect(db_path, check_same_thread=False)
+        db.execute("PRAGMA journal_mode=WAL")
+        db.execute("PRAGMA synchronous=NORMAL")
+        db.execute(
+            "CREATE TABLE IF NOT EXISTS thumbnails ("
+            " path TEXT PRIMARY KEY,"
+            " mtime_ns INTEGER NOT NULL,"
+            " size INTEGER NOT NULL,"
+            " width INTEGER NOT NULL,"
+            " height INTEGER NOT NULL,"
+            " data BLOB NOT NULL)"
+        )
+        db.commit()
+        return db
+
+    def get(self, path, mtime_ns, size):
+        """
+        Return the stored thumbnail for `path` if the file hasn't changed.
+
+        Returns
+        -------
+        tuple[bytes, int, int] or None
+            Encoded thumbnail (empty if the file failed to decode) and the
+            full-resolution width and height.
+        """
+        with self._lock:
+            try:
+                row = self._db.execute(
+                    "SELECT data, width, height FROM thumbnails"
+                    " WHERE path = ? AND mtime_ns = ? AND size = ?",
+                    (path, mtime_ns, size),
+                ).fetchone()
+            except sqlite3.Error:
+                return None
+        return row
+
+    def put(self, path, mtime_ns, size, data, width, height):
+        """Store or replace the thumbnail for `path`."""
+        with self._lock:
+            try:
+                self._db.execute(
+                    "INSERT OR REPLACE INTO thumbnails VALUES (?, ?, ?, ?, ?, ?)",
+                    (path, mtime_ns, size, width, height, data),
+                )
+                self._db.commit()
+            except sqlite3.Error:
+                pass # a full disk only costs us the cache
+
+    def close(self):
+        """Close the database."""
+        with self._lock:
+            self._db.close()
+
+class ThumbnailTask(QRunnable):
+    """
+    Worker-thread job that fetches one thumbnail.
+
+    Looks the file up in the on-disk store and, on a miss, has a worker
+    process decode it. The thread only waits on the process, so the decode
+    itself never holds the GIL of the GUI process.
+    """
+    def __init__(self, path, signals, loader):
+        """
+        Parameters
+        ----------
+        path : str
+            Filesystem path of the image.
+        signals : DecodeSignals
+            Receives the thumbnail when the job finishes.
+        loader : ThumbnailLoader
+            Loader that owns the store and the process pool.
+        """
+        super().__init__()
+        self.path = path
+        self.signals = signals
+        self.loader = loader
+
+    def run(self):
+        """Reimplemented QRunnable method. Runs on a pool thread."""
+        self.loader.mark_running(self.path, True)
+        try:
+            qimage, source_size = self.loader.load(self.path)
+        finally:
+            self.loader.mark_running(self.path, False)
+        self.signals.finished.emit(self.path, qimage, source_size)
+
+class ThumbnailLoader(QObject):
+    """
+    Produces thumbnails for the grid view and keeps the visible ones in memory.
+
+    Thumbnails are read from a persistent `ThumbnailStore`; missing ones are
+    decoded by a pool of worker processes (started on first use) and written
+    back to the store. Decoded thumbnails are kept as QPixmaps in a small
+    byte-budgeted LRU cache.
+
+    Like TileLoader, only the paths last asked for by `request` stay queued,
+    so cells that scrolled past before a worker got to them cost nothing.
+    """
+    # Emitted on the GUI thread whenever a thumbnail lands in the cache
+    thumbnail_ready = Signal(str)
+
+    def __init__(self, store=None, max_bytes=THUMB_MEMORY_BYTES,
+                 processes=THUMB_PROCESSES, residency=None, parent=None):
+        """
+        Parameters
+        ----------
+        store : ThumbnailStore or None, optional
+            On-disk cache. Defaults to the one in the user's cache folder.
+        max_bytes : int, optional
+            Memory cap for cached thumbnail pixmaps.
+        processes : int, optional
+            Number of worker processes (and threads feeding them).
+        residency : ResidencyManager or None, optional
+            Shared memory budget; thumbnails are evicted first.
+        parent : QObject or None, optional
+            Parent object, if any.
+        """
+        super().__init__(parent)
+
+        self.store = store if store is not None else ThumbnailStore()
+        self.cache = LRUCache(max_bytes, residency, RESIDENCY_THUMBNAIL) # path -> (QPixmap or None, full-resolution QSize)
+
+        self.processes = max(1, processes)
+        self._executor = None
+        self._executor_lock = threading.Lock()
+
+        self._pool = QThreadPool(self)
+        self._pool.setMaxThreadCount(self.processes)
+
+        self._wanted = ()         # paths of the last request, in priority order
+        self._pending = set()     # paths queued or being loaded
+        self._running = set()     # paths a worker is loading right now
+        self._running_lock = threading.Lock()
+
+        self._signals = DecodeSignals()
+        self._signals.finished.connect(self._on_loaded)
+
+    def get(self, path):
+        """
+        Return the cached thumbnail for `path`, or None if it is not loaded.
+
+        Returns
+        -------
+        tuple[QPixmap or None, QSize] or None
+            The thumbnail (None if the file can't be decoded) and the
+            full-resolution size of the file.
+        """
+        return self.cache.get(path)
+
+    def mark_running(self, path, running):
+        """Record that a worker started or finished a path (any thread)."""
+        with self._running_lock:
+            if running:
+                self._running.add(path)
+            else:
+                self._running.discard(path)
+
+    def request(self, paths):
+        """
+        Make `paths` the set of thumbnails to load, in priority order.
+
+        Queued paths that are not in `paths` are cancelled; paths already
+        being loaded finish and are cached.
+        """
+        paths = tuple(path for path in paths if path not in self.cache)
+        if paths == self._wanted:
+            return
+        self._wanted = paths
+
+        self._pool.clear()
+        with self._running_lock:
+            self._pending = set(self._running)
+
+        for path in paths:
+            if path in self._pending:
+                continue
+            self._pending.add(path)
+            self._pool.start(ThumbnailTask(path, self._signals, self))
+
+    def load(self, path):
+        """
+        Return the thumbnail of `path` from the store, decoding it on a miss.
+
+        Called on the loader's threads.
+
+        Returns
+        -------
+        tuple[QImage or None, QSize]
+            The thumbnail (a null QImage if the file can't be decoded, None
+            if the worker process died and it should be retried later) and
+            the full-resolution size of the file.
+        """
+        try:
+            stat = os.stat(path)
+        except OSError:
+            return QImage(), QSize()
+
+        entry = self.store.get(path, stat.st_mtime_ns, stat.st_size)
+        if entry is None:
+            try:
+                entry = self._get_executor().submit(make_thumbnail, path).result()
+            except (BrokenProcessPool, CancelledError, RuntimeError):
+                # A worker crashed or the pool is shutting down
+                self._drop_executor()
+                return None, QSize()
+
+            if entry is None:
+                entry = (b"", 0, 0)
+            self.store.put(path, stat.st_mtime_ns, stat.st_size, *entry)
+
+        data, width, height = entry
+        qimage = QImage.fromData(data) if data else QImage()
+        return qimage, QSize(width, height)
+
+    def discard(self, path):
+        """Forget the cached thumbnail of a path (e.g. after it changed)."""
+        self.cache.discard(path)
+        self._pending.discard(path)
+
+    def clear(self):
+        """Drop all cached thumbnails and ignore any loads still in flight."""
+        self._pool.clear()
+        self._wanted = ()
+        self._pending.clear()
+        self.cache.clear()
+
+    def shutdown(self):
+        """Cancel queued work, stop the worker processes and close the store."""
+        self.clear()
+        self._drop_executor()
+        self._pool.waitForDone()
+        self.store.close()
+
+    def _get_executor(self):
+        """Return the worker process pool, starting it on first use (any thread)."""
+        with self._executor_lock:
+            if self._executor is None:
+                # Spawned rather than forked, so workers never inherit Qt's threads
+                self._executor = ProcessPoolExecutor(
+                    max_workers=self.processes,
+                    mp_context=multiprocessing.get_context("spawn"),
+                )
+            return self._executor
+
+    def _drop_executor(self):
+        """Shut the worker process pool down; the next miss starts a new one."""
+        with self._executor_lock:
+            executor, self._executor = self._executor, None
+        if executor is not None:
+            executor.shutdown(wait=False, cancel_futures=True)
+
+    def _on_loaded(self, path, qimage, source_size):
+        """Cache a finished thumbnail as a QPixmap (GUI thread)."""
+        if path not in self._pending:
+            return # cancelled or cleared while loading
+        self._pending.discard(path)
+
+        if qimage is None:
+            return # not cached, so it is asked for again when next visible
+
+        pixmap = None if qimage.isNull() else QPixmap.fromImage(qimage)
+        cost = pixmap_cost(pixmap) if pixmap is not None else 64
+        self.cache.put(path, (pixmap, source_size), cost)
+        self.thumbnail_ready.emit(path)
+
+class ThumbnailModel(QAbstractListModel):
+    """
+    List model that exposes the current folder's images to the grid view.
+
+    Thumbnails come from the ThumbnailLoader's memory cache; cells whose
+    thumbnail isn't loaded yet show a blank tile. The model never starts
+    loads itself: the grid asks for the rows it shows (see `ThumbnailGrid`).
+    """
+    def __init__(self, loader, parent=None):
+        """
+        Parameters
+        ----------
+        loader : ThumbnailLoader
+            Source of thumbnail pixmaps.
+        parent : QObject or None, optional
+            Parent object, if any.
+        """
+        super().__init__(parent)
+
+        self.loader = loader
+        self.loader.thumbnail_ready.connect(self._on_thumbnail_ready)
+
+        self._paths = []
+        self._rows = None # path -> row, built on first use
+
+        # Blank tile shown until a thumbnail arrives or when decoding failed
+        blank = QPixmap(THUMB_SIZE, THUMB_SIZE * 2 // 3)
+        blank.fill(QColor("#e0e0e0"))
+        self._blank = QIcon(blank)
+
+    def set_paths(self, paths):
+        """Replace the listed images with a copy of `paths`."""
+        self.beginResetModel()
+        self._paths = list(paths)
+        self._rows = None
+        self.endResetModel()
+
+    def path(self, row):
+        """Return the image path shown in `row`."""
+        return self._paths[row]
+
+    def rowCount(self, parent=QModelIndex()):
+        """Reimplemented QAbstractListModel method."""
+        return 0 if parent.isValid() else len(self._paths)
+
+    def data(self, index, role=Qt.DisplayRole):
+        """Reimplemented QAbstractListModel method."""
+        if not index.isValid():
+            return None
+        path = self._paths[index.row()]
+
+        if role == Qt.DisplayRole:
+            return os.path.basename(path)
+        if role == Qt.ToolTipRole:
+            return path
+        if role == Qt.DecorationRole:
+            # QIcon (unlike a bare QPixmap) is scaled down to the view's iconSize
+            entry = self.loader.get(path)
+            if entry is None or entry[0] is None:
+                return self._blank
+            return QIcon(entry[0])
+        return None
+
+    def _on_thumbnail_ready(self, path):
+        """Repaint the cell whose thumbnail just arrived."""
+        if self._rows is None:
+            self._rows = {p: row for row, p in enumerate(self._paths)}
+        row = self._rows.get(path)
+        if row is not None:
+            index = self.index(row)
+            self.dataChanged.emit(index, index, [Qt.DecorationRole])
+
+# --------------------------
+# Animation playback
+# --------------------------
+
+def may_be_animated(header):
+    """
+    Return the format of a GIF/WebP that could be animated, from its header.
+
+    Every GIF is a candidate (the frame count is only known after parsing),
+    WebP only if its VP8X chunk has the animation flag set. Anything else,
+    whatever its file extension, is a still image.
+
+    Parameters
+    ----------
+    header : bytes
+        Start of the file, as returned by `read_header`.
+
+    Returns
+    -------
+    str or None
+        "GIF" or "WEBP", or None for still images.
+    """
+    format_name = sniff_format(header)
+    if format_name == "GIF" or (format_name == "WEBP" and webp_is_animated(header)):
+        return format_name
+    return None
+
+def read_animation(path, format_name):
+    """
+    Read an animated GIF/WebP into memory if it really has several frames.
+
+    The whole file is read up front so it is not kept open (or locked) while
+    the animation plays.
+
+    Parameters
+    ----------
+    path : str
+        Filesystem path to the image file.
+    format_name : str
+        Sniffed format, from `may_be_animated`.
+
+    Returns
+    -------
+    tuple[QByteArray, int] or None
+        File contents and the loop count reported by Qt (-1 loops forever),
+        or None if the file can't be read or has a single frame.
+    """
+    contents = read_file(path)
+    if contents is None:
+        return None
+    data = QByteArray(contents)
+
+    buffer = QBuffer()
+    buffer.setData(data)
+    if not buffer.open(QBuffer.ReadOnly):
+        return None
+
+    # Only treat as animated if it has more than one frame
+    reader = QImageReader(buffer, format_name.lower().encode())
+    if not reader.supportsAnimation() or reader.imageCount() <= 1:
+        return None
+    return data, reader.loopCount()
+
+class AnimationSignals(QObject):
+    """Signals emitted by AnimationDecodeTask."""
+    frame_decoded = Signal(int, object, int) # (frame index, QImage, delay in ms)
+    streaming = Signal()                     # frames no longer fit the cache
+    pass_finished = Signal(int)              # frame count, after every pass over the file
+
+class AnimationDecodeTask(QRunnable):
+    """
+    Worker-thread job that decodes the frames of an animation in order.
+
+    While every frame decoded so far fits in `cache_bytes`, frames are sent
+    as fast as they decode and the task ends after one pass: the player
+    keeps them all. Past that limit the task switches to streaming and
+    keeps decoding pass after pass, but only as far ahead of playback as
+    the player's `ahead` semaphore allows.
+    """
+    def __init__(self, data, loops, signals, cancelled, ahead, cache_bytes):
+        """
+        Parameters
+        ----------
+        data : QByteArray
+            Contents of the animated file.
+        loops : int
+            Number of passes to decode when streaming, or -1 for no limit.
+        signals : AnimationSignals
+            Receives the decoded frames.
+        cancelled : threading.Event
+            Set by the player to stop the task.
+        ahead : threading.Semaphore
+            One token per frame the task may decode ahead of playback.
+        cache_bytes : int
+            Memory cap for caching every frame.
+        """
+        super().__init__()
+        self.data = data
+        self.loops = loops
+        self.signals = signals
+        self.cancelled = cancelled
+        self.ahead = ahead
+        self.cache_bytes = cache_bytes
+
+    def run(self):
+        """Reimplemented QRunnable method. Runs on a pool thread."""
+        caching = True
+        cost = 0
+        passes = 0
+
+        while not self.cancelled.is_set():
+            buffer = QBuffer()
+            buffer.setData(self.data)
+            buffer.open(QBuffer.ReadOnly)
+            reader = QImageReader(buffer)
+
+            index = 0
+            while not self.cancelled.is_set():
+                image = reader.read()
+                if image.isNull():
+                    break
+                delay = reader.nextImageDelay()
+
+                if caching:
+                    cost += image.sizeInBytes()
+                    if cost > self.cache_bytes:
+                        caching = False
+                        self.signals.streaming.emit()
+
+                if not caching:
+                    # Waits for playback to use up a frame (or for a cancel)
+                    while not self.ahead.acquire(timeout=0.1):
+                        if self.cancelled.is_set():
+                            return
+
+                self.signals.frame_decoded.emit(index, image, delay)
+                index += 1
+
+            if self.cancelled.is_set():
+                return
+
+            self.signals.pass_finished.emit(index)
+            passes += 1
+            if caching or index == 0 or passes == self.loops:
+                return # all cached, unreadable, or played out
+
+class AnimationPlayer(QObject):
+    """
+    Plays an animated GIF or WebP from memory.
+
+    Frames are decoded in order on a worker thread (see AnimationDecodeTask).
+    If the decoded frames fit in ANIMATION_CACHE_BYTES (or in what the
+    memory budget has left, if less) they are all kept as QPixmaps, and
+    after the first pass playback costs nothing but the repaints. Bigger
+    animations are streamed: only a few frames are decoded ahead of
+    playback, and the file is decoded again on every loop.
+
+    Playback follows each frame's own delay on a monotonic clock. When a
+    frame is shown late, the frames whose time has already passed are
+    skipped rather than played back fast, so the animation keeps its speed.
+    """
+    # Emitted on the GUI thread with every frame that should be shown
+    frame_changed = Signal(object) # QPixmap
+
+    def __init__(self, data, loop_count, pool, residency=None, parent=None):
+        """
+        Parameters
+        ----------
+        data : QByteArray
+            Contents of the animated file.
+        loop_count : int
+            Loop count reported by Qt: -1 loops forever, otherwise the
+            animation plays `loop_count + 1` times.
+        pool : QThreadPool
+            Pool the decoder runs on.
+        residency : ResidencyManager or None, optional
+            Shared memory budget the file and cached frames are charged to.
+        parent : QObject or None, optional
+            Parent object, if any.
+        """
+        super().__init__(parent)
+
+        self.data = data
+        self.plays = -1 if loop_count < 0 else loop_count + 1
+        self._pool = pool
+        self._residency = residency
+        self._cached_bytes = 0    # cost of the pixmaps in _frames
+
+        self._frames = []         # cached (QPixmap, delay) in frame order
+        self._frame_count = None  # known once the cache holds a full pass
+        self._queue = deque()     # streamed (index, QImage or QPixmap, delay, holds token) not shown yet
+        self._streaming = False
+
+        self._next_index = 0      # frame to show next, within the current pass
+        self._plays_done = 0
+        self._due = 0             # clock time (ms) when the next frame is due
+        self._waiting = False     # the next frame hasn't been decoded yet
+        self._paused_at = None
+        self._stopped = False
+
+        self._clock = QElapsedTimer()
+        self._timer = QTimer(self)
+        self._timer.setSingleShot(True)
+        self._timer.setTimerType(Qt.PreciseTimer)
+        self._timer.timeout.connect(self._advance)
+
+        self._cancelled = threading.Event()
+        self._ahead = threading.Semaphore(ANIMATION_STREAM_AHEAD)
+        self._signals = AnimationSignals()
+        self._signals.frame_decoded.connect(self._on_frame_decoded)
+        self._signals.streaming.connect(self._on_streaming)
+        self._signals.pass_finished.connect(self._on_pass_finished)
+
+    @property
+    def is_cached(self):
+        """True once every frame is decoded and kept in memory."""
+        return self._frame_count is not None
+
+    def start(self):
+        """Start decoding; the first frame is shown as soon as it is ready."""
+        self._clock.start()
+        self._due = 0
+        self._waiting = True
+
+        cache_bytes = ANIMATION_CACHE_BYTES
+        if self._residency is not None:
+            self._charge()
+            cache_bytes = min(cache_bytes, self._residency.available())
+
+        self._pool.start(AnimationDecodeTask(
+            self.data, self.plays, self._signals,
+            self._cancelled, self._ahead, cache_bytes,
+        ))
+
+    def stop(self):
+        """Stop playback and the decoder, and free the decoded frames."""
+        self._stopped = True
+        self._cancelled.set()
+        self._timer.stop()
+        self._frames.clear()
+        self._queue.clear()
+        if self._residency is not None:
+            self._residency.release(self)
+
+    def _charge(self):
+        """Report the file and the cached frames to the memory budget."""
+        if self._residency is not None and not self._stopped:
+            self._residency.charge(self, self.data.size() + self._cached_bytes)
+
+    def set_paused(self, paused):
+        """Pause or resume playback where it left off."""
+        if self._stopped or paused == (self._paused_at is not None):
+            return
+        if paused:
+            self._paused_at = self._clock.elapsed()
+            self._timer.stop()
+            return
+
+        # Shifts the schedule by the time spent paused
+        self._due += self._clock.elapsed() - self._paused_at
+        self._paused_at = None
+        self._advance()
+
+    def _take_next(self):
+        """
+        Return the next frame as (QPixmap or QImage, delay), or None if it
+        isn't decoded yet. Returns False once the animation has played out.
+        """
+        if self._frame_count is not None and self._next_index >= self._frame_count:
+            self._next_index = 0
+            self._plays_done += 1
+        if self.plays > 0 and self._plays_done >= self.plays:
+            return False
+
+        if self._next_index < len(self._frames):
+            frame = self._frames[self._next_index]
+        elif self._queue:
+            index, image, delay, token = self._queue[0]
+            if index != self._next_index:
+                if index != 0:
+                    return None
+                # The decoder started its next pass
+                self._next_index = 0
+                self._plays_done += 1
+                if self.plays > 0 and self._plays_done >= self.plays:
+                    return False
+            self._queue.popleft()
+            if token:
+                self._ahead.release() # lets the decoder read one more frame
+            frame = (image, delay)
+        else:
+            return None
+
+        self._next_index += 1
+        return frame
+
+    def _advance(self):
+        """Show whichever frame is due now and schedule the next one."""
+        if self._stopped or self._paused_at is not None:
+            return
+
+        now = self._clock.elapsed()
+        if now - self._due > ANIMATION_MAX_LAG_MS:
+            self._due = now # too far behind to catch up by skipping
+
+        shown = None
+        frame = None
+        while self._due <= now:
+            frame = self._take_next()
+            if frame is False:
+                break # played out; the last frame stays up
+            if frame is None:
+                self._waiting = True
+                break
+            shown = frame
+            self._due += frame[1]
+
+        if shown is not None:
+            image = shown[0]
+            pixmap = image if isinstance(image, QPixmap) else QPixmap.fromImage(image)
+            self.frame_changed.emit(pixmap)
+
+        if not self._waiting and frame is not False:
+            self._timer.start(max(0, self._due - now))
+
+    def _on_frame_decoded(self, index, image, delay):
+        """Cache or queue a decoded frame (GUI thread)."""
+        if self._stopped:
+            return
+
+        # Zero or tiny delays are played at the usual browser default
+        if delay < ANIMATION_MIN_DELAY_MS:
+            delay = ANIMATION_DEFAULT_DELAY_MS
+
+        if self._streaming:
+            self._queue.append((index, image, delay, True))
+        else:
+            pixmap = QPixmap.fromImage(image)
+            self._frames.append((pixmap, delay))
+            self._cached_bytes += pixmap_cost(pixmap)
+            self._charge()
+
+        if self._waiting:
+            # A late frame is shown now and the schedule restarts from it
+            self._waiting = False
+            self._due = max(self._due, self._clock.elapsed())
+            self._advance()
+
+    def _on_streaming(self):
+        """Drop the frame cache once the animation turns out too big (GUI thread)."""
+        if self._stopped:
+            return
+        self._streaming = True
+
+        # Frames not shown yet move to the stream queue; the rest are freed
+        for index in range(self._next_index, len(self._frames)):
+            pixmap, delay = self._frames[index]
+            self._queue.append((index, pixmap, delay, False))
+        self._frames = []
+        self._cached_bytes = 0
+        self._charge()
+
+    def _on_pass_finished(self, frame_count):
+        """Mark the cache complete after a pass that fit in memory (GUI thread)."""
+        if self._stopped or self._streaming:
+            return
+        self._frame_count = frame_count
+        if self._waiting:
+            self._waiting = False
+            self._advance()
+
+# --------------------------
+# Multi-page images
+# --------------------------
+
+# TIFF header magic -> (first directory offset position, entry count bytes, entry bytes, offset bytes)
+_TIFF_LAYOUTS = {42: (4, 2, 12, 4), 43: (8, 8, 20, 8)} # classic TIFF, BigTIFF
+_TIFF_VALUE_BYTES = {3: 2, 4: 4, 16: 8}          # SHORT, LONG, LONG8
+
+def read_tiff_page_sizes(file):
+    """
+    List the pages of a TIFF by walking its directory chain.
+
+    Only the directories are read, a few hundred bytes per page, so even a
+    500-page fax is listed in a few milliseconds. Reduced-resolution pages
+    (previews of another page) are left out.
+
+    Parameters
+    ----------
+    file : file object
+        TIFF file opened in binary mode.
+
+    Returns
+    -------
+    list[tuple[int, QSize]]
+        (directory index, page size) of every full-resolution page.
+    """
+    header = file.read(16)
+    byteorder = "little" if header[:2] == b"II" else "big"
+    layout = _TIFF_LAYOUTS.get(int.from_bytes(header[2:4], byteorder))
+    if layout is None:
+        return []
+    first, count_bytes, entry_bytes, offset_bytes = layout
+    offset = int.from_bytes(header[first:first + offset_bytes], byteorder)
+
+    pages = []
+    seen = set()
+    while offset and offset not in seen and len(seen) < MAX_PAGES:
+        seen.add(offset)
+        file.seek(offset)
+        count = int.from_bytes(file.read(count_bytes), byteorder)
+        block = file.read(count * entry_bytes + offset_bytes)
+        if len(block) < count * entry_bytes + offset_bytes:
+            break # truncated file
+
+        tags = {}
+        for start in range(0, count * entry_bytes, entry_bytes):
+            tag = int.from_bytes(block[start:start + 2], byteorder)
+            if tag not in (254, 256, 257): # NewSubfileType, ImageWidth, ImageLength
+                continue
+            value_bytes = _TIFF_VALUE_BYTES.get(int.from_bytes(block[start + 2:start + 4], byteorder))
+            if value_bytes is not None:
+                # A single value sits at the start of the entry's value field
+                value_start = start + entry_bytes - offset_bytes
+                tags[tag] = int.from_bytes(block[value_start:value_start + value_bytes], byteorder)
+
+        width, height = tags.get(256, 0), tags.get(257, 0)
+        if width and height and not tags.get(254, 0) & 1:
+            pages.append((len(seen) - 1, QSize(width, height)))
+        offset = int.from_bytes(block[-offset_bytes:], byteorder)
+    return pages
+
+def read_ico_page_sizes(file):
+    """
+    List the entries of an ICO file from its directory.
+
+    Parameters
+    ----------
+    file : file object
+        ICO file opened in binary mode.
+
+    Returns
+    -------
+    list[tuple[int, QSize]]
+        (entry index, size) of every entry, in file order. Entries of 256
+        pixels or more are listed as 256, as the directory records them.
+    """
+    header = file.read(6)
+    count = int.from_bytes(header[4:6], "little")
+    directory = file.read(16 * count)
+    return [
+        (index, QSize(directory[start] or 256, directory[start + 1] or 256))
+        for index, start in enumerate(range(0, len(directory) - 15, 16))
+    ]
+
+def read_page_sizes(path, format_name):
+    """
+    List the pages of a multi-page file without decoding any pixels.
+
+    Parameters
+    ----------
+    path : str
+        Filesystem path to the image file.
+    format_name : str or None
+        Format from `sniff_format`.
+
+    Returns
+    -------
+    list[tuple[int, QSize]]
+        (page number for `DecoderRegistry.read_page`, page size) of every
+        page. Empty for formats outside PAGED_FORMATS and unreadable files.
     """
+    readers = {
+        "TIFF": read_tiff_page_sizes,
+        "ICO": read_ico_page_sizes,
+    }
+    reader = readers.get(format_name)
+    if reader is None:
+        return []
     try:
-        img = Image.open(path) 
+        with open(path, "rb") as file:
+            return reader(file)
+    except OSError:
+        return []
 
-        # If animated, use first frame
-        if getattr(img, "is_animated", False):
-            img.seek(0)
-            
-        qimage = ImageQt(img)
-        pixmap = QPixmap.fromImage(qimage)
-        return pixmap
-    
-    except Exception:
-        return QPixmap()
+def default_page(pages, format_name):
+    """
+    Return the position in `pages` to open a multi-page file at.
 
-def load_pixmap(path):
+    Icons open at their largest entry, everything else at the first page.
     """
-    Load an image from disk into a QPixmap with multiple fallbacks.
+    if format_name == "ICO":
+        return max(range(len(pages)), key=lambda i: pages[i][1].width() * pages[i][1].height())
+    return 0
 
-    Order of attempts:
-    1. Use QPixmap(path) directly (Qt plugins handle common formats).
-    2. Fall back to Pillow for formats like HEIC/AVIF.
-    3. If all loading fails, create a placeholder pixmap that displays an error
-       message and the filename.
+class PageSignals(QObject):
+    """Signals emitted by PageTask."""
+    finished = Signal(object, object, object) # (page key, QImage, full-resolution QSize)
 
-    Parameters
-    ----------
-    path : str
-        Filesystem path to the image file.
+class PageTask(QRunnable):
+    """
+    Worker-thread job that decodes one page of a multi-page file.
+    """
+    def __init__(self, key, format_name, target_size, signals, running):
+        """
+        Parameters
+        ----------
+        key : tuple
+            (path, page, full resolution?).
+        format_name : str
+            Format from `sniff_format`.
+        target_size : QSize or None
+            Device-pixel area to decode for, or None for full resolution.
+        signals : PageSignals
+            Receives the decoded page.
+        running : PageLoader
+            Loader that tracks which pages are being decoded right now.
+        """
+        super().__init__()
+        self.key = key
+        self.format_name = format_name
+        self.target_size = target_size
+        self.signals = signals
+        self.running = running
+
+    def run(self):
+        """Reimplemented QRunnable method. Runs on a pool thread."""
+        self.running.mark_running(self.key, True)
+        try:
+            path, page, _ = self.key
+            qimage, source_size = DECODERS.read_page(path, self.format_name, page, self.target_size)
+        finally:
+            self.running.mark_running(self.key, False)
+        self.signals.finished.emit(self.key, qimage, source_size)
 
-    Returns
-    -------
-    QPixmap
-        Loaded or placeholder pixmap.
+class PageLoader(QObject):
     """
-    # Tries to use Qt
-    pixmap = QPixmap(path)
-    if not pixmap.isNull():
-        return pixmap
+    Decodes the pages of multi-page files in the background and caches them.
 
-    # Falls back on Pillow
-    pixmap = load_with_pillow(path)
-    if not pixmap.isNull():
-        return pixmap
+    Works like `TileLoader`: only the pages last asked for by `request` (the
+    current page, then its neighbors) stay queued, so paging quickly
+    through a long document never waits for pages already skipped. Pages
+    are cached as (QPixmap, full-resolution QSize) with their own byte
+    budget.
+    """
+    # Emitted on the GUI thread with the key of every finished page, even
+    # if it failed (then `get` returns None)
+    page_ready = Signal(object)
 
-    # Falls back and creats a pixmap placholder
-    width  = 800
-    height = 600
-    filename = os.path.basename(path)
+    def __init__(self, max_bytes=PAGE_CACHE_BYTES, threads=PAGE_THREADS, residency=None, parent=None):
+        """
+        Parameters
+        ----------
+        max_bytes : int, optional
+            Memory cap for cached pages.
+        threads : int, optional
+            Number of decoder threads.
+        residency : ResidencyManager or None, optional
+            Shared memory budget; pages count as neighbors.
+        parent : QObject or None, optional
+            Parent object, if any.
+        """
+        super().__init__(parent)
 
-    pixmap = QPixmap(width, height)
-    pixmap.fill(QColor("#0A1320"))
+        self.cache = LRUCache(max_bytes, residency, RESIDENCY_NEIGHBOR) # page key -> (QPixmap, QSize)
 
-    painter = QPainter(pixmap)
-    painter.setRenderHint(QPainter.Antialiasing)
+        self._pool = QThreadPool(self)
+        self._pool.setMaxThreadCount(max(1, threads))
 
-    rect = pixmap.rect()
+        self._wanted = ()         # keys of the last request, in priority order
+        self._pending = set()     # keys queued or being decoded
+        self._running = set()     # keys a worker is decoding right now
+        self._running_lock = threading.Lock()
 
-    # Splits pixmap into two rectangles
-    top_rect = QRectF(rect.left(), rect.top(), rect.width(), rect.height() * 0.84)
-    bottom_rect = QRectF(rect.left(), rect.height() * 0.20, rect.width(), rect.height() * 0.66)
+        self._signals = PageSignals()
+        self._signals.finished.connect(self._on_page)
 
-    # Draws main message
-    painter.setPen(Qt.white)
-    painter.setFont(QFont("Inter", 26, QFont.Weight.Bold))
-    painter.drawText(top_rect, Qt.AlignCenter, "Unable to load image")
+    @staticmethod
+    def page_key(path, page, full=False):
+        """Return the cache key of a page decoded for the display, or at full resolution."""
+        return (path, page, full)
 
-    # Draws filename
-    painter.setFont(QFont("Inter", 12))
+    def get(self, key):
+        """Return the cached (QPixmap, full-resolution QSize) for a page key, or None."""
+        return self.cache.get(key)
 
-    metrics = painter.fontMetrics()
-    max_width = bottom_rect.width() - 40
-    display_name = metrics.elidedText(filename, Qt.ElideMiddle, int(max_width))
+    def mark_running(self, key, running):
+        """Record that a worker started or finished a page (any thread)."""
+        with self._running_lock:
+            if running:
+                self._running.add(key)
+            else:
+                self._running.discard(key)
 
-    painter.drawText(bottom_rect, Qt.AlignCenter, display_name)
-   
-    painter.end()
+    def request(self, path, format_name, pages, target_size):
+        """
+        Make `pages` of `path` the pages to decode, in priority order.
 
-    return pixmap
+        Queued pages that are not in `pages` are cancelled; pages already
+        being decoded finish and are cached.
+
+        Parameters
+        ----------
+        path : str
+            Multi-page file.
+        format_name : str
+            Format from `sniff_format`.
+        pages : list[int]
+            Page numbers, the one on screen first.
+        target_size : QSize
+            Device-pixel area the pages will be fitted into.
+        """
+        keys = tuple(
+            key for key in (self.page_key(path, page) for page in pages)
+            if key not in self.cache
+        )
+        if keys == self._wanted:
+            return
+        self._wanted = keys
+
+        self._pool.clear()
+        with self._running_lock:
+            self._pending = set(self._running)
+
+        for key in keys:
+            if key in self._pending:
+                continue
+            self._pending.add(key)
+            self._pool.start(PageTask(key, format_name, target_size, self._signals, self))
+
+    def request_full(self, path, format_name, page, target_size=None):
+        """
+        Decode one page at full resolution, ahead of everything queued.
+
+        Parameters
+        ----------
+        target_size : QSize or None, optional
+            Size to cap the decode at, when the full page doesn't fit the
+            memory budget.
+        """
+        key = self.page_key(path, page, True)
+        if key in self.cache or key in self._pending:
+            return
+        self._pending.add(key)
+        self._pool.start(PageTask(key, format_name, target_size, self._signals, self), 1)
+
+    def discard(self, path):
+        """Forget every page of a file (e.g. after it changed on disk)."""
+        for key in self.cache.keys():
+            if key[0] == path:
+                self.cache.discard(key)
+        self._pending = {key for key in self._pending if key[0] != path}
+        self._wanted = ()
+
+    def clear(self):
+        """Drop all cached pages and ignore any decodes still in flight."""
+        self._pool.clear()
+        self._wanted = ()
+        self._pending.clear()
+        self.cache.clear()
+
+    def shutdown(self):
+        """Cancel queued work and wait for running decodes to finish."""
+        self.clear()
+        self._pool.waitForDone()
+
+    def _on_page(self, key, qimage, source_size):
+        """Cache a finished page as a QPixmap (GUI thread)."""
+        if key not in self._pending:
+            return # cancelled or cleared while decoding
+        self._pending.discard(key)
+
+        if not qimage.isNull():
+            pixmap = QPixmap.fromImage(qimage)
+            self.cache.put(key, (pixmap, source_size), pixmap_cost(pixmap))
+        self.page_ready.emit(key)
+
+# --------------------------
+# Single instance server
+# --------------------------
+
+class InstanceServer(QObject):
+    """
+    Local socket server through which later launches reach this viewer.
+
+    Each client sends one UTF-8 line: the absolute path to open, or an empty
+    line to just bring the window to the front (see
+    `forward_to_running_instance`).
+    """
+    open_requested = Signal(str) # path, or "" for none
+
+    def __init__(self, parent=None):
+        """
+        Parameters
+        ----------
+        parent : QObject or None, optional
+            Parent object, if any.
+        """
+        super().__init__(parent)
+
+        self._server = QLocalServer(self)
+        self._server.setSocketOptions(QLocalServer.UserAccessOption)
+        self._server.newConnection.connect(self._on_new_connection)
+        self._buffers = {} # socket -> bytes received so far
+
+    def listen(self):
+        """
+        Start accepting launches. Return False if another viewer already is.
+
+        A socket file left behind by a viewer that crashed is removed first,
+        but only when no viewer answers on it.
+        """
+        name = instance_server_name()
+        if self._server.listen(name):
+            return True
+        if self._server.serverError() != QLocalSocket.AddressInUseError:
+            return False
+
+        probe = QLocalSocket()
+        probe.connectToServer(name)
+        if probe.waitForConnected(INSTANCE_CONNECT_TIMEOUT_MS):
+            probe.disconnectFromServer()
+            return False
+        QLocalServer.removeServer(name)
+        return self._server.listen(name)
+
+    def close(self):
+        """Stop accepting launches."""
+        self._server.close()
+
+    def _on_new_connection(self):
+        """Start reading every pending client."""
+        while self._server.hasPendingConnections():
+            socket = self._server.nextPendingConnection()
+            self._buffers[socket] = b""
+            socket.readyRead.connect(lambda s=socket: self._on_ready_read(s))
+            socket.disconnected.connect(lambda s=socket: self._on_disconnected(s))
+            # Data may have arrived before the signals were connected
+            self._on_ready_read(socket)
+
+    def _on_ready_read(self, socket):
+        """Emit `open_requested` once a client's line is complete."""
+        if socket not in self._buffers:
+            return
+        self._buffers[socket] += bytes(socket.readAll())
+        line, newline, _ = self._buffers[socket].partition(b"\n")
+        if not newline:
+            return
+        del self._buffers[socket]
+        socket.disconnectFromServer()
+        self.open_requested.emit(line.decode("utf-8", "replace"))
+
+    def _on_disconnected(self, socket):
+        """Drop a client, including one that left without a full line."""
+        self._buffers.pop(socket, None)
+        socket.deleteLater()
+
+# --------------------------
+# Startup profile
+# --------------------------
+
+def startup_profile_enabled():
+    """Return True if IMAGE_VIEWER_PROFILE_STARTUP is set to 1."""
+    return os.environ.get("IMAGE_VIEWER_PROFILE_STARTUP", "") == "1"
+
+class StartupProfiler(QObject):
+    """
+    Reports where the time to a visible window went.
+
+    Enabled with IMAGE_VIEWER_PROFILE_STARTUP=1. Once the window's first
+    frame is painted, and the initial image (if any) is at full quality, a
+    breakdown is printed to stderr: module imports by group (from
+    `STARTUP_MARKS`), the steps `main` marks, time to first frame, time to
+    the image's first pixel and full quality, and the modules `lazy_import`
+    has loaded so far. Times are measured from the first line of this script,
+    so interpreter startup is not included (`python -X importtime` shows
+    the imports in more detail).
+    """
+    def __init__(self, parent=None):
+        """
+        Parameters
+        ----------
+        parent : QObject or None, optional
+            Parent object, if any.
+        """
+        super().__init__(parent)
+
+        self.marks = list(STARTUP_MARKS)
+        self._widget = None
+        self._waiting_for_image = False
+        self._reported = False
+
+    def mark(self, name):
+        """Record that the step `name` just finished."""
+        self.marks.append((name, time.perf_counter()))
+
+    def watch(self, window, expect_image):
+        """
+        Time the first frame of `window`, and its first image if `expect_image`.
+        """
+        self._widget = window.image_widget
+        self._widget.installEventFilter(self)
+        self._waiting_for_image = expect_image
+        if expect_image:
+            window.first_pixel_shown.connect(self._on_first_pixel)
+            window.full_quality_shown.connect(self._on_full_quality)
+        QTimer.singleShot(STARTUP_PROFILE_TIMEOUT_MS, self.report)
+
+    def eventFilter(self, obj, event):
+        """Mark the first paint of the image widget."""
+        if obj is self._widget and event.type() == QEvent.Paint:
+            self._widget.removeEventFilter(self)
+            self.mark("first frame")
+            if not self._waiting_for_image:
+                QTimer.singleShot(0, self.report)
+        return False
+
+    def _on_first_pixel(self, path, ms):
+        """Mark the first pixel of the initial image."""
+        self.mark(f"first pixel of {os.path.basename(path)}")
+
+    def _on_full_quality(self, path, ms):
+        """Mark the initial image at full quality and report."""
+        self.mark(f"full quality of {os.path.basename(path)}")
+        self._waiting_for_image = False
+        if all(name != "first frame" for name, _ in self.marks):
+            return # reported after the first paint
+        QTimer.singleShot(0, self.report)
+
+    def report(self):
+        """Print the breakdown to stderr, once."""
+        if self._reported:
+            return
+        self._reported = True
+
+        start = self.marks[0][1]
+        lines = ["Startup profile (ms since the script started; step = time since the previous line)"]
+        previous = start
+        for name, when in self.marks[1:]:
+            lines.append(f"  {name:<40} {(when - start) * 1000:8.1f}   step {(when - previous) * 1000:7.1f}")
+            previous = when
+        if LAZY_IMPORT_MS:
+            lines.append("Imported on first use:")
+            for name, ms in LAZY_IMPORT_MS.items():
+                lines.append(f"  {name:<40} {ms:8.1f}")
+        print("\n".join(lines), file=sys.stderr, flush=True)
 
 # --------------------------
 # Classes
@@ -190,9 +5094,31 @@ class ImageWidget(QWidget):
     - Draw the pixmap scaled and centered in the available space.
     - Support zooming via mouse wheel.
     - Support panning via click-and-drag when the image is larger than the widget.
-    - Optionally update frames for an active animation (QMovie).
+    - Optionally update frames for an active animation (AnimationPlayer).
+    - Turn the pages of a multi-page file (`set_page`).
+
+    The smoothly scaled image is cached per (pixmap, zoom, device pixel
+    ratio), so repaints that only move the image, such as panning, are plain
+    blits instead of a full rescale.
+
+    While wheel or pan input is coming in, repaints skip that smooth rescale
+    and draw a halved (mip) copy of the pixmap, or a coarser tile level, with
+    cheap filtering. Once input has been idle for INTERACTION_SETTLE_MS, a
+    single high-quality repaint follows.
+
+    Zoom and pan are measured against the full-resolution size of the image,
+    which may be larger than the pixmap when a reduced decode is shown.
+    `resolution_needed` asks the owner for a full decode once the current
+    zoom needs more pixels than the pixmap has.
+
+    Very large images are shown in tiled mode (`set_tiled_source`): only the
+    tiles under the viewport are drawn, from the pyramid level that matches
+    the zoom, and they are decoded in the background by `tile_loader`.
     """
-    def __init__(self, parent=None): # Accepts a parent or none
+    # Emitted when the zoom outgrows a reduced-resolution pixmap
+    resolution_needed = Signal()
+
+    def __init__(self, parent=None, residency=None): # Accepts a parent or none
         """
         Initialize the image display widget.
 
@@ -200,22 +5126,47 @@ class ImageWidget(QWidget):
         ----------
         parent : QWidget or None, optional
             Parent widget, if any.
+        residency : ResidencyManager or None, optional
+            Shared memory budget for the scaled renders and tiles.
         """
         super().__init__(parent)
+        self.residency = residency
         
         # Zoom state variables
         self._pixmap = None # Accepts QPixmap or None
-        self._zoom_factor = 1.0 # Original QPixmap size
+        self._image_size = QSize() # Full-resolution size of the image
+        self._upgrade_requested = False # resolution_needed already emitted
+        self._zoom_factor = 1.0 # Original image size
         self._min_zoom = 0.05   # 5%
         self._max_zoom = 10.0   # 1000%
         self._user_zoomed = False # Tracks user zooming
 
+        # Scaled render cache
+        self._scaled_key = None # (pixmap cacheKey, zoom, device pixel ratio)
+        self._scaled_render = None # QPixmap at on-screen size
+
+        # Interactive (two-tier) rendering
+        self._interacting = False # wheel/pan input is active
+        self._mip_key = None # pixmap cacheKey the mip levels were built from
+        self._mip_levels = [] # pixmap halved 0, 1, 2... times
+        self._settle_timer = QTimer(self)
+        self._settle_timer.setSingleShot(True)
+        self._settle_timer.timeout.connect(self.end_interaction)
+
+        # Tiled mode state variables
+        self._tiled = None # TiledImageSource or None
+        self.tile_loader = TileLoader(residency=residency, parent=self)
+        self.tile_loader.tile_ready.connect(self.update)
+
         # Pan state variables
         self._pan_active = False
         self._pan_start = None  # QPoint (2D coordinate)
         self._pan_offset_x = 0
         self._pan_offset_y = 0
 
+        # Culling: the image is marked for deletion
+        self._marked = False
+
         # Animation state variables (Qt-only)
         # self._movie = None
         # self._movie_active = False
@@ -229,12 +5180,42 @@ class ImageWidget(QWidget):
         Parameters
         ----------
         pixmap : QPixmap
-            The current frame from a QMovie.
+            The current frame from an AnimationPlayer.
         """
         if not pixmap or pixmap.isNull():
             return
         self._pixmap = pixmap
+        self.invalidate_scaled_render()
+        self.update()
+
+    def set_page(self, pixmap, source_size=None):
+        """
+        Show another page of the same multi-page file.
+
+        When the new page has the same size as the one shown, as the pages
+        of a scanned document usually do, the user's zoom and pan are kept,
+        so a zoomed-in region can be read across pages. Otherwise the view
+        is reset like `set_pixmap`.
+
+        Parameters
+        ----------
+        pixmap : QPixmap
+            Decoded page.
+        source_size : QSize or None, optional
+            Full-resolution size of the page when `pixmap` is a reduced
+            decode. Defaults to the pixmap's own size.
+        """
+        if source_size is None or source_size.isEmpty():
+            source_size = pixmap.size()
+        if not self._user_zoomed or self._tiled is not None or source_size != self._image_size:
+            self.set_pixmap(pixmap, source_size)
+            return
+
+        self._pixmap = pixmap
+        self._upgrade_requested = False
+        self.invalidate_scaled_render()
         self.update()
+        self.check_resolution()
 
     def clamp_pan_to_bounds(self):
         """
@@ -246,7 +5227,7 @@ class ImageWidget(QWidget):
         When the image is larger than the widget, panning is limited so that
         you cannot drag the image completely off-screen.
         """
-        if not self._pixmap or self._pixmap.isNull():
+        if not self.has_image():
             self._pan_offset_x = 0
             self._pan_offset_y = 0
             return
@@ -259,8 +5240,8 @@ class ImageWidget(QWidget):
             self._pan_offset_y = 0
             return
 
-        scaled_width = self._pixmap.width() * self._zoom_factor
-        scaled_height = self._pixmap.height() * self._zoom_factor
+        scaled_width = self._image_size.width() * self._zoom_factor
+        scaled_height = self._image_size.height() * self._zoom_factor
 
         # Horizontal: if the image is narrower than the widget, no horizontal pan.
         if scaled_width <= widget_width:
@@ -282,7 +5263,7 @@ class ImageWidget(QWidget):
             elif self._pan_offset_y < -half_range_y:
                 self._pan_offset_y = -half_range_y
 
-    def set_pixmap(self, pixmap=None): # Accepts QPixmap or None
+    def set_pixmap(self, pixmap=None, source_size=None): # Accepts QPixmap or None
         """
         Set or replace the current image and reset zoom/pan appropriately.
 
@@ -294,13 +5275,63 @@ class ImageWidget(QWidget):
         ----------
         pixmap : QPixmap or None, optional
             New image to display, or None to clear.
+        source_size : QSize or None, optional
+            Full-resolution size of the image when `pixmap` is a reduced
+            decode. Defaults to the pixmap's own size.
         """
+        if self._tiled is not None:
+            self._tiled = None
+            self.tile_loader.clear()
+
         self._pixmap = pixmap
+        self._upgrade_requested = False
+        self.invalidate_scaled_render()
+
+        if source_size is None or source_size.isEmpty():
+            source_size = pixmap.size() if pixmap else QSize()
+        self._image_size = QSize(source_size)
 
+        self._reset_view()
+
+    def set_tiled_source(self, source, preview=None):
+        """
+        Show a very large image as lazily decoded tiles.
+
+        Zoom and pan are reset exactly like `set_pixmap`.
+
+        Parameters
+        ----------
+        source : TiledImageSource
+            Pyramid to draw tiles from.
+        preview : QPixmap or None, optional
+            Low-resolution version of the whole image, drawn under the tiles
+            until they are decoded.
+        """
+        self.tile_loader.clear()
+        self._tiled = source
+        self._pixmap = preview
+        self._upgrade_requested = False
+        self.invalidate_scaled_render()
+        self._image_size = QSize(source.width, source.height)
+
+        self._reset_view()
+
+    def is_tiled(self):
+        """Return True if a tiled image is being shown."""
+        return self._tiled is not None
+
+    def has_image(self):
+        """Return True if there is an image (pixmap or tiled) to display."""
+        if self._tiled is not None:
+            return True
+        return self._pixmap is not None and not self._pixmap.isNull()
+
+    def _reset_view(self):
+        """Fit a newly set image to the widget and clear the pan offsets."""
         # Resets to no user zooming for new images
         self._user_zoomed = False        
 
-        if not self._pixmap or self._pixmap.isNull():
+        if not self.has_image():
             self._zoom_factor = 1.0
             self._pan_offset_x = 0
             self._pan_offset_y = 0            
@@ -309,8 +5340,8 @@ class ImageWidget(QWidget):
 
         if self.width() > 0 and self.height() > 0:
             # Computes scaling needed to make the image fit the widget
-            scale_x = self.width() / self._pixmap.width()
-            scale_y = self.height() / self._pixmap.height()
+            scale_x = self.width() / self._image_size.width()
+            scale_y = self.height() / self._image_size.height()
 
             # Raw zoom that fits the whole image
             ideal_zoom = min(scale_x, scale_y)
@@ -327,6 +5358,68 @@ class ImageWidget(QWidget):
         self._pan_offset_x = 0
         self._pan_offset_y = 0
         self.update()
+        self.check_resolution()
+
+    def upgrade_pixmap(self, pixmap):
+        """
+        Swap in a higher-resolution decode of the current image.
+
+        Unlike `set_pixmap`, zoom and pan are kept, so the switch is invisible
+        apart from the extra detail.
+
+        Parameters
+        ----------
+        pixmap : QPixmap
+            New pixmap of the same image, ideally at full resolution.
+        """
+        if not pixmap or pixmap.isNull() or not self._pixmap or self._tiled is not None:
+            return
+        self._pixmap = pixmap
+        self._upgrade_requested = False
+        self.invalidate_scaled_render()
+        self.update()
+        self.check_resolution()
+
+    def image_size(self):
+        """Return the full-resolution size of the image, even if a reduced decode is shown."""
+        return QSize(self._image_size)
+
+    def pixmap_size(self):
+        """Return the size of the pixmap being shown (empty if there is none)."""
+        if self._pixmap is None:
+            return QSize()
+        return self._pixmap.size()
+
+    def display_size(self):
+        """
+        Return the widget size in device pixels.
+
+        This is the resolution an image needs to be decoded at to fill the
+        widget without visible loss at the fit-to-window zoom.
+        """
+        ratio = self.devicePixelRatioF()
+        return QSize(
+            max(1, math.ceil(self.width() * ratio)),
+            max(1, math.ceil(self.height() * ratio)),
+        )
+
+    def check_resolution(self):
+        """
+        Emit `resolution_needed` if the zoom shows more detail than the pixmap has.
+
+        Only applies to reduced decodes, and fires at most once per pixmap.
+        """
+        if self._tiled is not None or self._upgrade_requested:
+            return # tiles already decode at the right resolution
+        if not self._pixmap or self._pixmap.isNull():
+            return
+        if self._pixmap.width() >= self._image_size.width():
+            return # already full resolution
+
+        needed_width = self._image_size.width() * self._zoom_factor * self.devicePixelRatioF()
+        if needed_width > self._pixmap.width() + 1:
+            self._upgrade_requested = True
+            self.resolution_needed.emit()
 
     def zoom_in(self):
         """Zoom in by a fixed factor (25% increase)."""
@@ -354,14 +5447,14 @@ class ImageWidget(QWidget):
         Currently unused in the viewer: zoom is instead initialized on
         image load based on the widget size.
         """
-        if not self._pixmap or self._pixmap.isNull():
+        if not self.has_image():
             return
 
         if self.width() == 0 or self.height() == 0:
             return
 
-        scale_x = self.width() / self._pixmap.width()
-        scale_y = self.height() / self._pixmap.height()
+        scale_x = self.width() / self._image_size.width()
+        scale_y = self.height() / self._image_size.height()
         self.set_zoom(min(scale_x, scale_y))
 
     def set_zoom(self, zoom):
@@ -380,11 +5473,13 @@ class ImageWidget(QWidget):
             return
         
         self._zoom_factor = zoom
+        self.invalidate_scaled_render()
 
         # Adjust pan so the image doesn't get stuck off-center
         self.clamp_pan_to_bounds()
         
         self.update()
+        self.check_resolution()
 
     def paintEvent(self, event):
         """
@@ -393,20 +5488,52 @@ class ImageWidget(QWidget):
         Handles all drawing: clears the background and draws the current
         pixmap scaled and centered with the current zoom and pan offsets.
         """
-        painter = QPainter(self)
-        
-        # Enables smooth high-quality scaling when zooming   
+        with PERF.span("paint"):
+            painter = QPainter(self)
+            self.paint_image(painter)
+            if self._marked:
+                self.paint_mark(painter)
+            painter.end()
+
+    def set_marked(self, marked):
+        """Show or hide the frame that flags the image as marked for deletion."""
+        if marked != self._marked:
+            self._marked = marked
+            self.update()
+
+    def paint_mark(self, painter):
+        """Draw the marked-for-deletion frame and label."""
+        color = QColor("#d83b3b")
+        pen_width = 6
+        painter.setPen(QPen(color, pen_width))
+        painter.setBrush(Qt.NoBrush)
+        painter.drawRect(QRectF(self.rect()).adjusted(pen_width / 2, pen_width / 2, -pen_width / 2, -pen_width / 2))
+
+        painter.setFont(QFont("Inter", 10, QFont.Weight.Bold))
+        label = "MARKED FOR DELETE"
+        metrics = painter.fontMetrics()
+        box = QRectF(self.width() - metrics.horizontalAdvance(label) - 28, 12,
+                     metrics.horizontalAdvance(label) + 16, metrics.height() + 8)
+        painter.fillRect(box, color)
+        painter.setPen(Qt.white)
+        painter.drawText(box, Qt.AlignCenter, label)
+
+    def paint_image(self, painter):
+        """Draw the background and the image with `painter` (see `paintEvent`)."""
+        # Enables smooth high-quality scaling when zooming (bilinear only,
+        # which is cheap, while wheel/pan input is active)
         painter.setRenderHint(QPainter.RenderHint.SmoothPixmapTransform, True)
 
         # Fills background with Midnight Smoke
         painter.fillRect(self.rect(), QColor("#0A1320"))
 
-        if not self._pixmap or self._pixmap.isNull():
+        if not self.has_image():
             return
 
         # Scales size, keeping aspect ratio via a single zoom factor
-        scaled_width = self._pixmap.width() * self._zoom_factor
-        scaled_height = self._pixmap.height() * self._zoom_factor
+        # (the pixmap itself may be a reduced decode of the image)
+        scaled_width = self._image_size.width() * self._zoom_factor
+        scaled_height = self._image_size.height() * self._zoom_factor
 
         # center the image, then apply pan offsets
         offset_x = (self.width() - scaled_width) / 2.0 + self._pan_offset_x
@@ -418,6 +5545,34 @@ class ImageWidget(QWidget):
             scaled_width,
             scaled_height,
         )
+
+        if self._tiled is not None:
+            self.paint_tiles(painter, target_rect)
+            return
+
+        # Blits the cached scaled image when there is one
+        scaled = self.scaled_render(scaled_width, scaled_height, build=not self._interacting)
+
+        if scaled is None and self._interacting:
+            # Skips the smooth rescale until input settles. Bilinear from a
+            # mip level within 2x of the screen size looks close to it;
+            # anything bigger is drawn with nearest-neighbor to stay fast.
+            device_width = scaled_width * self.devicePixelRatioF()
+            mip = self.mip_pixmap(device_width, build=False)
+            if mip.width() >= 2 * device_width:
+                painter.setRenderHint(QPainter.RenderHint.SmoothPixmapTransform, False)
+            painter.drawPixmap(target_rect, mip, QRectF(mip.rect()))
+            return
+
+        if scaled is not None:
+            # Snaps to whole device pixels so the blit is not resampled
+            ratio = self.devicePixelRatioF()
+            painter.drawPixmap(
+                QPointF(round(offset_x * ratio) / ratio, round(offset_y * ratio) / ratio),
+                scaled,
+            )
+            return
+
         source_rect = QRectF(
             0.0,
             0.0,
@@ -427,6 +5582,207 @@ class ImageWidget(QWidget):
 
         painter.drawPixmap(target_rect, self._pixmap, source_rect)
 
+    def scaled_render(self, scaled_width, scaled_height, build=True):
+        """
+        Return the current pixmap smoothly scaled to its on-screen size.
+
+        The rescale runs once per (pixmap, zoom, device pixel ratio) and is
+        reused by every repaint after that. Returns None when the scaled image
+        would be larger than SCALED_CACHE_MAX_PIXELS (zoomed far in) or than
+        what the memory budget has left; the caller then lets QPainter scale
+        just the visible part.
+
+        Parameters
+        ----------
+        scaled_width, scaled_height : float
+            Size of the whole image on screen, in logical pixels.
+        build : bool, optional
+            If False, only return an existing render and never rescale.
+
+        Returns
+        -------
+        QPixmap or None
+            Pre-scaled pixmap with the widget's device pixel ratio set.
+        """
+        ratio = self.devicePixelRatioF()
+        key = (self._pixmap.cacheKey(), self._zoom_factor, ratio)
+        if key == self._scaled_key:
+            return self._scaled_render
+        if not build:
+            return None
+
+        device_width = max(1, round(scaled_width * ratio))
+        device_height = max(1, round(scaled_height * ratio))
+        too_big = device_width * device_height > SCALED_CACHE_MAX_PIXELS
+        if not too_big and self.residency is not None:
+            self.invalidate_scaled_render() # frees the old render's share of the budget
+            too_big = device_width * device_height * 4 > self.residency.available()
+        if too_big:
+            self.invalidate_scaled_render()
+            return None
+
+        if device_width == self._pixmap.width() and device_height == self._pixmap.height():
+            scaled = QPixmap(self._pixmap) # already the right size, shares the data
+        else:
+            scaled = self._pixmap.scaled(
+                device_width, device_height,
+                Qt.IgnoreAspectRatio, Qt.SmoothTransformation,
+            )
+        scaled.setDevicePixelRatio(ratio)
+
+        self._scaled_key = key
+        self._scaled_render = scaled
+        self.charge_renders()
+        return scaled
+
+    def mip_pixmap(self, device_width, build=True):
+        """
+        Return the smallest halved copy of the pixmap at least `device_width` wide.
+
+        Used for fast interactive painting: bilinear filtering from a copy
+        that is at most twice the on-screen size looks close to a smooth
+        rescale at a fraction of the cost. Levels are kept until the pixmap
+        changes.
+
+        Parameters
+        ----------
+        device_width : float
+            On-screen width of the whole image in device pixels.
+        build : bool, optional
+            Build missing levels. Halving a large pixmap takes tens of
+            milliseconds, so the interactive paint passes False and uses the
+            closest level that already exists.
+        """
+        key = self._pixmap.cacheKey()
+        if key != self._mip_key:
+            self._mip_key = key
+            self._mip_levels = [self._pixmap]
+
+        levels = self._mip_levels
+        level = 0
+        while levels[level].width() >= 2 * device_width:
+            if level + 1 == len(levels):
+                if not build:
+                    break
+                current = levels[level]
+                levels.append(current.scaled(
+                    max(1, current.width() // 2), max(1, current.height() // 2),
+                    Qt.IgnoreAspectRatio, Qt.SmoothTransformation,
+                ))
+                self.charge_renders()
+            level += 1
+        return levels[level]
+
+    def begin_interaction(self):
+        """
+        Switch to fast rendering while wheel or pan input is active.
+
+        Every call restarts the settle timer, so the high-quality repaint
+        happens once, INTERACTION_SETTLE_MS after the last input event.
+        """
+        self._interacting = True
+        self._settle_timer.start(INTERACTION_SETTLE_MS)
+
+    def end_interaction(self):
+        """
+        Leave fast rendering and repaint at full quality.
+
+        Also builds the mip levels for the current zoom while input is idle,
+        so the next interaction can use them.
+        """
+        self._interacting = False
+
+        if self._tiled is None and self._pixmap and not self._pixmap.isNull():
+            # Covers zooming out to half the current size as well
+            device_width = self._image_size.width() * self._zoom_factor * self.devicePixelRatioF()
+            self.mip_pixmap(device_width / 2)
+
+        self.update()
+
+    def invalidate_scaled_render(self):
+        """Drop the cached scaled image; the next repaint rebuilds it."""
+        self._scaled_key = None
+        self._scaled_render = None
+
+        # Mip levels of a replaced pixmap are no longer useful
+        if self._pixmap is None or self._pixmap.cacheKey() != self._mip_key:
+            self._mip_key = None
+            self._mip_levels = []
+        self.charge_renders()
+
+    def charge_renders(self):
+        """Report the memory held by the scaled render and mip levels to `residency`."""
+        if self.residency is None:
+            return
+        cost = sum(pixmap_cost(level) for level in self._mip_levels[1:]) # level 0 is the pixmap
+        scaled = self._scaled_render
+        if scaled is not None and scaled.size() != self._pixmap.size():
+            cost += pixmap_cost(scaled)
+        self.residency.charge(self, cost)
+
+    def paint_tiles(self, painter, target_rect):
+        """
+        Draw the visible tiles of a tiled image.
+
+        Tiles come from the pyramid level matching the zoom. The preview (or
+        the single-tile top level) is drawn first so that tiles still being
+        decoded show a blurry version instead of a hole. Missing tiles are
+        requested from `tile_loader`, which repaints when they arrive.
+
+        Parameters
+        ----------
+        painter : QPainter
+            Active painter for this widget.
+        target_rect : QRectF
+            Where the whole image lands on screen at the current zoom and pan.
+        """
+        source = self._tiled
+        loader = self.tile_loader
+
+        top_level = source.levels - 1
+        top_key = loader.tile_key(source, top_level, 0, 0)
+        backdrop = self._pixmap or loader.get(top_key)
+        if backdrop and not backdrop.isNull():
+            painter.drawPixmap(target_rect, backdrop, QRectF(backdrop.rect()))
+
+        level = source.level_for_scale(self._zoom_factor * self.devicePixelRatioF())
+        if self._interacting:
+            # Coarser tiles and plain filtering until input settles
+            level = min(source.levels - 1, level + 1)
+            painter.setRenderHint(QPainter.RenderHint.SmoothPixmapTransform, False)
+        scale = 1 << level                          # image pixels per level pixel
+        tile_span = TILE_SIZE * scale * self._zoom_factor # tile edge on screen
+
+        # Range of tiles that intersect the widget
+        visible = target_rect.intersected(QRectF(self.rect()))
+        cols, rows = source.tile_grid(level)
+        first_col = max(0, int((visible.left() - target_rect.left()) // tile_span))
+        last_col = min(cols - 1, int((visible.right() - target_rect.left()) // tile_span))
+        first_row = max(0, int((visible.top() - target_rect.top()) // tile_span))
+        last_row = min(rows - 1, int((visible.bottom() - target_rect.top()) // tile_span))
+
+        missing = []
+        if backdrop is None:
+            missing.append(top_key)
+
+        for row in range(first_row, last_row + 1):
+            for col in range(first_col, last_col + 1):
+                key = loader.tile_key(source, level, col, row)
+                tile = loader.get(key)
+                if tile is None:
+                    missing.append(key)
+                    continue
+
+                tile_rect = QRectF(
+                    target_rect.left() + col * tile_span,
+                    target_rect.top() + row * tile_span,
+                    tile.width() * scale * self._zoom_factor,
+                    tile.height() * scale * self._zoom_factor,
+                )
+                painter.drawPixmap(tile_rect, tile, QRectF(tile.rect()))
+
+        loader.request(source, missing)
+
     def resizeEvent(self, event):
         """
         Handle widget resize events.
@@ -437,7 +5793,9 @@ class ImageWidget(QWidget):
         If the user HAS zoomed, keep the current zoom and just clamp pan so the
         image doesn't get stuck off-screen.
         """
-        if self._pixmap and not self._pixmap.isNull():
+        self.invalidate_scaled_render()
+
+        if self.has_image():
             if not self._user_zoomed:
                 # Auto-fit while user hasn't zoomed this image
                 self.fit_to_window()
@@ -454,6 +5812,9 @@ class ImageWidget(QWidget):
         Rolling the wheel forward zooms in, rolling backward zooms out.
         """
         delta = event.angleDelta().y()
+        if delta != 0:
+            self.begin_interaction()
+
         if delta > 0:
             self.zoom_in()
         elif delta < 0:
@@ -466,10 +5827,10 @@ class ImageWidget(QWidget):
         Panning is only enabled if the scaled image is larger than the widget
         in at least one dimension.
         """
-        if event.button() == Qt.LeftButton and self._pixmap and not self._pixmap.isNull():
+        if event.button() == Qt.LeftButton and self.has_image():
             # compute how big the image is *on screen* at the current zoom
-            scaled_width = self._pixmap.width() * self._zoom_factor
-            scaled_height = self._pixmap.height() * self._zoom_factor
+            scaled_width = self._image_size.width() * self._zoom_factor
+            scaled_height = self._image_size.height() * self._zoom_factor
 
             # if the whole image fits inside the widget, no point panning
             if scaled_width <= self.width() and scaled_height <= self.height():
@@ -495,6 +5856,8 @@ class ImageWidget(QWidget):
             self._pan_offset_x += delta.x()
             self._pan_offset_y += delta.y()
 
+            self.begin_interaction()
+
             # Keep pan within valid bounds
             self.clamp_pan_to_bounds()
 
@@ -510,6 +5873,198 @@ class ImageWidget(QWidget):
             self._pan_active = False
         super().mouseReleaseEvent(event)
 
+class ThumbnailGrid(QListView):
+    """
+    Virtualized thumbnail grid for the current folder.
+
+    QListView only paints the cells inside the viewport, and `request_visible`
+    asks the ThumbnailLoader for exactly those thumbnails (plus the next
+    screenful), so memory and decode work follow the window size rather than
+    the number of files in the folder.
+
+    Activating a cell (double-click or Enter) emits the usual `activated`
+    signal; the main window uses it to open the image.
+    """
+    def __init__(self, loader, parent=None):
+        """
+        Parameters
+        ----------
+        loader : ThumbnailLoader
+            Loader asked for the thumbnails of the visible cells.
+        parent : QWidget or None, optional
+            Parent widget, if any.
+        """
+        super().__init__(parent)
+
+        self.loader = loader
+
+        self.setViewMode(QListView.IconMode)
+        self.setMovement(QListView.Static)
+        self.setResizeMode(QListView.Adjust)
+        self.setSelectionMode(QListView.SingleSelection)
+        self.setVerticalScrollMode(QListView.ScrollPerPixel)
+        self.setUniformItemSizes(True) # lets the view lay out 10k+ cells without asking for each
+        self.setWordWrap(False)
+        self.setTextElideMode(Qt.ElideMiddle)
+        self.setIconSize(QSize(GRID_ICON_SIZE, GRID_ICON_SIZE))
+        self.setGridSize(QSize(GRID_ICON_SIZE + 24, GRID_ICON_SIZE + 40))
+        self.setSpacing(4)
+
+        # Coalesces scroll/resize/model changes into one request per event loop pass
+        self._request_timer = QTimer(self)
+        self._request_timer.setSingleShot(True)
+        self._request_timer.timeout.connect(self.request_visible)
+        self.verticalScrollBar().valueChanged.connect(self.schedule_request)
+
+    def setModel(self, model):
+        """Reimplemented QListView method."""
+        super().setModel(model)
+        model.modelReset.connect(self.schedule_request)
+
+    def schedule_request(self):
+        """Call `request_visible` once the pending scroll/resize events are handled."""
+        self._request_timer.start()
+
+    def visible_rows(self):
+        """
+        Return the range of rows whose cells intersect the viewport.
+
+        Cells are laid out in row order, so both ends are found with a binary
+        search over `visualRect` instead of walking every item.
+
+        Returns
+        -------
+        range
+            Visible rows, possibly empty.
+        """
+        model = self.model()
+        count = model.rowCount() if model is not None else 0
+        if count == 0:
+            return range(0)
+
+        self.executeDelayedItemsLayout()
+        height = self.viewport().height()
+
+        def first_row(is_past):
+            lo, hi = 0, count
+            while lo < hi:
+                mid = (lo + hi) // 2
+                if is_past(self.visualRect(model.index(mid, 0))):
+                    hi = mid
+                else:
+                    lo = mid + 1
+            return lo
+
+        first = first_row(lambda rect: rect.bottom() >= 0)
+        end = first_row(lambda rect: rect.top() > height)
+        return range(first, max(first, end))
+
+    def request_visible(self):
+        """Ask the loader for the visible thumbnails, then the next screenful."""
+        if not self.isVisible() or self.model() is None:
+            return
+        rows = self.visible_rows()
+        ahead = range(rows.stop, min(self.model().rowCount(), rows.stop + len(rows)))
+        self.loader.request([self.model().path(row) for row in (*rows, *ahead)])
+
+    def resizeEvent(self, event):
+        """Reimplemented QListView method."""
+        super().resizeEvent(event)
+        self.schedule_request()
+
+    def showEvent(self, event):
+        """Reimplemented QListView method."""
+        super().showEvent(event)
+        self.schedule_request()
+
+class PerfOverlay(QWidget):
+    """
+    On-screen readout of the `PERF` spans, cache hit rates and memory.
+
+    Toggled with F12. While shown, spans are recorded and the readout is
+    refreshed every PERF_OVERLAY_REFRESH_MS. It paints an opaque box, so
+    refreshing it doesn't repaint the image underneath.
+    """
+    def __init__(self, viewer, parent=None):
+        """
+        Parameters
+        ----------
+        viewer : ImageViewerApp
+            Window whose caches and memory budget are reported.
+        parent : QWidget or None, optional
+            Widget the overlay is drawn over.
+        """
+        super().__init__(parent)
+        self.setAttribute(Qt.WA_TransparentForMouseEvents)
+        self.setAttribute(Qt.WA_OpaquePaintEvent)
+        self.setFont(QFont("Consolas", 9))
+        self.hide()
+
+        self._viewer = viewer
+        self._lines = []
+        self._timer = QTimer(self)
+        self._timer.setInterval(PERF_OVERLAY_REFRESH_MS)
+        self._timer.timeout.connect(self.refresh)
+
+    def set_active(self, active):
+        """Show or hide the overlay, recording spans only while needed."""
+        PERF.enabled = active or PERF.tracing
+        if active:
+            PERF.reset()
+            self.refresh()
+            self.show()
+            self.raise_()
+            self._timer.start()
+        else:
+            self._timer.stop()
+            self.hide()
+
+    def refresh(self):
+        """Rebuild the readout and resize to fit it."""
+        lines = ["phase                 last ms   mean ms      n"]
+        for name, (last, mean, count) in sorted(PERF.stats().items()):
+            lines.append(f"{name:<20} {last:8.1f}  {mean:8.1f} {count:6d}")
+
+        lines.append("")
+        viewer = self._viewer
+        caches = (
+            ("prefetch", viewer.prefetcher.cache),
+            ("pages", viewer.page_loader.cache),
+            ("tiles", viewer.image_widget.tile_loader.cache),
+            ("thumbnails", viewer.thumbnail_loader.cache),
+        )
+        for name, cache in caches:
+            lookups = cache.hits + cache.misses
+            rate = f"{100.0 * cache.hits / lookups:5.1f}%" if lookups else "    -"
+            lines.append(f"{name:<11} hits {rate} of {lookups:<6d} {cache.total_bytes / 2**20:7.1f} MB")
+        lookups = COLOR_TRANSFORMS.hits + COLOR_TRANSFORMS.misses
+        rate = f"{100.0 * COLOR_TRANSFORMS.hits / lookups:5.1f}%" if lookups else "    -"
+        lines.append(f"{'icc':<11} hits {rate} of {lookups:<6d} {len(COLOR_TRANSFORMS):4d} profiles")
+        if SANDBOX.enabled:
+            lines.append(f"{'sandbox':<11} {SANDBOX.decodes:6d} decodes {SANDBOX.killed:6d} killed")
+
+        residency = viewer.residency
+        lines.append(f"decoded images {residency.total_bytes / 2**20:7.1f} MB of {residency.budget_bytes / 2**20:.0f} MB")
+        resident = resident_memory_bytes()
+        if resident is not None:
+            lines.append(f"resident       {resident / 2**20:7.1f} MB")
+
+        self._lines = lines
+        metrics = self.fontMetrics()
+        width = max(metrics.horizontalAdvance(line) for line in lines) + 16
+        self.setGeometry(8, 8, width, metrics.lineSpacing() * len(lines) + 12)
+        self.update()
+
+    def paintEvent(self, event):
+        """Reimplemented QWidget method. Draws the readout on a dark box."""
+        painter = QPainter(self)
+        painter.fillRect(self.rect(), QColor("#0A1320"))
+        painter.setPen(QColor("#e0e0e0"))
+        line_height = self.fontMetrics().lineSpacing()
+        for row, line in enumerate(self._lines):
+            painter.drawText(8, 6 + self.fontMetrics().ascent() + row * line_height, line)
+        painter.end()
+
 class ImageViewerApp(QMainWindow):
     """
     Main application window for the image viewer.
@@ -520,6 +6075,10 @@ class ImageViewerApp(QMainWindow):
     - Provide a bottom toolbar with Browse / Previous / Next / Delete actions.
     - Handle loading images (static or animated) and wiring them into the widget.
     """ 
+    # Load timings of the current image, in ms since `load_image` started
+    first_pixel_shown = Signal(str, float)  # (path, ms) something of the image is on screen
+    full_quality_shown = Signal(str, float) # (path, ms) its real decode (or all visible tiles) is on screen
+
     def __init__(self, initial_path=None):
         """
         Initialize the main window and set up state, UI, and signal connections.
@@ -554,24 +6113,117 @@ class ImageViewerApp(QMainWindow):
             List of image paths in the current folder.
         current_index : int
             Index into `image_list` for the currently displayed image.
-        current_movie : QMovie or None
-            Active QMovie for animated images (GIF/WebP), if any.
+        current_path : str or None
+            Path of the image currently shown in the widget.
+        current_folder : str or None
+            Folder `image_list` was built from.
+        folder_scanner : FolderScanner
+            Lists the current folder in the background.
+        folder_watcher : QFileSystemWatcher
+            Reports changes to the current folder made by other programs.
+        current_animation : AnimationPlayer or None
+            Active player for animated images (GIF/WebP), if any.
+        animation_pool : QThreadPool
+            Runs the animation frame decoders.
+        residency : ResidencyManager
+            Memory budget shared by every cache of decoded images.
+        load_clock : QElapsedTimer
+            Started by `load_image`; times the current load.
+        first_pixel_ms, full_quality_ms : float or None
+            Time to first pixel and to full quality of the current image,
+            once reached.
+        prefetcher : ImagePrefetcher
+            Background decoder and pixmap cache for neighboring images.
+        page_loader : PageLoader
+            Background decoder and pixmap cache for the pages of the
+            current multi-page file.
+        current_pages : list[tuple[int, QSize]]
+            Pages of the current file (see `read_page_sizes`), or an empty
+            list if it has a single page.
+        page_position : int
+            Position of the page on screen in `current_pages`.
+        thumbnail_loader : ThumbnailLoader
+            Thumbnails for the grid, backed by the on-disk thumbnail cache.
+        thumbnail_model : ThumbnailModel
+            `image_list` as seen by the grid view.
+        trace_path : str or None
+            Where the `PERF` spans are written on close
+            (IMAGE_VIEWER_TRACE); spans are recorded all along if set.
+        trash_queue : TrashQueue
+            Sends deleted files to the trash in the background, with undo.
+        marked_paths : set[str]
+            Images marked for deletion in culling mode, trashed together by
+            `delete_marked`.
+        collection_root : str or None
+            Top folder of the open collection, or None when browsing a
+            single folder. In collection mode `image_list` comes from the
+            `CollectionIndex` instead of a folder scan.
+        collection_filter : str
+            Text the paths of listed collection images must contain.
+        collection_indexer : CollectionIndexer or None
+            Keeps the collection index up to date, and reads capture dates
+            for sorting folders by date; created on first use.
+        sort_mode : str
+            Order of `image_list`, a key of `SORT_MODES`.
         """
         self.image_list = []
         self.current_index = 0
-        self.current_movie = None   # Tracks active QMovie
-        self.current_movie_buffer = None   # Keeps QBuffer alive for animated images
+        self.current_path = None
+        self.current_folder = None
+        self.scan_skip = set()      # Paths the running scan must not add
+        self.folder_scanner = FolderScanner(self)
+        self.folder_watcher = QFileSystemWatcher(self)
+        self.watch_timer = QTimer(self)   # Coalesces bursts of change notifications
+        self.watch_timer.setSingleShot(True)
+        self.watch_timer.setInterval(WATCH_DEBOUNCE_MS)
+        self.current_animation = None   # Tracks active AnimationPlayer
+        self.current_loading = False    # current_path is still decoding in the background
+        self.showing_preview = False    # A thumbnail stands in while it decodes
+        self.animation_pool = QThreadPool(self)
+        self.animation_pool.setMaxThreadCount(2) # a stopped decoder may still be finishing a frame
+        self.residency = ResidencyManager()
+        self.load_clock = QElapsedTimer()
+        self.first_pixel_ms = None
+        self.full_quality_ms = None
+        self.prefetcher = ImagePrefetcher(residency=self.residency, parent=self)
+        self.page_loader = PageLoader(residency=self.residency, parent=self)
+        self.current_pages = []
+        self.page_position = 0
+        self.page_format = None     # sniffed format of the current multi-page file
+        self.page_reset = False     # the page being decoded resets zoom/pan when shown
+        self.thumbnail_loader = ThumbnailLoader(residency=self.residency, parent=self)
+        self.thumbnail_model = ThumbnailModel(self.thumbnail_loader, self)
+        self.trash_queue = TrashQueue(self)
+        self.marked_paths = set()
+        self.collection_root = None
+        self.collection_filter = ""
+        self.collection_indexer = None
+        self.sort_mode = "name"
+        self.trace_path = os.environ.get("IMAGE_VIEWER_TRACE") or None
+        if self.trace_path:
+            PERF.tracing = True
+            PERF.enabled = True
 
     def setup_ui(self):
         """
         Build and lay out the UI components for the main window.
 
         Currently:
-        - A central ImageWidget for displaying images.
+        - A central stack holding the ImageWidget and the thumbnail grid.
         - A non-movable bottom QToolBar for navigation and file actions.
         """
-        self.image_widget = ImageWidget(self)
-        self.setCentralWidget(self.image_widget)
+        self.image_widget = ImageWidget(self, self.residency)
+
+        self.thumbnail_grid = ThumbnailGrid(self.thumbnail_loader, self)
+        self.thumbnail_grid.setModel(self.thumbnail_model)
+
+        self.central_stack = QStackedWidget(self)
+        self.central_stack.addWidget(self.image_widget)
+        self.central_stack.addWidget(self.thumbnail_grid)
+        self.setCentralWidget(self.central_stack)
+
+        # Per-phase timings, cache hit rates and memory (F12)
+        self.perf_overlay = PerfOverlay(self, self.central_stack)
         
         self.bottom_toolbar = QToolBar("Bottom Toolbar", self)
         self.bottom_toolbar.setMovable(False)
@@ -590,17 +6242,25 @@ class ImageViewerApp(QMainWindow):
         self.browse_action.triggered.connect(self.open_image)
         self.bottom_toolbar.addAction(self.browse_action)
 
+        self.grid_action = QAction("Grid", self)
+        self.grid_action.setIcon(QIcon(resource_path("grid.svg")))
+        self.grid_action.setCheckable(True)
+        self.grid_action.toggled.connect(self.show_grid)
+        self.bottom_toolbar.addAction(self.grid_action)
+
         toolbar_spacer1 = QWidget(self)
         toolbar_spacer1.setSizePolicy(QSizePolicy.Expanding, QSizePolicy.Preferred)
         self.bottom_toolbar.addWidget(toolbar_spacer1)
 
         self.previous_action = QAction("Previous", self)
         self.previous_action.setIcon(QIcon(resource_path("left.svg")))
+        self.previous_action.setShortcut(QKeySequence(Qt.Key_Left)) # auto-repeats while held
         self.previous_action.triggered.connect(self.previous_image)
         self.bottom_toolbar.addAction(self.previous_action)
 
         self.next_action = QAction("Next", self)
         self.next_action.setIcon(QIcon(resource_path("right.svg")))
+        self.next_action.setShortcut(QKeySequence(Qt.Key_Right))
         self.next_action.triggered.connect(self.next_image)
         self.bottom_toolbar.addAction(self.next_action)
 
@@ -610,9 +6270,89 @@ class ImageViewerApp(QMainWindow):
 
         self.delete_action = QAction("Delete", self)
         self.delete_action.setIcon(QIcon(resource_path("trash.svg")))
+        self.delete_action.setShortcut(QKeySequence(Qt.Key_Delete))
         self.delete_action.triggered.connect(self.delete_image)
         self.bottom_toolbar.addAction(self.delete_action)
 
+        # Culling: mark images as you go, then trash them all at once
+        self.mark_action = QAction("Mark for Delete", self)
+        self.mark_action.setShortcut(QKeySequence(Qt.Key_X))
+        self.mark_action.triggered.connect(self.toggle_mark)
+        self.addAction(self.mark_action)
+
+        self.delete_marked_action = QAction("Delete Marked", self)
+        self.delete_marked_action.setShortcut(QKeySequence(Qt.SHIFT | Qt.Key_Delete))
+        self.delete_marked_action.triggered.connect(self.delete_marked)
+        self.addAction(self.delete_marked_action)
+
+        self.undo_delete_action = QAction("Undo Delete", self)
+        self.undo_delete_action.setShortcut(QKeySequence.Undo)
+        self.undo_delete_action.triggered.connect(self.undo_delete)
+        self.addAction(self.undo_delete_action)
+
+        # Collection mode: a whole directory tree, from the metadata index
+        self.collection_action = QAction("Open Collection", self)
+        self.collection_action.setShortcut(QKeySequence(Qt.CTRL | Qt.SHIFT | Qt.Key_O))
+        self.collection_action.triggered.connect(self.open_collection)
+        self.addAction(self.collection_action)
+
+        self.collection_filter_action = QAction("Filter Collection", self)
+        self.collection_filter_action.setShortcut(QKeySequence.Find)
+        self.collection_filter_action.triggered.connect(self.filter_collection)
+        self.addAction(self.collection_filter_action)
+
+        # Pages of a multi-page TIFF or ICO
+        self.previous_page_action = QAction("Previous Page", self)
+        self.previous_page_action.setShortcut(QKeySequence(Qt.Key_PageUp))
+        self.previous_page_action.triggered.connect(self.previous_page)
+        self.addAction(self.previous_page_action)
+
+        self.next_page_action = QAction("Next Page", self)
+        self.next_page_action.setShortcut(QKeySequence(Qt.Key_PageDown))
+        self.next_page_action.triggered.connect(self.next_page)
+        self.addAction(self.next_page_action)
+
+        # Name, capture date, modification time, size
+        self.sort_action = QAction("Change Sort Order", self)
+        self.sort_action.setShortcut(QKeySequence(Qt.CTRL | Qt.SHIFT | Qt.Key_S))
+        self.sort_action.triggered.connect(self.cycle_sort_mode)
+        self.addAction(self.sort_action)
+
+        # Deletions finish in the background
+        self.trash_queue.trashed.connect(self.on_trashed)
+        self.trash_queue.failed.connect(self.on_trash_failed)
+
+        # Not on the toolbar; F12 works anywhere in the window
+        self.perf_action = QAction("Performance Overlay", self)
+        self.perf_action.setCheckable(True)
+        self.perf_action.setShortcut(QKeySequence(Qt.Key_F12))
+        self.perf_action.toggled.connect(self.perf_overlay.set_active)
+        self.addAction(self.perf_action)
+
+        # Full-resolution decode once the user zooms past a reduced decode
+        self.image_widget.resolution_needed.connect(self.load_full_resolution)
+        self.prefetcher.full_ready.connect(self.on_full_resolution_ready)
+
+        # Background decodes of the image navigated to (latest request wins)
+        self.prefetcher.current_ready.connect(self.on_current_ready)
+        self.page_loader.page_ready.connect(self.on_page_ready)
+
+        # Tiled images reach full quality once the visible tiles are decoded
+        self.image_widget.tile_loader.tile_ready.connect(self.on_tile_ready)
+
+        # Folder listing arrives in batches from the background scanner
+        self.folder_scanner.batch_found.connect(self.on_scan_batch)
+        self.folder_scanner.finished.connect(self.on_scan_finished)
+
+        # Changes made by other programs are picked up without a full rescan
+        self.folder_watcher.directoryChanged.connect(self.watch_timer.start)
+        self.folder_watcher.fileChanged.connect(self.watch_timer.start)
+        self.watch_timer.timeout.connect(self.folder_scanner.refresh)
+        self.folder_scanner.changed.connect(self.on_folder_changed)
+
+        # Double-click or Enter in the grid opens that image
+        self.thumbnail_grid.activated.connect(self.open_from_grid)
+
     # Additional helper methods
 
     def get_real_pictures_folder(self):
@@ -650,9 +6390,9 @@ class ImageViewerApp(QMainWindow):
         Steps:
         - Start in the user's Pictures directory.
         - Let the user pick a single file.
-        - Scan the file's folder for all supported image extensions.
-        - Sort the image list alphabetically and update current_index.
         - Load the chosen image (with animation support).
+        - Scan the file's folder for all supported image extensions in the
+          background, merging them into the sorted image list.
         """
         default_dir = self.get_real_pictures_folder()
         
@@ -660,7 +6400,7 @@ class ImageViewerApp(QMainWindow):
             parent=self,
             caption="Select an Image",
             dir=default_dir,
-            filter="Images (*.png *.jpg *.jpeg *.jpe *.jfif *.webp *.gif *.bmp *.tif *.tiff *.heic *.heif *.avif *.avifs)"
+            filter="Images (*.png *.jpg *.jpeg *.jpe *.jfif *.webp *.gif *.bmp *.tif *.tiff *.heic *.heif *.avif *.avifs *.ico)"
         )
 
         if not file_path:
@@ -669,25 +6409,8 @@ class ImageViewerApp(QMainWindow):
         # Normalize the selected file path
         file_path = os.path.normpath(file_path)
 
-        # Gets folder path
-        folder_path = os.path.dirname(file_path)
-
-        # Scans for all images in folder
-        all_images = [
-            os.path.join(folder_path, filename)
-            for filename in os.listdir(folder_path)
-            if filename.lower().endswith(SUPPORTED_EXTENSIONS)
-        ]
-
-        # Sorts images alphabeticaly
-        all_images.sort(key=str.lower)
-
-        # Set image + store list
-        self.image_list = all_images
-        self.current_index = all_images.index(file_path)
-
-        # Use the unified loader (handles animated vs static)
-        self.load_image(file_path)
+        # Shows the image now; the rest of the folder is scanned in the background
+        self.show_and_scan(file_path)
 
     def open_image_from_path(self, file_path):
         """
@@ -704,27 +6427,338 @@ class ImageViewerApp(QMainWindow):
         if not os.path.isfile(file_path):
             return
 
+        self.show_and_scan(file_path)
+
+    def open_from_another_launch(self, file_path):
+        """
+        Open an image handed over by a later launch of the viewer.
+
+        Connected to `InstanceServer.open_requested`, so double-clicking
+        files reuses this window and its warm caches. The window is brought
+        to the front even if `file_path` is empty or can't be opened.
+        """
+        if file_path:
+            self.grid_action.setChecked(False)
+            self.open_image_from_path(file_path)
+
+        if self.isMinimized():
+            self.showNormal()
+        self.raise_()
+        self.activateWindow()
+
+    def show_and_scan(self, file_path):
+        """
+        Show `file_path` right away and fill `image_list` from its folder.
+
+        Shared by `open_image` and `open_image_from_path`. The list starts
+        out holding only the requested file; the folder is listed by the
+        background `folder_scanner`, and `on_scan_batch` merges its results
+        in sorted order as they arrive.
+
+        If the file itself is not a supported image, the first image of the
+        folder is shown once the scan finds one.
+
+        Parameters
+        ----------
+        file_path : str
+            Normalized path of the image to open.
+        """
         folder_path = os.path.dirname(file_path)
+        self.leave_collection()
 
-        # Scan for all supported images in that folder
-        all_images = [
-            os.path.join(folder_path, filename)
-            for filename in os.listdir(folder_path)
-            if filename.lower().endswith(SUPPORTED_EXTENSIONS)
-        ]
-        all_images.sort(key=str.lower)
+        # Drops cached neighbors and thumbnails from another folder
+        if folder_path != self.current_folder:
+            self.prefetcher.retain([file_path])
+            self.thumbnail_loader.clear()
+            if self.collection_indexer is not None:
+                self.collection_indexer.cancel() # capture dates of the old folder
+        self.current_folder = folder_path
 
-        self.image_list = all_images
+        # Paths the scan must not add (already listed or deleted meanwhile)
+        self.scan_skip = set()
+
+        if file_path.lower().endswith(SUPPORTED_EXTENSIONS):
+            self.image_list = [file_path]
+            self.current_index = 0
+            self.scan_skip.add(file_path)
+
+            # Use the unified loader (handles animated vs static)
+            self.load_image(file_path)
+        else:
+            self.image_list = []
+            self.current_index = 0
+
+        self.thumbnail_model.set_paths(self.image_list)
+        self.folder_scanner.scan(folder_path)
+
+        # Watches the folder for changes made by other programs
+        watched = self.folder_watcher.directories()
+        if watched != [folder_path]:
+            if watched:
+                self.folder_watcher.removePaths(watched)
+            self.folder_watcher.addPath(folder_path)
+
+    def collection_index(self):
+        """Return the `CollectionIndexer`, opening the index on first use."""
+        if self.collection_indexer is None:
+            self.collection_indexer = CollectionIndexer(CollectionIndex(), self)
+            self.collection_indexer.progress.connect(self.on_index_progress)
+            self.collection_indexer.finished.connect(self.on_index_finished)
+        return self.collection_indexer
+
+    def open_collection(self, root=None):
+        """
+        Browse every image under a folder tree, in the current sort order.
+
+        The images already in the index are listed at once, so reopening a
+        large library doesn't wait for the disk. The index is then refreshed
+        in the background (only new and changed files are probed), and the
+        list is re-queried when that finishes.
+
+        Parameters
+        ----------
+        root : str or None, optional
+            Top folder. If None, the user picks one.
+        """
+        if not root:
+            root = QFileDialog.getExistingDirectory(
+                self, "Select a Collection Folder", self.get_real_pictures_folder()
+            )
+            if not root:
+                return
+        root = os.path.normpath(root)
+
+        # A collection replaces the single-folder listing and its watch
+        self.folder_scanner.cancel()
+        self.watch_timer.stop()
+        watched = self.folder_watcher.directories() + self.folder_watcher.files()
+        if watched:
+            self.folder_watcher.removePaths(watched)
+        self.current_folder = None
+        self.scan_skip = set()
+        self.marked_paths.clear()
+        self.thumbnail_loader.clear()
+
+        self.collection_root = root
+        self.collection_filter = ""
+        indexer = self.collection_index()
+        self.reload_collection()
+        indexer.refresh(root)
+        self.statusBar().showMessage("Indexing collection...")
+
+    def leave_collection(self):
+        """Go back to single-folder browsing, stopping any index refresh."""
+        if self.collection_root is None:
+            return
+        self.collection_root = None
+        self.collection_filter = ""
+        self.collection_indexer.cancel()
+        self.statusBar().clearMessage()
+
+    def reload_collection(self):
+        """
+        Re-query `image_list` from the collection index.
+
+        Keeps showing the current image if it is still listed; otherwise the
+        first image is shown. Images waiting for the trash stay hidden.
+        """
+        if self.collection_root is None:
+            return
+        paths = self.collection_indexer.index.query(
+            self.collection_root, self.sort_mode, self.collection_filter
+        )
+        self.image_list = [path for path in paths if path not in self.scan_skip]
+        self.thumbnail_model.set_paths(self.image_list)
+        self.prefetcher.retain(self.image_list)
 
         try:
-            self.current_index = all_images.index(file_path)
+            self.current_index = self.image_list.index(self.current_path)
         except ValueError:
-            # If for some weird reason it isn't in the list, bail
             self.current_index = 0
-            file_path = all_images[0] if all_images else None
+            if self.image_list:
+                self.load_image(self.image_list[0])
+            else:
+                self.show_after_removal(0)
+            return
+        self.update_mark()
+        self.prefetch_neighbors()
 
-        if file_path:
-            self.load_image(file_path)
+    def cycle_sort_mode(self):
+        """Switch to the next sort order in `SORT_MODES` and re-sort the list."""
+        modes = list(SORT_MODES)
+        self.sort_mode = modes[(modes.index(self.sort_mode) + 1) % len(modes)]
+        self.statusBar().showMessage(f"Sorted by {SORT_MODES[self.sort_mode]}", 3000)
+
+        if self.collection_root is not None:
+            self.reload_collection()
+            return
+        self.resort_images()
+        if self.sort_mode == "date" and not self.folder_scanner.is_scanning():
+            self.read_capture_times()
+
+    def sort_key(self):
+        """Return the key function that orders the current folder's `image_list`."""
+        return self.folder_scanner.keys.key(self.sort_mode)
+
+    def resort_images(self):
+        """Re-sort the folder's `image_list` after the sort order or keys changed."""
+        self.image_list.sort(key=self.sort_key())
+        self.thumbnail_model.set_paths(self.image_list)
+        if self.current_path in self.image_list:
+            self.current_index = self.image_list.index(self.current_path)
+        self.prefetch_neighbors()
+
+    def read_capture_times(self):
+        """
+        Read the capture dates of the current folder's images, for sorting by date.
+
+        Dates already in the sort key table or in the metadata index (for
+        unchanged files) aren't read again; the rest are read from the
+        file headers in the background, and `on_index_finished` re-sorts.
+        """
+        keys = self.folder_scanner.keys
+        if self.current_folder is None or keys.has_capture_times():
+            return
+        self.collection_index().refresh(self.current_folder, dict(keys.stamps))
+
+    def filter_collection(self):
+        """Ask for text the collection's paths must contain; empty shows everything."""
+        if self.collection_root is None:
+            return
+        text, ok = QInputDialog.getText(
+            self, "Filter Collection", "Show images whose path contains:",
+            text=self.collection_filter,
+        )
+        if not ok:
+            return
+        self.collection_filter = text.strip()
+        self.reload_collection()
+        self.statusBar().showMessage(f"{len(self.image_list)} images", 3000)
+
+    def on_index_progress(self, done, total):
+        """Show how far the collection index refresh has got."""
+        if not total:
+            return
+        if self.collection_root is not None:
+            self.statusBar().showMessage(f"Indexing collection: {done} of {total} new or changed images")
+        else:
+            self.statusBar().showMessage(f"Reading capture dates: {done} of {total} images")
+
+    def on_index_finished(self, root, changed):
+        """Pick up what the finished index refresh found."""
+        if root == self.collection_root:
+            if changed:
+                self.reload_collection()
+            self.statusBar().showMessage(f"Collection indexed: {len(self.image_list)} images", 3000)
+        elif root == self.current_folder and self.collection_root is None:
+            # Capture dates of the folder being browsed
+            self.folder_scanner.keys.set_capture_times(self.collection_indexer.index.capture_times(root))
+            self.statusBar().clearMessage()
+            if self.sort_mode == "date":
+                self.resort_images()
+
+    def watch_current_file(self, path):
+        """
+        Watch the displayed file itself for changes.
+
+        Editors that overwrite a file in place don't touch the folder, so
+        the directory watch alone would never notice the new contents.
+        """
+        watched = self.folder_watcher.files()
+        if watched == [path]:
+            return
+        if watched:
+            self.folder_watcher.removePaths(watched)
+        self.folder_watcher.addPath(path)
+
+    def on_scan_batch(self, paths):
+        """
+        Merge a sorted batch of scanned paths into `image_list`.
+
+        Batches arrive in name order, so in name mode both runs are already
+        sorted and the sort is a single merge pass. In the other sort modes
+        each batch triggers a full keyed re-sort of the list.
+        `current_index` is moved so it still points at the shown image.
+        """
+        paths = [path for path in paths if path not in self.scan_skip]
+        if not paths:
+            return
+
+        # Batches arrive in name order, so in that mode this is a merge
+        self.image_list.extend(paths)
+        self.image_list.sort(key=self.sort_key())
+        self.thumbnail_model.set_paths(self.image_list)
+
+        try:
+            self.current_index = self.image_list.index(self.current_path)
+        except ValueError:
+            # Nothing from this folder is shown yet
+            self.current_index = 0
+            self.load_image(self.image_list[0])
+            return
+
+        self.prefetch_neighbors()
+
+    def on_scan_finished(self):
+        """
+        Drop cached neighbors that did not turn up in the finished scan, and
+        read capture dates if the folder is sorted by date.
+        """
+        self.prefetcher.retain(self.image_list)
+        if self.sort_mode == "date":
+            self.read_capture_times()
+
+    def on_folder_changed(self, added, removed, modified):
+        """
+        Apply changes made to the current folder by other programs.
+
+        Connected to `FolderScanner.changed`. `apply_folder_changes` inserts
+        and removes each path in the sorted `image_list` by binary search,
+        so the work is proportional to the number of changes, and shifts
+        `current_index` in place. Modified files can move when sorting by
+        anything but name, in which case the list is re-sorted instead.
+        Only the affected cache entries are dropped.
+
+        Parameters
+        ----------
+        added : list[str]
+            New image paths, sorted.
+        removed : list[str]
+            Paths that no longer exist (deleted or renamed away).
+        modified : list[str]
+            Paths whose size or modification time changed.
+        """
+        added = [path for path in added if path not in self.scan_skip]
+        resorted = bool(modified) and self.sort_mode != "name"
+        self.current_index, current_removed_at = apply_folder_changes(
+            self.image_list, self.current_index, self.current_path,
+            added, removed, self.sort_key(), resort=resorted,
+        )
+
+        for path in removed:
+            self.prefetcher.discard(path)
+            self.page_loader.discard(path)
+            self.thumbnail_loader.discard(path)
+            self.marked_paths.discard(path)
+
+        for path in modified:
+            self.prefetcher.discard(path)
+            self.page_loader.discard(path)
+            self.thumbnail_loader.discard(path)
+
+        if self.sort_mode == "date" and (added or modified):
+            self.read_capture_times() # re-sorts once the new dates are read
+
+        if added or removed or resorted:
+            self.thumbnail_model.set_paths(self.image_list)
+
+        if current_removed_at is not None:
+            self.show_after_removal(current_removed_at)
+        elif self.current_path in modified:
+            # Reloads the file that changed under us
+            self.load_image(self.current_path)
+        elif added or removed or resorted:
+            self.prefetch_neighbors()
     
     def previous_image(self):
         """
@@ -762,14 +6796,15 @@ class ImageViewerApp(QMainWindow):
 
     def delete_image(self):
         """
-        Delete the currently displayed image from disk and update the viewer.
+        Delete the currently displayed image and update the viewer.
 
         Behavior:
         - Ask the user for confirmation.
-        - If deletion fails, show a warning.
-        - If it succeeds, remove the image from `image_list`.
-        - If no images remain, clear the viewer.
-        - Otherwise, display the next logical image.
+        - Remove the image from `image_list` and show the next logical image
+          right away.
+        - Queue the file for the trash; `trash_queue` moves it there in the
+          background, after the Undo window, batched with other deletions.
+        - If trashing fails later, `on_trash_failed` puts it back and warns.
         """
         if not self.image_list:
             return
@@ -789,133 +6824,658 @@ class ImageViewerApp(QMainWindow):
         if reply != QMessageBox.StandardButton.Yes:
             return
 
-        # Sends image to trash bin
-        try:
-            send2trash(current_image_path)
-        except:
-            QMessageBox.warning(
-                self,
-                "Delete Failed",
-                "Unable to delete this file.    "
-            )
+        self.remove_and_trash([current_image_path])
+
+    def delete_marked(self):
+        """
+        Trash every image marked for deletion, as one batch.
+
+        The culling counterpart of `delete_image`: after one confirmation the
+        marked images leave `image_list` and go to the trash together.
+        """
+        marked = [path for path in self.marked_paths if os.path.exists(path)]
+        if not marked:
+            self.marked_paths.clear()
+            self.update_mark()
             return
 
-        if os.path.exists(current_image_path):
-            QMessageBox.warning(
-                self,
-                "Delete Failed",
-                "Unable to delete this file.    "
-            )
-            return        
+        reply = QMessageBox.question(
+            self,
+            "Delete Marked Files",
+            f"Are you sure you want to delete {len(marked)} marked file{'s' if len(marked) != 1 else ''}?    ",
+            QMessageBox.StandardButton.Yes | QMessageBox.StandardButton.No
+        )
+
+        if reply != QMessageBox.StandardButton.Yes:
+            return
+
+        self.remove_and_trash(sorted(marked, key=str.lower))
+
+    def remove_and_trash(self, paths):
+        """
+        Remove `paths` from the viewer now and queue them for the trash.
+
+        The viewer doesn't wait for the trash: the paths leave `image_list`
+        and the caches at once, and `trash_queue` deletes them in the
+        background. They stay undoable until the queue sends them.
+        """
+        removed = set(paths)
+        kept = [path for path in self.image_list if path not in removed]
+
+        # Removes from the in-memory list, keeping current_index on the same
+        # image, or on the one that takes its place if it was removed
+        current_removed_at = None
+        if self.current_path in removed:
+            current_removed_at = sum(1 for path in self.image_list[:self.current_index] if path not in removed)
+        elif self.current_path in kept:
+            self.current_index = kept.index(self.current_path)
+        self.image_list = kept
+        self.thumbnail_model.set_paths(self.image_list)
+
+        for path in paths:
+            self.prefetcher.discard(path)
+            self.page_loader.discard(path)
+            self.thumbnail_loader.discard(path)
+            self.scan_skip.add(path)
+            self.marked_paths.discard(path)
+
+        self.trash_queue.delete(paths)
+        self.statusBar().showMessage(
+            f"Deleted {len(paths) if len(paths) > 1 else os.path.basename(paths[0])}"
+            f"{' files' if len(paths) > 1 else ''}. Press Ctrl+Z to undo.",
+            TRASH_UNDO_MS,
+        )
+
+        if current_removed_at is not None:
+            self.show_after_removal(current_removed_at)
+        else:
+            self.update_mark()
+            self.prefetch_neighbors()
+
+    def undo_delete(self):
+        """
+        Bring back the latest deletion that hasn't reached the trash yet.
+
+        Its images return to `image_list` and the first of them is shown.
+        """
+        paths = self.trash_queue.undo()
+        if paths is None:
+            self.statusBar().showMessage("Nothing to undo.", 2000)
+            return
+
+        restored = [path for path in paths if os.path.exists(path)]
+        self.restore_paths(restored)
+        self.statusBar().clearMessage()
+
+        if restored and restored[0] in self.image_list:
+            self.current_index = self.image_list.index(restored[0])
+            self.load_image(restored[0])
 
-        # Removes from the in-memory list
-        deleted_index = self.current_index
-        del self.image_list[deleted_index]
+    def restore_paths(self, paths):
+        """
+        List `paths` again after an undone or failed deletion.
+
+        In collection mode the index still holds them, so the list is
+        re-queried; otherwise they are inserted if they belong to the folder.
+        """
+        for path in paths:
+            self.scan_skip.discard(path)
+        if self.collection_root is not None:
+            self.reload_collection()
+            return
+        for path in paths:
+            if os.path.dirname(path) == self.current_folder:
+                self.insert_path(path)
+
+    def insert_path(self, path):
+        """Insert `path` into the sorted `image_list`, keeping `current_index` on the shown image."""
+        if path in self.image_list:
+            return
+        key = self.sort_key()
+        index = bisect.bisect_right(self.image_list, key(path), key=key)
+        self.image_list.insert(index, path)
+        if index <= self.current_index:
+            self.current_index += 1
+        self.current_index = max(self.current_index, 0)
+        self.thumbnail_model.set_paths(self.image_list)
+
+    def on_trashed(self, paths):
+        """Forget any state left about files that are now in the trash."""
+        for path in paths:
+            self.scan_skip.discard(path)
+        if self.collection_indexer is not None:
+            self.collection_indexer.index.remove_many(paths)
+
+    def on_trash_failed(self, failures):
+        """
+        Put back the images the trash worker could not delete, and warn.
+
+        Parameters
+        ----------
+        failures : list[tuple[str, str]]
+            (path, error message) for each file that is still there.
+        """
+        self.restore_paths([path for path, _ in failures if os.path.exists(path)])
+        if not self.image_list:
+            return
+        if self.current_path not in self.image_list:
+            self.load_image(self.image_list[self.current_index])
+        else:
+            self.prefetch_neighbors()
+
+        names = "\n".join(os.path.basename(path) for path, _ in failures[:10])
+        more = f"\n... and {len(failures) - 10} more" if len(failures) > 10 else ""
+        QMessageBox.warning(
+            self,
+            "Delete Failed",
+            f"Unable to delete {'these files' if len(failures) > 1 else 'this file'}:    \n\n{names}{more}"
+        )
+
+    def toggle_mark(self):
+        """Mark or unmark the current image for deletion (culling mode)."""
+        if self.current_path is None or self.current_path not in self.image_list:
+            return
+        if self.current_path in self.marked_paths:
+            self.marked_paths.discard(self.current_path)
+        else:
+            self.marked_paths.add(self.current_path)
+        self.update_mark()
+
+    def update_mark(self):
+        """Show whether the current image is marked, and how many are, in the widget and title."""
+        marked = self.current_path in self.marked_paths
+        self.image_widget.set_marked(marked)
+
+        title = "Image Viewer"
+        if self.current_path is not None:
+            title = f"Image Viewer – {os.path.basename(self.current_path)}"
+        if self.current_pages:
+            title += f"  (page {self.page_position + 1} of {len(self.current_pages)})"
+        if self.marked_paths:
+            title += f"  [{len(self.marked_paths)} marked – Shift+Del to delete]"
+        self.setWindowTitle(title)
+
+    def show_after_removal(self, removed_index):
+        """
+        Show the next logical image after the current one left `image_list`.
+
+        Used after deleting the current file, and when the folder watcher
+        finds it was removed or renamed by another program.
 
+        Parameters
+        ----------
+        removed_index : int
+            Index the removed image had in `image_list`.
+        """
         # If there are no images left, clear the viewer and bail out
         if not self.image_list:
             self.current_index = -1
 
             # Stop any active animation so it doesn't keep repainting
-            if self.current_movie is not None:
-                self.current_movie.stop()
-                self.current_movie.deleteLater()
-                self.current_movie = None
-
-            if hasattr(self, "current_movie_buffer") and self.current_movie_buffer is not None:
-                self.current_movie_buffer.close()
-                self.current_movie_buffer = None
+            self.stop_animation()
 
+            self.current_path = None
+            self.current_pages = []
             self.image_widget.set_pixmap(None)
             
             # Resets the window title to its default
-            self.setWindowTitle("Image Viewer")            
+            self.update_mark()
             return
 
         # Decide which image to show next
-        if deleted_index >= len(self.image_list):
+        if removed_index >= len(self.image_list):
             self.current_index = len(self.image_list) - 1
         else:
-            self.current_index = deleted_index
+            self.current_index = removed_index
 
         # Load and show the new current image
         new_path = self.image_list[self.current_index]
         self.load_image(new_path)
         
+    @PERF.timed("load_image")
     def load_image(self, path):
         """
         Load an image (static or animated) and display it in the ImageWidget.
 
-        Animated formats (.gif, .webp) are handled with QMovie using an
-        in-memory buffer so the original file is not locked. For those:
-        - A QMovie is created from a QBuffer stored in `current_movie_buffer`.
+        Animated formats (.gif, .webp) are played by an AnimationPlayer from
+        an in-memory copy, so the original file is not locked. For those:
+        - The player is stored in `current_animation`.
         - On the first frame, zoom and pan are reset using `set_pixmap`.
         - Subsequent frames use `set_animation_frame` to preserve zoom/pan.
 
-        All other formats (or animation failure) are handled with `load_pixmap`.
+        Multi-page TIFFs and multi-size ICOs are listed page by page from
+        their headers and shown one page at a time by `show_page`, opening
+        at the first page (an icon's largest entry). Reloading the same file
+        stays on its page.
+
+        All other formats (or animation failure) are shown straight from the
+        prefetch cache when a neighbor was decoded ahead. Otherwise they are
+        decoded in the background with `ImagePrefetcher.request_current` and
+        shown by `on_current_ready`; if navigation moves on first, only the
+        latest image is shown. Until then a preview stands in: the grid
+        thumbnail, or a preview embedded in the file (EXIF thumbnail, HEIF
+        thumbnail, reduced TIFF page), fitted to the real image size from
+        the header so the full decode replaces it without moving. Without
+        either, the previous image stays up.
+
+        Time to first pixel and to full quality are reported separately with
+        `first_pixel_shown` and `full_quality_shown`.
         """
         # Stop previous animation if any
-        if self.current_movie is not None:
-            self.current_movie.stop()
-            self.current_movie.deleteLater()
-            self.current_movie = None
-
-        if self.current_movie_buffer is not None:
-            # Close and drop the buffer
-            self.current_movie_buffer.close()
-            self.current_movie_buffer = None
+        self.stop_animation()
+
+        # A reload of the same file stays on its page
+        reload_page = self.page_position if path == self.current_path and self.current_pages else None
             
-        # Displays filename on window title
-        self.setWindowTitle(f"Image Viewer – {os.path.basename(path)}")
-        file_extension = os.path.splitext(path)[1].lower()
-
-        # Uses Qt animation for GIF / WebP, but only if truly animated
-        if file_extension in (".gif", ".webp"):
-            # Read the file into memory so QMovie does not lock the file
-            qfile = QFile(path)
-            if qfile.open(QFile.ReadOnly):
-                data = qfile.readAll()
-                qfile.close()
+        self.current_path = path
+        self.current_pages = []
+        self.current_loading = False
+        self.showing_preview = False
+        self.watch_current_file(path)
+
+        self.load_clock.start()
+        self.first_pixel_ms = None
+        self.full_quality_ms = None
+
+        # Displays filename (and any culling marks) on window title
+        self.update_mark()
+
+        # The format comes from the file's first bytes, not its extension
+        header = read_header(path)
+        format_name = sniff_format(header)
+
+        # Plays GIF / WebP as animations, but only if truly animated
+        animated_format = may_be_animated(header)
+        if animated_format is not None:
+            animation = read_animation(path, animated_format)
+            if animation is not None:
+                data, loop_count = animation
+                player = AnimationPlayer(data, loop_count, self.animation_pool, self.residency, self)
+                self.current_animation = player
+                first_frame_for_this_animation = True
+
+                def update_frame(frame_pixmap):
+                    nonlocal first_frame_for_this_animation
+
+                    if frame_pixmap.isNull():
+                        return
+
+                    if first_frame_for_this_animation:
+                        # First frame: reset zoom/pan
+                        self.image_widget.set_pixmap(frame_pixmap)
+                        first_frame_for_this_animation = False
+                        self.report_full_quality()
+                    else:
+                        # Subsequent frames: preserve zoom/pan
+                        self.image_widget.set_animation_frame(frame_pixmap)
+
+                player.frame_changed.connect(update_frame)
+                player.start()
+                return  # do not fall through
+
+            # If not actually animated, fall through to static loader
+
+        # Multi-page files: pages are decoded one at a time by `page_loader`
+        if format_name in PAGED_FORMATS:
+            with PERF.span("page listing"):
+                pages = read_page_sizes(path, format_name)
+            if len(pages) > 1:
+                self.current_pages = pages
+                self.page_format = format_name
+                if reload_page is not None and reload_page < len(pages):
+                    self.page_position = reload_page
+                else:
+                    self.page_position = default_page(pages, format_name)
+                self.show_page(reset=True)
+                self.prefetch_neighbors()
+                return
+
+        # If not animated → static loader
+        # (served from the prefetch cache when a neighbor was decoded ahead)
+        cached = self.prefetcher.get(path)
+        thumbnail = None
+        if cached is not None:
+            pixmap, source_size = cached
+        else:
+            pixmap = None
+
+            # A grid thumbnail already knows the size and makes a quick preview
+            thumbnail = self.thumbnail_loader.get(path)
+            if thumbnail is not None and thumbnail[0] is not None:
+                source_size = thumbnail[1]
+            else:
+                thumbnail = None
+                with PERF.span("header probe"):
+                    source_size = probe_image_size(path, format_name)
+
+                # Otherwise a preview embedded in the file, if it has one
+                with PERF.span("embedded preview"):
+                    preview = read_embedded_preview(path, format_name, source_size)
+                if preview is not None:
+                    thumbnail = (QPixmap.fromImage(preview), source_size)
+
+        # Very large images are drawn as tiles instead of one huge pixmap
+        if source_size.width() * source_size.height() >= TILED_MIN_PIXELS:
+            try:
+                source = TiledImageSource(path)
+            except Exception:
+                source = None
+
+            if source is not None:
+                if pixmap is None and thumbnail is not None:
+                    pixmap = thumbnail[0]
+                self.image_widget.set_tiled_source(source, preview=pixmap)
+                if pixmap is not None:
+                    self.report_first_pixel()
+                self.prefetch_neighbors()
+                return
+
+        if pixmap is None:
+            # Decodes in the background, only as many pixels as fit-to-window
+            # needs. If navigation moves on first, this decode is skipped or
+            # its result just cached; `on_current_ready` shows the latest one.
+            self.prefetcher.request_current(path, self.image_widget.display_size())
+            self.current_loading = True
+
+            # Meanwhile a preview stands in, or the previous image stays up
+            if thumbnail is not None:
+                self.showing_preview = True
+                self.image_widget.set_pixmap(thumbnail[0], source_size)
+                self.report_first_pixel()
+            return
+
+        self.image_widget.set_pixmap(pixmap, source_size)
+        self.report_full_quality()
+        self.prefetch_neighbors()
+
+    def on_current_ready(self, path, pixmap, source_size):
+        """
+        Show a finished background decode of the current image.
+
+        Connected to `ImagePrefetcher.current_ready`, which only fires for the
+        most recently requested path.
+
+        Parameters
+        ----------
+        path : str
+            Decoded file.
+        pixmap : QPixmap or None
+            Display-resolution decode, or None if the file can't be read.
+        source_size : QSize
+            Full-resolution size of the image.
+        """
+        if path != self.current_path or not self.current_loading:
+            return
+        self.current_loading = False
+
+        if pixmap is None:
+            self.image_widget.set_pixmap(placeholder_pixmap(path))
+        elif self.showing_preview:
+            # Keeps any zoom/pan the user applied to the preview
+            self.image_widget.upgrade_pixmap(pixmap)
+        else:
+            self.image_widget.set_pixmap(pixmap, source_size)
+
+        self.showing_preview = False
+        self.report_full_quality()
+        self.prefetch_neighbors()
+
+    def show_page(self, reset=False):
+        """
+        Show the page at `page_position` of the current multi-page file.
+
+        A cached page is shown at once; otherwise it is decoded in the
+        background while the previous page (or image) stays up, and
+        `on_page_ready` shows it. Either way the pages on both sides are
+        queued next, nearest first, so paging on finds them decoded.
+
+        Parameters
+        ----------
+        reset : bool, optional
+            Fit the page to the window instead of keeping the zoom and pan
+            of the previous page (see `ImageWidget.set_page`).
+        """
+        self.update_mark()
+        path = self.current_path
+        page = self.current_pages[self.page_position][0]
+
+        cached = self.page_loader.get(PageLoader.page_key(path, page, True))
+        if cached is None:
+            cached = self.page_loader.get(PageLoader.page_key(path, page))
+        if cached is None and page == 0 and self.page_format == "TIFF":
+            # Neighbor prefetching decodes the first page of a TIFF too
+            cached = self.prefetcher.get(path)
+
+        self.page_reset = reset
+        self.current_loading = cached is None
+        if cached is not None:
+            self.display_page(*cached)
+
+        positions = [self.page_position] if cached is None else []
+        for distance in range(1, PAGE_PREFETCH_RADIUS + 1):
+            positions += [self.page_position + distance, self.page_position - distance]
+        pages = [self.current_pages[i][0] for i in positions if 0 <= i < len(self.current_pages)]
+        self.page_loader.request(path, self.page_format, pages, self.image_widget.display_size())
+
+    def display_page(self, pixmap, source_size):
+        """Put a decoded page of the current file on screen."""
+        if self.page_reset:
+            self.image_widget.set_pixmap(pixmap, source_size)
+        else:
+            self.image_widget.set_page(pixmap, source_size)
+        self.report_full_quality()
+
+    def on_page_ready(self, key):
+        """
+        Show a finished page decode if it is the page on screen.
+
+        Connected to `PageLoader.page_ready`. Display-size decodes replace
+        whatever stood in while they ran; full-resolution ones are swapped
+        in keeping the zoom and pan.
+
+        Parameters
+        ----------
+        key : tuple
+            (path, page, full resolution?) of the decoded page.
+        """
+        path, page, full = key
+        if path != self.current_path or not self.current_pages:
+            return
+        if page != self.current_pages[self.page_position][0]:
+            return
+
+        cached = self.page_loader.get(key)
+        if full:
+            if cached is not None:
+                self.image_widget.upgrade_pixmap(cached[0])
+            return
+        if not self.current_loading:
+            return
+        self.current_loading = False
+
+        if cached is None:
+            self.image_widget.set_pixmap(placeholder_pixmap(path))
+            self.report_full_quality()
+        else:
+            self.display_page(*cached)
+
+    def previous_page(self):
+        """Show the previous page of a multi-page file."""
+        self.turn_page(-1)
+
+    def next_page(self):
+        """Show the next page of a multi-page file."""
+        self.turn_page(1)
+
+    def turn_page(self, step):
+        """
+        Move `step` pages through the current multi-page file.
+
+        Does nothing past the first or last page, or for single-page images.
+        Each page turn is timed like a load (see `report_full_quality`).
+        """
+        position = self.page_position + step
+        if not self.current_pages or not 0 <= position < len(self.current_pages):
+            return
+        self.page_position = position
+
+        self.load_clock.start()
+        self.first_pixel_ms = None
+        self.full_quality_ms = None
+        self.show_page()
+
+    def on_tile_ready(self):
+        """Report full quality once the visible tiles of a tiled image are all decoded."""
+        if self.full_quality_ms is not None or not self.image_widget.is_tiled():
+            return
+        self.report_first_pixel()
+        if self.image_widget.tile_loader.is_idle:
+            self.report_full_quality()
+
+    def report_first_pixel(self):
+        """Record and announce the time to first pixel of the current load."""
+        if self.first_pixel_ms is not None or not self.load_clock.isValid():
+            return
+        self.first_pixel_ms = self.load_clock.nsecsElapsed() / 1e6
+        self.first_pixel_shown.emit(self.current_path, self.first_pixel_ms)
+
+    def report_full_quality(self):
+        """Record and announce the time to full quality of the current load."""
+        if self.full_quality_ms is not None or not self.load_clock.isValid():
+            return
+        self.report_first_pixel()
+        self.full_quality_ms = self.load_clock.nsecsElapsed() / 1e6
+        self.full_quality_shown.emit(self.current_path, self.full_quality_ms)
+
+    def show_grid(self, visible):
+        """
+        Switch between the single-image view and the thumbnail grid.
+
+        Connected to the checkable Grid action. The grid opens scrolled to the
+        current image; Previous/Next/Delete only apply to the image view.
+
+        Parameters
+        ----------
+        visible : bool
+            True to show the grid, False to go back to the image.
+        """
+        for action in (
+            self.previous_action, self.next_action, self.delete_action, self.mark_action,
+            self.previous_page_action, self.next_page_action,
+        ):
+            action.setEnabled(not visible)
+
+        # Pauses animations nobody can see
+        if self.current_animation is not None:
+            self.current_animation.set_paused(visible)
+
+        if not visible:
+            self.central_stack.setCurrentWidget(self.image_widget)
+            return
+
+        self.central_stack.setCurrentWidget(self.thumbnail_grid)
+        if 0 <= self.current_index < len(self.image_list):
+            index = self.thumbnail_model.index(self.current_index)
+            self.thumbnail_grid.setCurrentIndex(index)
+            self.thumbnail_grid.scrollTo(index, QListView.PositionAtCenter)
+        self.thumbnail_grid.setFocus()
+
+    def open_from_grid(self, index):
+        """
+        Open the image of an activated grid cell in the image view.
+
+        If it isn't already decoded, its thumbnail is shown as a preview while
+        the real decode runs (see `load_image`).
+
+        Parameters
+        ----------
+        index : QModelIndex
+            Activated cell.
+        """
+        if not index.isValid():
+            return
+        self.current_index = index.row()
+        self.grid_action.setChecked(False)
+        self.load_image(self.thumbnail_model.path(self.current_index))
+
+    def stop_animation(self):
+        """Stop and drop the active animation, if any."""
+        if self.current_animation is not None:
+            self.current_animation.stop()
+            self.current_animation.deleteLater()
+            self.current_animation = None
+
+    def load_full_resolution(self):
+        """
+        Replace a reduced decode of the current image with a full one.
+
+        Connected to `ImageWidget.resolution_needed`; the decode runs in the
+        background and `on_full_resolution_ready` swaps it in.
+        """
+        if self.current_path is None or self.current_animation is not None:
+            return
+        if self.current_loading:
+            return # the widget doesn't show this image's own decode yet
+
+        # Images too big for the memory budget are decoded as large as it allows
+        source_size = self.image_widget.image_size()
+        target_size = self.residency.fit_size(source_size)
+        if target_size == source_size:
+            target_size = None
+        elif target_size.width() <= self.image_widget.pixmap_size().width():
+            return # already as large as the budget allows
+
+        if self.current_pages:
+            page = self.current_pages[self.page_position][0]
+            self.page_loader.request_full(self.current_path, self.page_format, page, target_size)
+            return
+        self.prefetcher.request_full(self.current_path, target_size)
+
+    def on_full_resolution_ready(self, path, pixmap):
+        """Show a finished full-resolution decode if its image is still current."""
+        if path == self.current_path and self.current_animation is None:
+            self.image_widget.upgrade_pixmap(pixmap)
+
+    def prefetch_neighbors(self):
+        """
+        Start decoding the images on either side of `current_index`.
+
+        Runs in the background; the results land in the prefetcher's cache and
+        are picked up by `load_image` when the user navigates to them.
+        """
+        if not self.image_list or not (0 <= self.current_index < len(self.image_list)):
+            return
+        self.prefetcher.prefetch_around(
+            self.image_list, self.current_index, self.image_widget.display_size()
+        )
+
+    def closeEvent(self, event):
+        """
+        Reimplemented QMainWindow method.
+
+        Sends deletions still waiting for Undo to the trash, waits for
+        background workers to finish before the window goes away, then
+        writes the IMAGE_VIEWER_TRACE file, if one was asked for.
+        """
+        self.watch_timer.stop()
+        self.stop_animation()
+        self.animation_pool.waitForDone()
+        SANDBOX.shutdown() # sandboxed decodes still running fail at once
+        self.trash_queue.shutdown()
+        if self.collection_indexer is not None:
+            self.collection_indexer.shutdown()
+        self.folder_scanner.shutdown()
+        self.prefetcher.shutdown()
+        self.page_loader.shutdown()
+        self.image_widget.tile_loader.shutdown()
+        self.thumbnail_loader.shutdown()
+        if self.trace_path:
+            try:
+                PERF.write_trace(self.trace_path)
+            except OSError:
+                pass
+        super().closeEvent(event)
 
-                buffer = QBuffer()
-                buffer.setData(data)
-                if not buffer.open(QBuffer.ReadOnly):
-                    buffer = None
-
-                if buffer is not None:
-                    movie = QMovie(buffer)
-
-                    # Only treat as animated if it has more than one frame
-                    if movie.isValid() and movie.frameCount() > 1:
-                        self.current_movie = movie
-                        self.current_movie_buffer = buffer
-                        first_frame_for_this_movie = True
-
-                        def update_frame(frame_index):
-                            nonlocal first_frame_for_this_movie
-
-                            frame_pixmap = movie.currentPixmap()
-                            if frame_pixmap.isNull():
-                                return
-
-                            if first_frame_for_this_movie:
-                                # First frame: reset zoom/pan
-                                self.image_widget.set_pixmap(frame_pixmap)
-                                first_frame_for_this_movie = False
-                            else:
-                                # Subsequent frames: preserve zoom/pan
-                                self.image_widget.set_animation_frame(frame_pixmap)
-
-                        movie.frameChanged.connect(update_frame)
-                        movie.start()
-                        return  # do not fall through
-
-                    # If not actually animated, fall through to static loader
-
-        # If QMovie not used or not animated → static loader
-        pixmap = load_pixmap(path)
-        self.image_widget.set_pixmap(pixmap)
-        
 # --------------------------
 # Application entry point
 # --------------------------
@@ -926,9 +7486,29 @@ def main():
 
     Creates the QApplication, instantiates the main window,
     shows it, and starts the Qt event loop.
+
+    In single-instance mode a viewer that is already running gets the file
+    instead, and this process exits before creating the QApplication. When
+    the file is run as a script that check has already been made, before
+    the heavy imports at the top of the module.
+
+    With IMAGE_VIEWER_PROFILE_STARTUP=1, a `StartupProfiler` prints where
+    the startup time went.
     """
+    initial_path = sys.argv[1] if len(sys.argv) > 1 else None
+    profiler = StartupProfiler() if startup_profile_enabled() else None
+
+    single_instance = single_instance_enabled()
+    if single_instance and not SINGLE_INSTANCE_CHECKED:
+        if forward_to_running_instance(initial_path):
+            return
+        if profiler is not None:
+            profiler.mark("single-instance check")
+
     # QApplication MUST be first
     app = QApplication(sys.argv)
+    if profiler is not None:
+        profiler.mark("QApplication")
 
     # Force a light Fusion style (ignores system dark mode)
     app.setStyle("Fusion")
@@ -944,16 +7524,27 @@ def main():
     palette.setColor(QPalette.HighlightedText, Qt.white)
     app.setPalette(palette)
 
-    initial_path = sys.argv[1] if len(sys.argv) > 1 else None
-
     # Create window
     window = ImageViewerApp(initial_path=initial_path)
+    if profiler is not None:
+        profiler.mark("ImageViewerApp")
+        profiler.watch(window, expect_image=initial_path is not None)
     window.show()
+    if profiler is not None:
+        profiler.mark("show")
+
+    # Later launches open their file here instead of starting another viewer
+    if single_instance:
+        instance_server = InstanceServer(window)
+        instance_server.open_requested.connect(window.open_from_another_launch)
+        instance_server.listen()
 
     # Start event loop
     sys.exit(app.exec())
 
 if __name__ == "__main__":
+    # Needed for the thumbnail worker processes in a frozen (PyInstaller) build
+    multiprocessing.freeze_support()
     main()
 
 # --------------------------
@@ -0,0 +1,563 @@
+import sys
+import os
+import time
+import json
+import shutil
+import argparse
+import platform
+import subprocess
+import tempfile
+import statistics
+import contextlib
+import importlib.util
+
+"""
+Performance benchmark suite for the image viewer.
+
+Paint:
+- ImageWidget.paintEvent while panning a zoomed image, with the pre-scaled
+  render cache disabled ("before") and enabled ("after");
+- while wheel zooming, with every frame at full quality ("smooth") and with
+  the fast interactive rendering used until input settles ("fast");
+- at fixed zoom levels, first frame (builds the scaled render) and steady.
+
+Decode, over a synthetic corpus written to a temporary folder: large JPEG,
+PNG, TIFF, 16-bit TIFF, animated GIF and WebP, HEIC, AVIF, and corrupt
+files. Each file is timed through load_pixmap and load_with_pillow.
+
+Also folder scanning (time to the first batch and to the full listing),
+next/previous navigation latency (prefetched and not), and the
+Pillow-to-Qt handoff per Pillow mode: ImageQt plus QPixmap.fromImage
+("ImageQt") against pillow_to_qimage plus QPixmap.fromImage ("direct"),
+with tone mapping off so both convert the same pixels; and the same
+handoff for a 100 MP 16-bit and float frame, which goes through the
+viewer's default tone mapping.
+
+Runs headless on Qt's offscreen platform unless QT_QPA_PLATFORM is set.
+With --json, the results are also written as JSON (with the git commit
+they were measured on); --compare prints the change against an earlier
+JSON file, so regressions show up across commits.
+
+Usage:
+    python benchmark_viewer.py [image_path] [--json out.json] [--compare old.json] [--quick]
+"""
+
+os.environ.setdefault("QT_QPA_PLATFORM", "offscreen")
+
+VIEWER_SCRIPT = "ImageViewerApp_v2.5.py"
+FRAMES = 120
+HANDOFF_SIZE = (4000, 3000)
+HANDOFF_RUNS = 10
+TONE_MAP_SIZE = (10000, 10000)  # high bit depth frames, 100 MP
+TONE_MAP_RUNS = 3
+LOAD_RUNS = 5                   # decodes of each corpus file, per loader
+ZOOM_LEVELS = {"fit": None, "50%": 0.5, "100%": 1.0, "200%": 2.0}
+SCAN_FILES = 20_000             # files in the folder-scanning benchmark
+NAVIGATION_IMAGES = 12          # images in the navigation benchmark folder
+NAVIGATION_STEPS = 10           # next/previous steps timed per scenario
+WAIT_TIMEOUT_S = 30.0           # longest wait for a background result
+REGRESSION_THRESHOLD = 0.10     # --compare flags medians that moved more than this
+
+def load_viewer_module():
+    """
+    Import the viewer script as a module.
+
+    The script name contains a dot, so it can't be imported with a plain
+    import statement.
+    """
+    path = os.path.join(os.path.dirname(os.path.abspath(__file__)), VIEWER_SCRIPT)
+    spec = importlib.util.spec_from_file_location("image_viewer_app", path)
+    module = importlib.util.module_from_spec(spec)
+    spec.loader.exec_module(module)
+    return module
+
+def time_pan(viewer, widget, frames=FRAMES):
+    """
+    Pan back and forth across the image, repainting synchronously.
+
+    Returns
+    -------
+    list[float]
+        Paint time of each frame in milliseconds.
+    """
+    timings = []
+    for frame in range(frames):
+        widget._pan_offset_x = ((frame % 40) - 20) * 10
+        widget._pan_offset_y = ((frame % 30) - 15) * 10
+        widget.clamp_pan_to_bounds()
+
+        start = time.perf_counter()
+        widget.repaint()
+        timings.append((time.perf_counter() - start) * 1000.0)
+    return timings
+
+def time_wheel_zoom(viewer, widget, interactive, frames=FRAMES):
+    """
+    Step the zoom in and out like wheel notches, repainting synchronously.
+
+    Parameters
+    ----------
+    interactive : bool
+        Paint as the widget does during wheel input (fast path) instead of
+        at full quality on every notch.
+
+    Returns
+    -------
+    list[float]
+        Paint time of each frame in milliseconds.
+    """
+    base_zoom = widget._zoom_factor
+    timings = []
+    for frame in range(frames):
+        step = frame % 16
+        notches = step if step < 8 else 16 - step
+        widget.set_zoom(base_zoom * (1.25 ** notches))
+        if interactive:
+            widget.begin_interaction()
+        else:
+            widget.end_interaction()
+
+        start = time.perf_counter()
+        widget.repaint()
+        timings.append((time.perf_counter() - start) * 1000.0)
+
+    widget.end_interaction()
+    widget.set_zoom(base_zoom)
+    return timings
+
+def make_mode_images(size=HANDOFF_SIZE):
+    """Return a gradient test image for each Pillow mode the handoff handles natively."""
+    from PIL import Image
+
+    gradient = Image.linear_gradient("L").resize(size)
+    rgb = Image.merge("RGB", (gradient, gradient.transpose(Image.Transpose.FLIP_LEFT_RIGHT), gradient))
+    gray16 = gradient.convert("I").point(lambda i: i * 257).convert("I;16")
+    return {
+        "RGB": rgb,
+        "RGBA": Image.merge("RGBA", (*rgb.split(), gradient)),
+        "L": gradient,
+        "I;16": gray16,
+    }
+
+def make_high_bit_images(size=TONE_MAP_SIZE):
+    """Return a noisy 12-bit-in-16 and a float test image, the kind scientific cameras write."""
+    import numpy as np
+    from PIL import Image
+
+    rng = np.random.default_rng(0)
+    gray16 = rng.integers(0, 4096, (size[1], size[0]), dtype=np.uint16)
+    return {
+        "I;16": Image.fromarray(gray16),
+        "F": Image.fromarray(gray16.astype(np.float32) / 4095.0),
+    }
+
+@contextlib.contextmanager
+def tone_mapping(method):
+    """Set IMAGE_VIEWER_TONE_MAP (read by the viewer on every conversion) for a block."""
+    previous = os.environ.get("IMAGE_VIEWER_TONE_MAP")
+    os.environ["IMAGE_VIEWER_TONE_MAP"] = method
+    try:
+        yield
+    finally:
+        if previous is None:
+            del os.environ["IMAGE_VIEWER_TONE_MAP"]
+        else:
+            os.environ["IMAGE_VIEWER_TONE_MAP"] = previous
+
+def time_pillow_handoff(convert, img, runs=HANDOFF_RUNS):
+    """
+    Turn a decoded Pillow image into a QPixmap, as the viewer does after a decode.
+
+    Parameters
+    ----------
+    convert : callable
+        Pillow image -> QImage.
+
+    Returns
+    -------
+    list[float]
+        Time of each conversion in milliseconds.
+    """
+    from PySide6.QtGui import QPixmap
+
+    timings = []
+    for _ in range(runs):
+        start = time.perf_counter()
+        QPixmap.fromImage(convert(img))
+        timings.append((time.perf_counter() - start) * 1000.0)
+    return timings
+
+def report(label, timings, results=None, key=None):
+    """
+    Print median, mean and worst time, and add them to `results` under `key`.
+    """
+    print(f"{label:<20} median {statistics.median(timings):8.2f} ms   "
+          f"mean {statistics.mean(timings):8.2f} ms   "
+          f"max {max(timings):8.2f} ms   ({len(timings)} runs)")
+    if results is not None:
+        results[key or label] = {
+            "median_ms": round(statistics.median(timings), 3),
+            "mean_ms": round(statistics.mean(timings), 3),
+            "max_ms": round(max(timings), 3),
+            "runs": len(timings),
+        }
+
+def gradient_rgb(size):
+    """Return an RGB gradient image of `size` with some noise, so it doesn't compress to nothing."""
+    from PIL import Image
+
+    gradient = Image.linear_gradient("L").resize(size)
+    noise = Image.effect_noise(size, 24)
+    return Image.merge("RGB", (gradient, gradient.transpose(Image.Transpose.FLIP_LEFT_RIGHT), noise))
+
+def make_corpus(viewer, folder, quick=False):
+    """
+    Write the synthetic corpus into `folder`.
+
+    Formats whose encoder isn't available here (HEIC, AVIF) are skipped
+    with a note.
+
+    Returns
+    -------
+    dict[str, str]
+        Corpus entry name -> path.
+    """
+    from PIL import Image
+
+    big = (3000, 2000) if quick else (6000, 4000)
+    medium = (2000, 1500) if quick else (4000, 3000)
+    rgb_big = gradient_rgb(big)
+    rgb = gradient_rgb(medium)
+    corpus = {}
+
+    def save(name, img, **params):
+        path = os.path.join(folder, name)
+        try:
+            img.save(path, **params)
+        except Exception as error:
+            print(f"  skipped {name}: {error}")
+            return
+        corpus[name] = path
+
+    save("large.jpg", rgb_big, quality=90)
+    save("photo.png", rgb)
+    save("scan.tif", rgb)
+    gray16 = Image.linear_gradient("L").resize(medium).convert("I").point(lambda i: i * 257).convert("I;16")
+    save("scan16.tif", gray16)
+
+    frames = [gradient_rgb((480, 270)).rotate(angle) for angle in range(0, 360, 12)]
+    save("anim.gif", frames[0], save_all=True, append_images=frames[1:], duration=40, loop=0)
+    save("anim.webp", frames[0], save_all=True, append_images=frames[1:], duration=40, loop=0)
+
+    try:
+        viewer.register_heif_plugins()
+    except Exception as error:
+        print(f"  skipped HEIC/AVIF: {error}")
+    else:
+        save("photo.heic", rgb, format="HEIF", quality=80)
+        save("photo.avif", rgb, format="AVIF", quality=80)
+
+    # Corrupt files: a JPEG cut in half, and garbage behind a PNG signature
+    with open(corpus["large.jpg"], "rb") as file:
+        data = file.read()
+    corrupt = {
+        "truncated.jpg": data[:len(data) // 2],
+        "garbage.png": b"\x89PNG\r\n\x1a\n" + os.urandom(64 * 1024),
+        "empty.jpg": b"",
+    }
+    for name, contents in corrupt.items():
+        path = os.path.join(folder, name)
+        with open(path, "wb") as file:
+            file.write(contents)
+        corpus[name] = path
+
+    return corpus
+
+def wait_until(app, predicate, timeout=WAIT_TIMEOUT_S):
+    """Process Qt events until `predicate()` is true. Return False on timeout."""
+    from PySide6.QtCore import QEventLoop
+
+    deadline = time.perf_counter() + timeout
+    while not predicate():
+        if time.perf_counter() > deadline:
+            return False
+        app.processEvents(QEventLoop.AllEvents, 5)
+        time.sleep(0.0005)
+    return True
+
+def time_loaders(viewer, corpus, results, runs=LOAD_RUNS):
+    """Time load_pixmap and load_with_pillow on every corpus file."""
+    for name, path in corpus.items():
+        print(name)
+        for loader in ("load_pixmap", "load_with_pillow"):
+            function = getattr(viewer, loader)
+            timings = []
+            for _ in range(runs):
+                start = time.perf_counter()
+                function(path)
+                timings.append((time.perf_counter() - start) * 1000.0)
+            report(loader, timings, results, f"load/{name}/{loader}")
+
+def time_folder_scan(app, viewer, folder, results, runs=3):
+    """
+    Time FolderScanner over `folder`, to its first batch and to the end.
+    """
+    scanner = viewer.FolderScanner()
+    first_batch = []
+    finished = []
+    scanner.batch_found.connect(lambda paths: first_batch.append(time.perf_counter()) if not first_batch else None)
+    scanner.finished.connect(lambda: finished.append(time.perf_counter()))
+
+    to_first, to_end = [], []
+    for _ in range(runs):
+        first_batch.clear()
+        finished.clear()
+        start = time.perf_counter()
+        scanner.scan(folder)
+        if not wait_until(app, lambda: finished):
+            print("  scan timed out")
+            break
+        to_first.append((first_batch[0] - start) * 1000.0 if first_batch else float("nan"))
+        to_end.append((finished[0] - start) * 1000.0)
+
+    scanner.shutdown()
+    if to_end:
+        report("first batch", to_first, results, "scan/first_batch")
+        report("full list", to_end, results, "scan/full")
+
+def time_zoom_levels(viewer, widget, results, frames=30):
+    """
+    Paint at fixed zoom levels: the first frame, which builds the scaled
+    render, and the steady frames after it.
+    """
+    widget.fit_to_window()
+    fit_zoom = widget._zoom_factor
+    for label, zoom in ZOOM_LEVELS.items():
+        widget.set_zoom(fit_zoom if zoom is None else zoom)
+        widget.end_interaction()
+        widget.invalidate_scaled_render()
+
+        start = time.perf_counter()
+        widget.repaint()
+        first = (time.perf_counter() - start) * 1000.0
+
+        timings = []
+        for _ in range(frames):
+            start = time.perf_counter()
+            widget.repaint()
+            timings.append((time.perf_counter() - start) * 1000.0)
+
+        print(f"{label}: first frame {first:.2f} ms")
+        results[f"paint/zoom_{label}/first"] = {"median_ms": round(first, 3), "mean_ms": round(first, 3),
+                                                "max_ms": round(first, 3), "runs": 1}
+        report("steady", timings, results, f"paint/zoom_{label}/steady")
+    widget.fit_to_window()
+
+def make_navigation_folder(folder, count=NAVIGATION_IMAGES, quick=False):
+    """Write `count` distinct JPEGs for the navigation benchmark and return the first path."""
+    size = (2000, 1500) if quick else (4000, 3000)
+    base = gradient_rgb(size)
+    paths = []
+    for index in range(count):
+        path = os.path.join(folder, f"nav_{index:03d}.jpg")
+        base.rotate(index * 7).save(path, quality=90)
+        paths.append(path)
+    return paths[0]
+
+def time_navigation(app, viewer, first_path, results, steps=NAVIGATION_STEPS):
+    """
+    Time Next/Previous from the call until the new image is at full quality.
+
+    "prefetched" waits for the neighbor decodes between steps, as when
+    browsing at reading speed; "cold" turns prefetching off, so every step
+    decodes on demand.
+    """
+    window = viewer.ImageViewerApp()
+    window.resize(1280, 800)
+    window.show()
+    window.open_image_from_path(first_path)
+    wait_until(app, lambda: window.full_quality_ms is not None and not window.folder_scanner.is_scanning())
+
+    def step(action):
+        start = time.perf_counter()
+        action()
+        if not wait_until(app, lambda: window.full_quality_ms is not None):
+            return None
+        return (time.perf_counter() - start) * 1000.0
+
+    def neighbor(offset):
+        return window.image_list[(window.current_index + offset) % len(window.image_list)]
+
+    scenarios = (("prefetched", window.prefetcher.radius), ("cold", 0))
+    for scenario, radius in scenarios:
+        window.prefetcher.radius = radius
+        window.prefetcher.retain([window.current_path])
+        for direction, action, offset in (("next", window.next_image, 1), ("previous", window.previous_image, -1)):
+            timings = []
+            for _ in range(steps):
+                if radius:
+                    wait_until(app, lambda: window.prefetcher.get(neighbor(offset)) is not None)
+                else:
+                    window.prefetcher.retain([window.current_path])
+                elapsed = step(action)
+                if elapsed is not None:
+                    timings.append(elapsed)
+            if timings:
+                report(f"{direction} {scenario}", timings, results, f"navigate/{direction}_{scenario}")
+
+    window.close()
+    app.processEvents()
+    window.deleteLater()
+    app.processEvents()
+
+def git_commit():
+    """Return the current git commit of this script's checkout, or None."""
+    try:
+        return subprocess.run(
+            ["git", "rev-parse", "--short", "HEAD"],
+            cwd=os.path.dirname(os.path.abspath(__file__)),
+            capture_output=True, text=True, check=True,
+        ).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+def compare(results, old_path):
+    """Print the change of every median against an earlier JSON result file."""
+    with open(old_path, encoding="utf-8") as file:
+        old = json.load(file)
+    old_results = old.get("results", {})
+    print(f"Compared with {old_path} (commit {old.get('meta', {}).get('commit')})")
+    for key, entry in results.items():
+        previous = old_results.get(key)
+        if not previous or not previous["median_ms"]:
+            continue
+        change = entry["median_ms"] / previous["median_ms"] - 1.0
+        flag = ""
+        if change > REGRESSION_THRESHOLD:
+            flag = "  SLOWER"
+        elif change < -REGRESSION_THRESHOLD:
+            flag = "  faster"
+        print(f"  {key:<44} {previous['median_ms']:9.2f} -> {entry['median_ms']:9.2f} ms  {change:+7.1%}{flag}")
+
+def parse_args():
+    parser = argparse.ArgumentParser(description="Benchmark the image viewer headlessly.")
+    parser.add_argument("image", nargs="?", help="image for the paint benchmarks (default: generated)")
+    parser.add_argument("--json", help="write the results to this JSON file")
+    parser.add_argument("--compare", help="earlier JSON results to compare against")
+    parser.add_argument("--quick", action="store_true", help="smaller corpus and fewer runs")
+    return parser.parse_args()
+
+def main():
+    args = parse_args()
+    viewer = load_viewer_module()
+
+    import PySide6
+    import PIL
+    from PySide6.QtWidgets import QApplication
+    from PySide6.QtGui import QPixmap
+
+    app = QApplication.instance() or QApplication(sys.argv[:1])
+    results = {}
+    frames = FRAMES // 4 if args.quick else FRAMES
+
+    with tempfile.TemporaryDirectory() as folder:
+        corpus_folder = os.path.join(folder, "corpus")
+        os.mkdir(corpus_folder)
+        print("Writing corpus")
+        corpus = make_corpus(viewer, corpus_folder, args.quick)
+        path = args.image or corpus["large.jpg"]
+        pixmap = QPixmap(path)
+
+        widget = viewer.ImageWidget()
+        widget.resize(1280, 800)
+        widget.show()
+        app.processEvents() # lets the window get exposed so repaint() draws
+        widget.set_pixmap(pixmap)
+
+        # Zoom so the image is somewhat larger than the window and can be panned
+        widget.set_zoom(widget._zoom_factor * 1.6)
+
+        print(f"Image {pixmap.width()}x{pixmap.height()}, zoom {widget._zoom_factor:.3f}, "
+              f"widget {widget.width()}x{widget.height()}")
+        print("Panning")
+
+        cache_limit = viewer.SCALED_CACHE_MAX_PIXELS
+
+        viewer.SCALED_CACHE_MAX_PIXELS = 0
+        report("before", time_pan(viewer, widget, frames), results, "paint/pan_uncached")
+
+        viewer.SCALED_CACHE_MAX_PIXELS = cache_limit
+        report("after", time_pan(viewer, widget, frames), results, "paint/pan_cached")
+
+        print("Wheel zoom")
+        report("smooth", time_wheel_zoom(viewer, widget, False, frames), results, "paint/wheel_smooth")
+        report("fast", time_wheel_zoom(viewer, widget, True, frames), results, "paint/wheel_fast")
+
+        print("Zoom levels")
+        time_zoom_levels(viewer, widget, results)
+
+        # Deletes the widget while Qt is still up; leaving it to interpreter
+        # shutdown can crash PySide's teardown
+        widget.close()
+        widget.deleteLater()
+        app.processEvents()
+        del widget
+
+        print("Decoding")
+        time_loaders(viewer, corpus, results, 2 if args.quick else LOAD_RUNS)
+
+        print(f"Folder scan, {SCAN_FILES} files")
+        scan_folder = os.path.join(folder, "scan")
+        os.mkdir(scan_folder)
+        with open(corpus["anim.gif"], "rb") as file:
+            data = file.read()
+        for index in range(SCAN_FILES // 10 if args.quick else SCAN_FILES):
+            with open(os.path.join(scan_folder, f"img_{index:06d}.gif"), "wb") as file:
+                file.write(data[:64])
+        time_folder_scan(app, viewer, scan_folder, results)
+        shutil.rmtree(scan_folder)
+
+        print("Navigation")
+        navigation_folder = os.path.join(folder, "navigation")
+        os.mkdir(navigation_folder)
+        first_path = make_navigation_folder(navigation_folder, quick=args.quick)
+        time_navigation(app, viewer, first_path, results, 4 if args.quick else NAVIGATION_STEPS)
+
+    from PIL.ImageQt import ImageQt
+
+    # ImageQt doesn't tone map, so neither does the direct path here
+    print(f"Pillow handoff, {HANDOFF_SIZE[0]}x{HANDOFF_SIZE[1]}")
+    with tone_mapping("off"):
+        for mode, img in make_mode_images().items():
+            print(mode)
+            report("ImageQt", time_pillow_handoff(ImageQt, img), results, f"handoff/{mode}/ImageQt")
+            report("direct", time_pillow_handoff(viewer.pillow_to_qimage, img), results, f"handoff/{mode}/direct")
+
+    size = (4000, 2500) if args.quick else TONE_MAP_SIZE
+    print(f"High bit depth handoff (tone mapped), {size[0]}x{size[1]}")
+    with tone_mapping("percentile"):
+        for mode, img in make_high_bit_images(size).items():
+            report(mode, time_pillow_handoff(viewer.pillow_to_qimage, img, TONE_MAP_RUNS), results, f"tonemap/{mode}")
+
+    output = {
+        "meta": {
+            "commit": git_commit(),
+            "time": time.strftime("%Y-%m-%dT%H:%M:%S"),
+            "platform": platform.platform(),
+            "python": platform.python_version(),
+            "pyside6": PySide6.__version__,
+            "pillow": PIL.__version__,
+            "qpa": os.environ.get("QT_QPA_PLATFORM"),
+            "quick": args.quick,
+        },
+        "results": results,
+    }
+    if args.json:
+        with open(args.json, "w", encoding="utf-8") as file:
+            json.dump(output, file, indent=2)
+        print(f"Results written to {args.json}")
+    if args.compare:
+        compare(results, args.compare)
+
+if __name__ == "__main__":
+    main()
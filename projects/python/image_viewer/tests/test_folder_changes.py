@@ -0,0 +1,104 @@
+"""
+Tests for the image list bookkeeping of folder refreshes (`apply_folder_changes`).
+
+Run from the image_viewer folder with `python -m pytest tests` or
+`python -m unittest discover tests`.
+"""
+import importlib.util
+import os
+import unittest
+
+APP_PATH = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "ImageViewerApp_v2.5.py")
+
+# The file name isn't a valid module name, so it is loaded by path
+_spec = importlib.util.spec_from_file_location("image_viewer_app", APP_PATH)
+app = importlib.util.module_from_spec(_spec)
+_spec.loader.exec_module(app)
+
+
+class ApplyFolderChangesTest(unittest.TestCase):
+    def table(self, mtimes):
+        """Return a SortKeyTable with the given {name: mtime_ns} and no sizes."""
+        keys = app.SortKeyTable()
+        keys.update({self.path(name): (mtime, 0) for name, mtime in mtimes.items()})
+        return keys
+
+    @staticmethod
+    def path(name):
+        return os.path.join("folder", name + ".jpg")
+
+    def paths(self, *names):
+        return [self.path(name) for name in names]
+
+    def test_removal_after_modified_key_changed(self):
+        # Sorted by mtime: a, b, c, d. Then c's mtime drops to 0 and a is removed.
+        keys = self.table({"a": 1, "b": 2, "c": 3, "d": 4})
+        image_list = self.paths("a", "b", "c", "d")
+        keys.update({self.path("c"): (0, 0)})
+
+        index, removed_at = app.apply_folder_changes(
+            image_list, 3, self.path("d"), [], [self.path("a")],
+            keys.key("modified"), resort=True,
+        )
+
+        self.assertEqual(image_list, self.paths("c", "b", "d"))
+        self.assertEqual(index, 2)
+        self.assertIsNone(removed_at)
+
+    def test_current_removed_while_resorting(self):
+        keys = self.table({"a": 1, "b": 2, "c": 3, "d": 4})
+        image_list = self.paths("a", "b", "c", "d")
+        keys.update({self.path("d"): (0, 0)})
+
+        index, removed_at = app.apply_folder_changes(
+            image_list, 2, self.path("c"), [], [self.path("c")],
+            keys.key("modified"), resort=True,
+        )
+
+        self.assertEqual(image_list, self.paths("d", "a", "b"))
+        self.assertEqual(removed_at, 3) # where c would be now: after b
+        self.assertEqual(index, 2)
+
+    def test_added_while_resorting(self):
+        keys = self.table({"a": 1, "b": 2, "c": 3, "e": 5})
+        image_list = self.paths("a", "b", "c")
+        keys.update({self.path("a"): (4, 0)})
+
+        index, removed_at = app.apply_folder_changes(
+            image_list, 0, self.path("a"), [self.path("e")], [],
+            keys.key("modified"), resort=True,
+        )
+
+        self.assertEqual(image_list, self.paths("b", "c", "a", "e"))
+        self.assertEqual(index, 2)
+        self.assertIsNone(removed_at)
+
+    def test_name_order_shifts_current_index(self):
+        keys = self.table({"a": 0, "b": 0, "c": 0, "d": 0, "e": 0})
+        image_list = self.paths("a", "c", "e")
+
+        index, removed_at = app.apply_folder_changes(
+            image_list, 2, self.path("e"), self.paths("b", "d"), [self.path("a")],
+            keys.key("name"),
+        )
+
+        self.assertEqual(image_list, self.paths("b", "c", "d", "e"))
+        self.assertEqual(index, 3)
+        self.assertIsNone(removed_at)
+
+    def test_name_order_current_removed(self):
+        keys = self.table({"a": 0, "b": 0, "c": 0})
+        image_list = self.paths("a", "b", "c")
+
+        index, removed_at = app.apply_folder_changes(
+            image_list, 1, self.path("b"), [], self.paths("b", "x"),
+            keys.key("name"),
+        )
+
+        self.assertEqual(image_list, self.paths("a", "c"))
+        self.assertEqual(removed_at, 1)
+        self.assertEqual(index, 1)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,120 @@
+"""
+Tests for display-size decodes through Pillow (`read_with_pillow`, `read_image`).
+
+Run from the image_viewer folder with `python -m pytest tests` or
+`python -m unittest discover tests`.
+"""
+import importlib.util
+import os
+import shutil
+import tempfile
+import unittest
+from unittest import mock
+
+import numpy as np
+from PIL import Image
+from PySide6.QtCore import QSize
+from PySide6.QtGui import QImage
+
+APP_PATH = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "ImageViewerApp_v2.5.py")
+
+# The file name isn't a valid module name, so it is loaded by path
+_spec = importlib.util.spec_from_file_location("image_viewer_app", APP_PATH)
+app = importlib.util.module_from_spec(_spec)
+_spec.loader.exec_module(app)
+
+DISPLAY = QSize(800, 600)
+
+
+class DisplaySizeDecodeTest(unittest.TestCase):
+    def setUp(self):
+        self.folder = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, self.folder)
+
+    def save(self, img, name, **params):
+        path = os.path.join(self.folder, name)
+        img.save(path, **params)
+        return path
+
+    def test_palette_gif(self):
+        img = Image.new("P", (4000, 3000), 0)
+        img.putpalette([200, 30, 30])
+        path = self.save(img, "palette.gif")
+
+        qimage, source_size = app.read_with_pillow(path, DISPLAY)
+
+        self.assertFalse(qimage.isNull())
+        self.assertEqual(source_size, QSize(4000, 3000))
+        self.assertEqual(qimage.size(), DISPLAY)
+        self.assertEqual(qimage.pixelColor(0, 0).getRgb()[:3], (200, 30, 30))
+
+    def test_palette_png_keeps_transparency(self):
+        img = Image.new("P", (4000, 3000), 0)
+        img.putpalette([0, 0, 255, 255, 255, 255])
+        img.paste(1, (0, 0, 2000, 3000))
+        path = self.save(img, "palette.png", transparency=0)
+
+        qimage, _ = app.read_with_pillow(path, DISPLAY)
+
+        self.assertTrue(qimage.hasAlphaChannel())
+        self.assertEqual(qimage.pixelColor(0, 0).alpha(), 255)
+        self.assertEqual(qimage.pixelColor(799, 0).alpha(), 0)
+
+    def test_bilevel_tiff(self):
+        img = Image.new("1", (4000, 3000), 1)
+        path = self.save(img, "scan.tif")
+
+        qimage, _ = app.read_with_pillow(path, DISPLAY)
+
+        self.assertEqual(qimage.size(), DISPLAY)
+        self.assertEqual(qimage.pixelColor(0, 0).getRgb()[:3], (255, 255, 255))
+
+
+class HighBitDisplayDecodeTest(unittest.TestCase):
+    """12-bit gray ramps: the right edge (4095) should show white, not #101010."""
+
+    @classmethod
+    def setUpClass(cls):
+        cls.folder = tempfile.mkdtemp()
+        ramp = np.tile(np.arange(4000, dtype=np.uint32) * 4095 // 3999, (3000, 1)).astype(np.uint16)
+        cls.ramp = Image.fromarray(ramp)
+        cls.paths = {}
+        for ext in ("png", "tif"):
+            cls.paths[ext] = os.path.join(cls.folder, "ramp." + ext)
+            cls.ramp.save(cls.paths[ext])
+
+    @classmethod
+    def tearDownClass(cls):
+        shutil.rmtree(cls.folder)
+
+    def right_edge(self, qimage):
+        return qimage.pixelColor(qimage.width() - 1, 0).getRgb()[:3]
+
+    def test_display_size_decode_is_tone_mapped(self):
+        with mock.patch.dict(os.environ, {"IMAGE_VIEWER_TONE_MAP": "percentile"}):
+            for ext, path in self.paths.items():
+                with self.subTest(ext):
+                    qimage, source_size = app.read_image(path, DISPLAY)
+                    self.assertEqual(source_size, QSize(4000, 3000))
+                    self.assertEqual(qimage.size(), DISPLAY)
+                    self.assertEqual(qimage.format(), QImage.Format_Grayscale8)
+                    self.assertEqual(self.right_edge(qimage), (255, 255, 255))
+
+    def test_display_size_decode_with_tone_mapping_off(self):
+        with mock.patch.dict(os.environ, {"IMAGE_VIEWER_TONE_MAP": "off"}):
+            qimage, _ = app.read_with_pillow(self.paths["tif"], DISPLAY)
+        self.assertEqual(qimage.size(), DISPLAY)
+        self.assertEqual(qimage.format(), QImage.Format_Grayscale16)
+        self.assertEqual(self.right_edge(qimage), (16, 16, 16))
+
+    def test_qt_fallback_is_tone_mapped(self):
+        qimage = QImage(self.paths["png"]).scaled(DISPLAY)
+        self.assertEqual(qimage.format(), QImage.Format_Grayscale16)
+        with mock.patch.dict(os.environ, {"IMAGE_VIEWER_TONE_MAP": "percentile"}):
+            mapped = app.tone_map_qimage(qimage)
+        self.assertEqual(mapped.format(), QImage.Format_Grayscale8)
+        self.assertEqual(self.right_edge(mapped), (255, 255, 255))
+
+
+if __name__ == "__main__":
+    unittest.main()